@@ -2,17 +2,31 @@
 Hardware monitoring API routes
 """
 
+import asyncio
 import logging
+import math
+from bisect import bisect_left
 from datetime import datetime, timedelta
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
 
-from database.database import get_db
-from database.models import HardwareDataRecord
-from models.hardware import HardwareData, SystemInfo
+from config.settings import settings
+from database.database import get_read_db
+from database.models import HardwareDataRecord, HardwareRollupRecord
+from models.hardware import HardwareData, MetricSeries, SystemInfo
+from services.alert_engine import AlertEngine
+from services.column_store import read_series
+from services.downsample import METHODS, downsample
+from services.encoding import encode_json
 from services.hardware_monitor import HardwareMonitor
+from services.history_recorder import RECORD_COLUMNS, HistoryRecorder
+from services.metrics import metrics_to_document
+from services.retention import RetentionService
+from services.rollups import choose_tier
+from services.snapshot import Snapshot
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/hardware", tags=["hardware"])
@@ -30,75 +44,309 @@ def get_hardware_monitor() -> HardwareMonitor:
     return hm
 
 
+def get_history_recorder() -> Optional[HistoryRecorder]:
+    """Get history recorder instance"""
+    from main import history_recorder
+
+    return history_recorder
+
+
+def get_alert_engine() -> Optional[AlertEngine]:
+    """Get alert engine instance"""
+    from main import alert_engine
+
+    return alert_engine
+
+
+def get_retention_service() -> Optional[RetentionService]:
+    """Get history retention service instance"""
+    from main import retention_service
+
+    return retention_service
+
+
+def _etag(monitor: HardwareMonitor, snapshot: Snapshot) -> str:
+    return f'"{monitor.run_id}-{snapshot.seq}"'
+
+
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
 @router.get("/current", response_model=HardwareData)
 async def get_current_hardware_data(
+    wait: float = Query(
+        0,
+        ge=0,
+        le=30,
+        description="With If-None-Match: seconds to wait for a new sample (long poll)",
+    ),
+    if_none_match: Optional[str] = Header(None),
     monitor: HardwareMonitor = Depends(get_hardware_monitor),
 ):
-    """Get current hardware monitoring data"""
-    try:
-        data = await monitor.get_current_data()
-        if not data:
-            raise HTTPException(status_code=503, detail="Hardware data not available")
-        return data
-    except Exception as e:
-        logger.error(f"Error getting current hardware data: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get hardware data")
+    """Get current hardware monitoring data
+
+    Responses carry an ``ETag`` for the sample. A request whose
+    ``If-None-Match`` names the current sample gets ``304 Not Modified``,
+    after waiting up to ``wait`` seconds for a newer one. The body is the
+    snapshot's cached JSON, shared with the WebSocket and SSE streams.
+    """
+    snapshot = monitor.get_snapshot()
+    if not snapshot:
+        raise HTTPException(status_code=503, detail="Hardware data not available")
+
+    etag = _etag(monitor, snapshot)
+    if _etag_matches(etag, if_none_match) and wait:
+        try:
+            snapshot = await asyncio.wait_for(
+                monitor.wait_for_snapshot(snapshot.seq), wait
+            )
+        except asyncio.TimeoutError:
+            pass
+        etag = _etag(monitor, snapshot)
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=snapshot.json_bytes, media_type="application/json", headers=headers
+    )
+
+
+@router.get("/stream")
+async def stream_hardware_data(
+    monitor: HardwareMonitor = Depends(get_hardware_monitor),
+):
+    """Stream hardware data as Server-Sent Events
+
+    For clients that cannot use WebSockets. Every
+    ``WEBSOCKET_UPDATE_INTERVAL`` an ``event: hardware`` message carries the
+    sample as JSON, with the sample sequence number as its ``id``. The
+    encoded message is cached on the snapshot and shared by every client.
+    The response cancels the generator when the client disconnects.
+    """
+    stride = max(
+        1, round(settings.WEBSOCKET_UPDATE_INTERVAL / settings.MONITORING_INTERVAL)
+    )
+
+    async def events():
+        seq = 0
+        while True:
+            snapshot = await monitor.wait_for_snapshot(seq + stride - 1)
+            seq = snapshot.seq
+            yield snapshot.sse_bytes
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/system-info", response_model=SystemInfo)
 async def get_system_info(monitor: HardwareMonitor = Depends(get_hardware_monitor)):
-    """Get system information"""
-    try:
-        info = await monitor.get_system_info()
-        if not info:
-            raise HTTPException(status_code=503, detail="System info not available")
-        return info
-    except Exception as e:
-        logger.error(f"Error getting system info: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get system info")
+    """Get system information
+
+    Collected and encoded once when monitoring starts.
+    """
+    body = monitor.get_system_info_json()
+    if not body:
+        raise HTTPException(status_code=503, detail="System info not available")
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/history", response_model=List[HardwareData])
 async def get_hardware_history(
     hours: int = Query(1, ge=1, le=168, description="Hours of history to retrieve"),
-    db: AsyncSession = Depends(get_db),
+    points: int = Query(
+        1000, ge=1, le=10000, description="Approximate number of samples wanted"
+    ),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Get historical hardware data"""
+    """Get historical hardware data
+
+    Long ranges are served from the coarsest rollup tier that still yields
+    ``points`` samples (average values per bucket); short ranges return the
+    raw samples, at most ``points`` of them (evenly thinned out when there
+    are no rollup tiers to fall back to). Documents are built straight from
+    the stored values and encoded without validation: full documents
+    (``HISTORY_RAW_JSON``) as stored, summary rows and buckets through
+    ``metrics_to_document`` (empty core, storage and sensor lists).
+    """
     try:
         start_time = datetime.now() - timedelta(hours=hours)
+        span = hours * 3600
+        tier = choose_tier(
+            span, points, settings.HISTORY_ROLLUP_TIERS, settings.MONITORING_INTERVAL
+        )
+        if tier:
+            history = await _get_rollup_history(db, tier, start_time)
+            return Response(content=_json_array(history), media_type="application/json")
 
         stmt = (
             select(HardwareDataRecord)
             .where(HardwareDataRecord.timestamp >= start_time)
             .order_by(desc(HardwareDataRecord.timestamp))
-            .limit(1000)
+            .limit(points)
         )
+        # Keep every n-th row so ``points`` rows still span the whole range
+        stride = math.ceil(span / settings.MONITORING_INTERVAL / points)
+        if stride > 1:
+            stmt = stmt.where(HardwareDataRecord.id % stride == 0)
 
         result = await db.execute(stmt)
         records = result.scalars().all()
 
-        # Convert database records to HardwareData models
         history = []
         for record in records:
             if record.raw_data:
-                try:
-                    # Reconstruct HardwareData from stored JSON
-                    data = HardwareData.model_validate(record.raw_data)
-                    history.append(data)
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to parse historical data record {record.id}: {e}"
-                    )
-
-        return history
+                history.append(record.raw_data)
+                continue
+            # Summary columns only; per-sensor values live in the columnar
+            # history blocks
+            values = {
+                metric: getattr(record, column)
+                for metric, column in RECORD_COLUMNS.items()
+                if getattr(record, column) is not None
+            }
+            history.append(metrics_to_document(record.timestamp, values))
+
+        return Response(content=_json_array(history), media_type="application/json")
     except Exception as e:
         logger.error(f"Error getting hardware history: {e}")
         raise HTTPException(status_code=500, detail="Failed to get hardware history")
 
 
+def _json_array(items: List[Any]) -> bytes:
+    """JSON-ready documents encoded as one JSON array"""
+    return b"[" + b",".join(encode_json(item).encode() for item in items) + b"]"
+
+
+async def _get_rollup_history(
+    db: AsyncSession, tier: int, start_time: datetime
+) -> List[Dict[str, Any]]:
+    """Rebuild HardwareData documents from one rollup tier's bucket averages"""
+    stmt = (
+        select(
+            HardwareRollupRecord.bucket_start,
+            HardwareRollupRecord.metric,
+            HardwareRollupRecord.avg,
+        )
+        .where(
+            HardwareRollupRecord.tier == tier,
+            HardwareRollupRecord.bucket_start >= start_time,
+        )
+        .order_by(desc(HardwareRollupRecord.bucket_start))
+    )
+    result = await db.execute(stmt)
+
+    buckets = {}
+    for bucket_start, metric, value in result:
+        buckets.setdefault(bucket_start, {})[metric] = value
+
+    return [
+        metrics_to_document(bucket_start, values)
+        for bucket_start, values in buckets.items()
+    ]
+
+
+def _local_naive(value: datetime) -> datetime:
+    """History timestamps are stored as naive local time"""
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+@router.get("/history/{metric}", response_model=MetricSeries)
+async def get_metric_history(
+    metric: str,
+    start: Optional[datetime] = Query(
+        None, alias="from", description="Range start (default: one hour before end)"
+    ),
+    end: Optional[datetime] = Query(
+        None, alias="to", description="Range end (default: now)"
+    ),
+    points: int = Query(
+        500, ge=3, le=10000, description="Maximum points, e.g. the chart width"
+    ),
+    method: str = Query("lttb", description="Downsampling method (lttb, minmax)"),
+    db: AsyncSession = Depends(get_read_db),
+    recorder: Optional[HistoryRecorder] = Depends(get_history_recorder),
+    monitor: HardwareMonitor = Depends(get_hardware_monitor),
+):
+    """Get one metric's history, downsampled on the server
+
+    ``metric`` is a metric name such as ``cpu.temperature`` or any sensor
+    path such as ``cpu.cores.3.usage`` or ``sensors.fans.0.value``. Ranges
+    within the last ``RECENT_HISTORY_SECONDS`` are served from memory.
+    """
+    if method not in METHODS:
+        raise HTTPException(status_code=400, detail=f"Unknown method: {method}")
+    end = _local_naive(end) if end else datetime.now()
+    start = _local_naive(start) if start else end - timedelta(hours=1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+
+    try:
+        if monitor.recent.covers(start.timestamp()):
+            timestamps, values = monitor.recent.read(
+                metric, start.timestamp(), end.timestamp()
+            )
+        else:
+            timestamps, values = await _read_stored_series(
+                db, recorder, metric, start, end
+            )
+
+        sampled = len(values) > points
+        timestamps, values = downsample(timestamps, values, points, method)
+        return MetricSeries(
+            metric=metric,
+            method=method if sampled else "none",
+            timestamps=timestamps,
+            values=values,
+        )
+    except Exception as e:
+        logger.error(f"Error getting history for {metric}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get metric history")
+
+
+async def _read_stored_series(
+    db: AsyncSession,
+    recorder: Optional[HistoryRecorder],
+    metric: str,
+    start: datetime,
+    end: datetime,
+):
+    """Stored blocks plus the recorder's not yet flushed samples"""
+    # Read unflushed samples first: a flush while the query runs then
+    # shows up as overlap (trimmed below) rather than a gap
+    recent_ts, recent_values = (
+        recorder.read_unflushed(metric, start, end) if recorder else ([], [])
+    )
+    timestamps, values = await read_series(db, metric, start, end)
+    if recent_ts:
+        cut = bisect_left(timestamps, recent_ts[0])
+        timestamps = timestamps[:cut] + recent_ts
+        values = values[:cut] + recent_values
+    return timestamps, values
+
+
 @router.get("/status")
 async def get_monitoring_status(
     monitor: HardwareMonitor = Depends(get_hardware_monitor),
+    recorder: Optional[HistoryRecorder] = Depends(get_history_recorder),
+    retention: Optional[RetentionService] = Depends(get_retention_service),
+    alerts: Optional[AlertEngine] = Depends(get_alert_engine),
 ):
     """Get hardware monitoring status"""
-    return {"running": monitor.is_running(), "last_update": datetime.now().isoformat()}
+    return {
+        "running": monitor.is_running(),
+        "last_update": datetime.now().isoformat(),
+        "sampler": monitor.get_stats(),
+        "history": recorder.get_stats() if recorder else None,
+        "retention": retention.get_stats() if retention else None,
+        "alerts": alerts.get_stats() if alerts else None,
+    }
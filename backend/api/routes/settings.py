@@ -12,11 +12,19 @@ from pydantic import BaseModel
 from database.database import get_db
 from database.models import UserSettings
 from models.hardware import AlertThreshold
+from services.settings_cache import SettingsCache
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/settings", tags=["settings"])
 
 
+def get_settings_cache() -> SettingsCache:
+    """Get the process-wide settings cache"""
+    from main import settings_cache
+
+    return settings_cache
+
+
 class SettingUpdate(BaseModel):
     """Setting update model"""
 
@@ -33,20 +41,12 @@ class SettingResponse(BaseModel):
 
 
 @router.get("/", response_model=List[SettingResponse])
-async def get_all_settings(db: AsyncSession = Depends(get_db)):
+async def get_all_settings(cache: SettingsCache = Depends(get_settings_cache)):
     """Get all user settings"""
     try:
-        stmt = select(UserSettings)
-        result = await db.execute(stmt)
-        settings = result.scalars().all()
-
         return [
-            SettingResponse(
-                key=setting.key,
-                value=setting.value,
-                updated_at=setting.updated_at.isoformat(),
-            )
-            for setting in settings
+            SettingResponse(key=key, value=value, updated_at=updated_at.isoformat())
+            for key, value, updated_at in cache.items()
         ]
     except Exception as e:
         logger.error(f"Error getting settings: {e}")
@@ -54,21 +54,15 @@ async def get_all_settings(db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/{key}", response_model=SettingResponse)
-async def get_setting(key: str, db: AsyncSession = Depends(get_db)):
+async def get_setting(key: str, cache: SettingsCache = Depends(get_settings_cache)):
     """Get a specific setting"""
     try:
-        stmt = select(UserSettings).where(UserSettings.key == key)
-        result = await db.execute(stmt)
-        setting = result.scalar_one_or_none()
-
-        if not setting:
+        entry = cache.get_entry(key)
+        if not entry:
             raise HTTPException(status_code=404, detail="Setting not found")
 
-        return SettingResponse(
-            key=setting.key,
-            value=setting.value,
-            updated_at=setting.updated_at.isoformat(),
-        )
+        value, updated_at = entry
+        return SettingResponse(key=key, value=value, updated_at=updated_at.isoformat())
     except HTTPException:
         raise
     except Exception as e:
@@ -77,7 +71,12 @@ async def get_setting(key: str, db: AsyncSession = Depends(get_db)):
 
 
 @router.put("/{key}", response_model=SettingResponse)
-async def update_setting(key: str, value: Any, db: AsyncSession = Depends(get_db)):
+async def update_setting(
+    key: str,
+    value: Any,
+    db: AsyncSession = Depends(get_db),
+    cache: SettingsCache = Depends(get_settings_cache),
+):
     """Update or create a setting"""
     try:
         stmt = select(UserSettings).where(UserSettings.key == key)
@@ -94,6 +93,7 @@ async def update_setting(key: str, value: Any, db: AsyncSession = Depends(get_db
 
         await db.commit()
         await db.refresh(setting)
+        cache.set(setting.key, setting.value, setting.updated_at)
 
         return SettingResponse(
             key=setting.key,
@@ -107,7 +107,11 @@ async def update_setting(key: str, value: Any, db: AsyncSession = Depends(get_db
 
 
 @router.delete("/{key}")
-async def delete_setting(key: str, db: AsyncSession = Depends(get_db)):
+async def delete_setting(
+    key: str,
+    db: AsyncSession = Depends(get_db),
+    cache: SettingsCache = Depends(get_settings_cache),
+):
     """Delete a setting"""
     try:
         stmt = select(UserSettings).where(UserSettings.key == key)
@@ -119,6 +123,7 @@ async def delete_setting(key: str, db: AsyncSession = Depends(get_db)):
 
         await db.delete(setting)
         await db.commit()
+        cache.delete(key)
 
         return {"message": "Setting deleted successfully"}
     except HTTPException:
@@ -130,29 +135,10 @@ async def delete_setting(key: str, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/alerts/thresholds", response_model=List[AlertThreshold])
-async def get_alert_thresholds(db: AsyncSession = Depends(get_db)):
+async def get_alert_thresholds(cache: SettingsCache = Depends(get_settings_cache)):
     """Get alert threshold configurations"""
     try:
-        stmt = select(UserSettings).where(UserSettings.key.like("alert_threshold_%"))
-        result = await db.execute(stmt)
-        settings = result.scalars().all()
-
-        thresholds = []
-        for setting in settings:
-            metric = setting.key.replace("alert_threshold_", "")
-            threshold_data = setting.value
-
-            if isinstance(threshold_data, dict):
-                thresholds.append(
-                    AlertThreshold(
-                        metric=metric,
-                        threshold=threshold_data.get("threshold", 0),
-                        enabled=threshold_data.get("enabled", True),
-                        comparison=threshold_data.get("comparison", "greater"),
-                    )
-                )
-
-        return thresholds
+        return list(cache.thresholds().values())
     except Exception as e:
         logger.error(f"Error getting alert thresholds: {e}")
         raise HTTPException(status_code=500, detail="Failed to get alert thresholds")
@@ -160,7 +146,10 @@ async def get_alert_thresholds(db: AsyncSession = Depends(get_db)):
 
 @router.put("/alerts/thresholds/{metric}", response_model=AlertThreshold)
 async def update_alert_threshold(
-    metric: str, threshold: AlertThreshold, db: AsyncSession = Depends(get_db)
+    metric: str,
+    threshold: AlertThreshold,
+    db: AsyncSession = Depends(get_db),
+    cache: SettingsCache = Depends(get_settings_cache),
 ):
     """Update alert threshold for a specific metric"""
     try:
@@ -183,6 +172,7 @@ async def update_alert_threshold(
 
         await db.commit()
         await db.refresh(setting)
+        cache.set(setting.key, setting.value, setting.updated_at)
 
         return AlertThreshold(
             metric=metric,
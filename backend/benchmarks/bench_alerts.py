@@ -0,0 +1,54 @@
+"""
+Per-tick alert evaluation cost as the number of rules grows
+
+Rules are spread over every sensor path of a replayed sample.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_alerts [--rules 6 100 500 2000]
+"""
+
+import argparse
+import time
+
+from models.hardware import AlertThreshold
+from services.alert_engine import NUMPY_AVAILABLE, AlertRules
+from services.collectors import create_collector
+from services.snapshot import Snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, nargs="+", default=[6, 100, 500, 2000])
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--backend", default="replay")
+    args = parser.parse_args()
+
+    session = create_collector(args.backend)
+    samples = [
+        Snapshot(i, session.collect(), float(i), 0.0).sensor_values
+        for i in range(args.ticks)
+    ]
+    session.close()
+    paths = sorted(samples[0])
+
+    print(f"numpy: {NUMPY_AVAILABLE}, {len(paths)} sensor paths")
+    print(f"{'rules':>6} {'us/tick':>9}")
+    for count in args.rules:
+        rules = AlertRules(
+            [
+                AlertThreshold(metric=paths[i % len(paths)], threshold=50.0 + i % 40)
+                for i in range(count)
+            ],
+            hysteresis=2.0,
+            min_duration=3.0,
+        )
+        start = time.perf_counter()
+        for tick, values in enumerate(samples):
+            rules.check(values, float(tick))
+        elapsed = (time.perf_counter() - start) / len(samples)
+        print(f"{count:>6} {elapsed * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Per-tick collection cost: open/enumerate/close every tick vs a persistent session
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_collection [--ticks 50] [--backend sysfs psutil]
+"""
+
+import argparse
+import statistics
+import time
+
+from services.collectors import create_collector
+
+
+def _report(label: str, samples):
+    samples_ms = [s * 1000 for s in samples]
+    print(
+        f"{label:<28} mean {statistics.mean(samples_ms):8.3f} ms  "
+        f"p50 {statistics.median(samples_ms):8.3f} ms  "
+        f"max {max(samples_ms):8.3f} ms"
+    )
+
+
+def bench_reopen_per_tick(backend: str, ticks: int):
+    """Previous behaviour: a fresh session (open, enumerate, read, close) per tick"""
+    samples = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        session = create_collector(backend)
+        session.open()
+        session.collect()
+        session.close()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_persistent(backend: str, ticks: int):
+    """Current behaviour: one session, enumerate once, only refresh per tick"""
+    session = create_collector(backend)
+    session.open()
+    session.collect()  # warm-up: performs the one-time enumeration
+    samples = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        session.collect()
+        samples.append(time.perf_counter() - start)
+    session.close()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--backend", nargs="+", default=["auto"])
+    args = parser.parse_args()
+
+    for backend in args.backend:
+        print(f"Collector: {create_collector(backend).name}, ticks: {args.ticks}")
+        _report("reopen per tick (before)", bench_reopen_per_tick(backend, args.ticks))
+        _report("persistent session (after)", bench_persistent(backend, args.ticks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Concurrent history writes and reads against SQLite: default engine (one
+NullPool engine, rollback journal) vs the storage profile (WAL, tuned
+pragmas, a single writer connection plus a read-only pool).
+
+A writer inserts one batch of rows per interval while several readers
+aggregate the last day of one summary column. Reports write and read
+throughput and read latency.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_db_concurrency [--seconds 10] [--readers 4]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.database import Base, create_engines
+from database.models import HardwareDataRecord
+from services.collectors import create_collector
+from services.history_recorder import snapshot_to_row
+from services.snapshot import Snapshot
+
+SEED_ROWS = 86400
+
+
+def rows_for(samples, start: datetime, count: int):
+    return [
+        snapshot_to_row(
+            Snapshot(
+                i,
+                samples[i % len(samples)].with_timestamp(start + timedelta(seconds=i)),
+                0.0,
+                0.0,
+            )
+        )
+        for i in range(count)
+    ]
+
+
+async def writer(engine, samples, batch: int, interval: float, stop: float, stats):
+    rows = rows_for(samples, datetime.now(), batch)
+    while time.perf_counter() < stop:
+        begin = time.perf_counter()
+        async with engine.begin() as conn:
+            await conn.execute(insert(HardwareDataRecord), rows)
+        stats["write_ms"].append((time.perf_counter() - begin) * 1000)
+        stats["written"] += batch
+        await asyncio.sleep(interval)
+
+
+async def reader(engine, stop: float, stats):
+    stmt = select(func.count(), func.avg(HardwareDataRecord.cpu_usage)).where(
+        HardwareDataRecord.timestamp >= datetime.now() - timedelta(days=1)
+    )
+    while time.perf_counter() < stop:
+        begin = time.perf_counter()
+        async with engine.connect() as conn:
+            await conn.execute(stmt)
+        stats["read_ms"].append((time.perf_counter() - begin) * 1000)
+
+
+async def run_profile(name, write_engine, read_engine, samples, args):
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        seed_start = datetime.now() - timedelta(seconds=SEED_ROWS)
+        await conn.execute(
+            insert(HardwareDataRecord), rows_for(samples, seed_start, SEED_ROWS)
+        )
+
+    stats = {"written": 0, "write_ms": [], "read_ms": []}
+    stop = time.perf_counter() + args.seconds
+    await asyncio.gather(
+        writer(write_engine, samples, args.batch, args.interval, stop, stats),
+        *(reader(read_engine, stop, stats) for _ in range(args.readers)),
+    )
+    reads = sorted(stats["read_ms"])
+    p99 = reads[int(len(reads) * 0.99) - 1] if reads else 0.0
+    print(
+        f"{name:>8} {stats['written'] / args.seconds:>10.0f} "
+        f"{statistics.mean(stats['write_ms']):>13.1f} "
+        f"{len(reads) / args.seconds:>8.1f} "
+        f"{statistics.mean(reads) if reads else 0.0:>12.1f} {p99:>11.1f}"
+    )
+
+
+async def run(args):
+    session = create_collector(args.backend)
+    samples = [session.collect() for _ in range(60)]
+    session.close()
+
+    print(
+        f"{'profile':>8} {'writes/s':>10} {'write ms avg':>13} {'reads/s':>8} "
+        f"{'read ms avg':>12} {'read ms p99':>11}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'default.db')}"
+        default_engine = create_async_engine(url)
+        await run_profile("default", default_engine, default_engine, samples, args)
+        await default_engine.dispose()
+
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'tuned.db')}"
+        write_engine, read_engine = create_engines(url)
+        await run_profile("tuned", write_engine, read_engine, samples, args)
+        await write_engine.dispose()
+        await read_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--backend", default="replay")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Per-tick snapshot encoding cost as the number of WebSocket clients grows:
+model_dump() + json.dumps per client (before) vs one cached encoding (after)
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_encoding [--clients 1 10 100 500]
+"""
+
+import argparse
+import json
+import time
+
+from services.collectors import create_collector
+from services.snapshot import Snapshot
+
+
+def encode_per_client(snapshot: Snapshot, clients: int):
+    for _ in range(clients):
+        json.dumps(snapshot.data.model_dump(), default=str)
+
+
+def encode_once(snapshot: Snapshot, clients: int):
+    for _ in range(clients):
+        snapshot.json_text
+
+
+def _time_per_tick(func, samples, clients: int) -> float:
+    # Fresh snapshots every tick so the cache only helps within a tick
+    snapshots = [Snapshot(i, data, 0.0, 0.0) for i, data in enumerate(samples)]
+    start = time.perf_counter()
+    for snapshot in snapshots:
+        func(snapshot, clients)
+    return (time.perf_counter() - start) / len(snapshots)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--backend", default="replay")
+    args = parser.parse_args()
+
+    session = create_collector(args.backend)
+    samples = [session.collect() for _ in range(args.ticks)]
+    session.close()
+
+    print(f"{'clients':>8} {'before ms/tick':>15} {'after ms/tick':>14}")
+    for clients in args.clients:
+        before = _time_per_tick(encode_per_client, samples, clients)
+        after = _time_per_tick(encode_once, samples, clients)
+        print(f"{clients:>8} {before * 1000:>15.3f} {after * 1000:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
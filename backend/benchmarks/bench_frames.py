@@ -0,0 +1,75 @@
+"""
+Live-stream frame size and encode time per protocol, compared with the
+original json.dumps(model_dump()) path of WebSocketManager.broadcast
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_frames [--backend replay] [--ticks 200]
+"""
+
+import argparse
+import json
+import time
+
+from services.binary_codec import PackedEncoder
+from services.collectors import create_collector
+from services.delta_codec import DeltaEncoder
+from services.encoding import MSGPACK_AVAILABLE, encode_msgpack
+from services.snapshot import Snapshot
+
+
+def _json_dumps(snapshots):
+    return [json.dumps(s.data.model_dump(), default=str) for s in snapshots]
+
+
+def _model_dump_json(snapshots):
+    return [s.data.model_dump_json() for s in snapshots]
+
+
+def _delta(snapshots):
+    encoder = DeltaEncoder()
+    frames = [encoder.encode(s) for s in snapshots]
+    return [frames[0].resync] + [f.live for f in frames[1:]]
+
+
+def _packed(snapshots):
+    encoder = PackedEncoder()
+    frames = [encoder.encode(s) for s in snapshots]
+    return [f.schema for f in frames if f.schema_changed] + [f.frame for f in frames]
+
+
+def _msgpack(snapshots):
+    return [encode_msgpack(s.data) for s in snapshots]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", default="replay")
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    session = create_collector(args.backend)
+    samples = [session.collect() for _ in range(args.ticks)]
+    session.close()
+
+    codecs = [
+        ("json.dumps (before)", _json_dumps),
+        ("model_dump_json", _model_dump_json),
+        ("delta", _delta),
+        ("packed", _packed),
+    ]
+    if MSGPACK_AVAILABLE:
+        codecs.append(("msgpack", _msgpack))
+
+    print(f"{'protocol':<22} {'bytes/frame':>12} {'encode us/frame':>16}")
+    for name, codec in codecs:
+        snapshots = [Snapshot(i + 1, data, 0.0, 0.0) for i, data in enumerate(samples)]
+        start = time.perf_counter()
+        frames = codec(snapshots)
+        elapsed = time.perf_counter() - start
+        size = sum(len(f) for f in frames) / len(samples)
+        print(f"{name:<22} {size:>12.1f} {elapsed / len(samples) * 1e6:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Event loop lag under concurrent /api/v1/hardware/current load:
+collection on the event loop (before) vs the sampler thread (after)
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_loop_lag [--backend psutil] [--clients 50]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from config.settings import settings
+from services.hardware_monitor import HardwareMonitor
+from services.snapshot import Snapshot
+
+
+class InlineHardwareMonitor(HardwareMonitor):
+    """Previous behaviour: collect synchronously on the event loop"""
+
+    async def start(self):
+        self._running = True
+        self._inline_task = asyncio.create_task(self._inline_loop())
+        self.loop_lag.start()
+
+    async def stop(self):
+        self._running = False
+        await self.loop_lag.stop()
+        self._inline_task.cancel()
+
+    async def _inline_loop(self):
+        session = self._create_session()
+        session.open()
+        seq = 0
+        while self._running:
+            start = time.perf_counter()
+            data = session.collect()
+            seq += 1
+            self._publish(
+                Snapshot(seq, data, time.monotonic(), time.perf_counter() - start)
+            )
+            await asyncio.sleep(settings.MONITORING_INTERVAL)
+
+
+async def _client(client: httpx.AsyncClient, deadline: float, latencies):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/api/v1/hardware/current")
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(monitor: HardwareMonitor, clients: int, duration: float):
+    from main import app
+    from api.routes.hardware import get_hardware_monitor
+
+    app.dependency_overrides[get_hardware_monitor] = lambda: monitor
+    await monitor.start()
+    while monitor.get_snapshot() is None:
+        await asyncio.sleep(0.01)
+    monitor.loop_lag.reset()
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(_client(c, deadline, latencies) for _ in range(clients)))
+
+    stats = monitor.get_stats()
+    await monitor.stop()
+    app.dependency_overrides.clear()
+
+    latencies.sort()
+    lag = stats["loop_lag"]
+    print(
+        f"{type(monitor).__name__:<24} samples {stats['samples']:5d}  "
+        f"collect {stats['last_collection_ms']:7.3f} ms  "
+        f"lag mean {lag['mean_ms']:7.3f} p99 {lag['p99_ms']:7.3f} "
+        f"max {lag['max_ms']:7.3f} ms  "
+        f"req p50 {statistics.median(latencies) * 1000:7.3f} "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.3f} ms  "
+        f"({len(latencies) / duration:.0f} req/s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", default=settings.COLLECTOR_BACKEND)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    settings.COLLECTOR_BACKEND = args.backend
+    settings.MONITORING_INTERVAL = args.interval
+    print(
+        f"Collector: {args.backend}, clients: {args.clients}, interval: {args.interval}s"
+    )
+    asyncio.run(run(InlineHardwareMonitor(), args.clients, args.duration))
+    asyncio.run(run(HardwareMonitor(), args.clients, args.duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Requests per second on the hot read endpoints (/hardware/current,
+/hardware/system-info and /hardware/history) through the full ASGI app.
+
+The database is seeded with one hour of 1 Hz history rows, so ``/history``
+returns about 3600 raw samples. Requests are sent one at a time over an
+in-process transport, so the figures are the server's own work per
+request (routing, queries, validation, serialization) without network I/O.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_read_endpoints [--requests 200] [--raw-json]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DATABASE_DIR = tempfile.mkdtemp(prefix="bench-read-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{DATABASE_DIR}/bench.db")
+os.environ.setdefault("COLLECTOR_BACKEND", "replay")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from database.database import AsyncSessionLocal  # noqa: E402
+from database.models import HardwareDataRecord  # noqa: E402
+from main import app  # noqa: E402
+from services.collectors import create_collector  # noqa: E402
+from services.history_recorder import snapshot_to_row  # noqa: E402
+from services.snapshot import Snapshot  # noqa: E402
+
+ENDPOINTS = [
+    "/api/v1/hardware/current",
+    "/api/v1/hardware/system-info",
+    "/api/v1/hardware/history?hours=1&points=3600",
+]
+
+
+async def seed(seconds: int, raw_json: bool, backend: str):
+    """``seconds`` history rows at 1 Hz ending now"""
+    session = create_collector(backend)
+    templates = [session.collect() for _ in range(min(seconds, 600))]
+    session.close()
+    start = datetime.now() - timedelta(seconds=seconds)
+    rows = []
+    for i in range(seconds):
+        data = templates[i % len(templates)].with_timestamp(
+            start + timedelta(seconds=i)
+        )
+        rows.append(snapshot_to_row(Snapshot(i + 1, data, 0.0, 0.0), raw_json))
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(HardwareDataRecord), rows)
+        await db.commit()
+
+
+async def measure(client: httpx.AsyncClient, path: str, requests: int):
+    response = await client.get(path)  # warm up caches and connections
+    response.raise_for_status()
+    begin = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path)
+    elapsed = time.perf_counter() - begin
+    print(
+        f"{path:<46} {requests / elapsed:>9.1f} {elapsed / requests * 1000:>9.2f} "
+        f"{len(response.content) / 1000:>9.1f}"
+    )
+
+
+async def run(requests: int, seconds: int, raw_json: bool, backend: str):
+    async with app.router.lifespan_context(app):
+        await seed(seconds, raw_json, backend)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            await asyncio.sleep(1)  # first sample
+            print(
+                f"{seconds} history rows (raw_data {'on' if raw_json else 'off'}), "
+                f"{requests} sequential requests per endpoint"
+            )
+            print(f"{'endpoint':<46} {'req/s':>9} {'ms/req':>9} {'KB':>9}")
+            for path in ENDPOINTS:
+                await measure(client, path, requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seconds", type=int, default=3600)
+    parser.add_argument(
+        "--raw-json", action="store_true", help="store full documents per row"
+    )
+    parser.add_argument("--backend", default="replay")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.seconds, args.raw_json, args.backend))
+
+
+if __name__ == "__main__":
+    main()
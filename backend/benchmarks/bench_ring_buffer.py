@@ -0,0 +1,126 @@
+"""
+Recent-history buffer: a deque of HardwareData models (before) vs the
+column-per-sensor SampleRing (after). Reports memory held, append cost per
+sample and the latency of reading one metric over the last five minutes.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_ring_buffer [--seconds 900]
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime, timedelta
+
+from services.collectors import create_collector
+from services.ring_buffer import SampleRing
+from services.snapshot import Snapshot
+
+METRIC = "cpu.temperature"
+WINDOW = 300  # seconds read back
+
+
+def generate(count: int, backend: str):
+    """``count`` 1 Hz snapshots ending now"""
+    session = create_collector(backend)
+    templates = [session.collect() for _ in range(min(count, 600))]
+    session.close()
+    start = datetime.now() - timedelta(seconds=count)
+    snapshots = []
+    for i in range(count):
+        data = templates[i % len(templates)].with_timestamp(
+            start + timedelta(seconds=i)
+        )
+        snapshots.append(Snapshot(i + 1, data, float(i), 0.0))
+    return snapshots
+
+
+def read_models(buffer: deque, start: datetime):
+    points = [
+        (data.timestamp.timestamp(), data.cpu.temperature)
+        for data in buffer
+        if data.timestamp >= start and data.cpu.temperature is not None
+    ]
+    return [t for t, _ in points], [v for _, v in points]
+
+
+def held_mb(build) -> float:
+    tracemalloc.start()
+    retained = build()  # noqa: F841
+    size = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    return size
+
+
+def measure(label: str, fill, read, held, snapshots, reads: int):
+    size = held_mb(held)
+    begin = time.perf_counter()
+    buffer = fill(snapshots)
+    append_us = (time.perf_counter() - begin) / len(snapshots) * 1e6
+
+    begin = time.perf_counter()
+    for _ in range(reads):
+        _, values = read(buffer)
+    read_ms = (time.perf_counter() - begin) / reads * 1000
+    print(
+        f"{label:>8} {size:>9.2f} {append_us:>10.1f} {read_ms:>9.3f} {len(values):>7}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=int, default=900)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--backend", default="replay")
+    args = parser.parse_args()
+
+    snapshots = generate(args.seconds, args.backend)
+    for snapshot in snapshots:
+        snapshot.sensor_values  # computed per tick anyway by the recorder
+        snapshot.data  # the models the deque holds
+    now = snapshots[-1].timestamp
+    start = now - timedelta(seconds=WINDOW)
+    sensors = len(snapshots[0].sensor_values)
+
+    def fill_models(items):
+        buffer = deque(maxlen=args.seconds)
+        for snapshot in items:
+            buffer.append(snapshot.data)
+        return buffer
+
+    def fill_ring(items):
+        ring = SampleRing(args.seconds)
+        for snapshot in items:
+            ring.append(snapshot)
+        return ring
+
+    print(f"{args.seconds} samples of {sensors} sensors, reading {WINDOW}s of {METRIC}")
+    print(
+        f"{'buffer':>8} {'held MB':>9} {'append us':>10} {'read ms':>9} {'points':>7}"
+    )
+    measure(
+        "models",
+        fill_models,
+        lambda buffer: read_models(buffer, start),
+        # The deque keeps every model alive; copies make tracemalloc see them
+        lambda: deque(
+            (s.data.model_copy(deep=True) for s in snapshots), maxlen=args.seconds
+        ),
+        snapshots,
+        args.reads,
+    )
+    measure(
+        "ring",
+        fill_ring,
+        lambda ring: ring.read(METRIC, start.timestamp(), now.timestamp()),
+        lambda: fill_ring(snapshots),
+        snapshots,
+        args.reads,
+    )
+    print(f"ring: {8 * 3600 / 1000:.1f} KB per sensor per hour at 1 Hz")
+
+
+if __name__ == "__main__":
+    main()
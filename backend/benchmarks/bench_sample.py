@@ -0,0 +1,194 @@
+"""
+Per-sample cost of the collector output on a host with many cores and
+sensors: a tree of validated pydantic models (before) vs the flat
+array-backed Sample (after). Per sample it reports the CPU time to build it
+from raw readings, to derive the sensor values used by the ring buffer,
+alerts and topics, to encode it as JSON, and the memory one retained sample
+holds. ``to_model`` is the cost of materializing the models lazily at the
+API boundary.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_sample [--cores 128] [--sensors 64]
+"""
+
+import argparse
+import math
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict
+
+from models.hardware import (
+    CPUCore,
+    CPUData,
+    GPUData,
+    HardwareData,
+    MemoryData,
+    NetworkData,
+    SensorData,
+    SensorReading,
+    StorageDevice,
+)
+from services.encoding import encode_json
+from services.metrics import flatten
+from services.sample import LAYOUT, READING_GROUPS, Sample, get_schema
+
+STORAGE = ("/dev/nvme0n1p1", "/dev/nvme0n1p2", "/dev/sda1")
+
+
+def readings(ticks: int, cores: int, sensors: int):
+    """Raw values per tick, as a collector reads them"""
+    for t in range(ticks):
+        yield {
+            "timestamp": datetime.now(),
+            "cpu": (40 + 30 * math.sin(t / 10), 60.0, 3.6),
+            "cores": [50 + 40 * math.sin(t / 5 + i) for i in range(cores)],
+            "gpu": (50.0, 55.0, 35.0, 180.0, 45.0),
+            "memory": (55.0, 7000.0, 2048.0, 2.0),
+            "storage": [(61.5, 120.0 * (t % 3), 80.0, 38.0) for _ in STORAGE],
+            "network": (t * 1000, t * 4000, t, t * 4),
+            **{
+                group: [40 + math.sin(t + i) for i in range(sensors)]
+                for group in READING_GROUPS
+            },
+        }
+
+
+def sample_values(data: HardwareData) -> Dict[str, float]:
+    """What the sensor values were derived from before: the validated model"""
+    document = data.model_dump(mode="json")
+    del document["timestamp"]
+    values = {
+        path: float(value)
+        for path, value in flatten(document).items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+    if data.storage:
+        values["storage.max_usage"] = max(device.usage for device in data.storage)
+    return values
+
+
+def build_models(raw, names) -> HardwareData:
+    """What the collectors did before: validated models all the way down"""
+    return HardwareData(
+        timestamp=raw["timestamp"],
+        cpu=CPUData(
+            usage=raw["cpu"][0],
+            temperature=raw["cpu"][1],
+            frequency=raw["cpu"][2],
+            cores=[
+                CPUCore(core=i + 1, usage=usage, temperature=None)
+                for i, usage in enumerate(raw["cores"])
+            ],
+        ),
+        gpu=GPUData(**dict(zip(LAYOUT["gpu"][1], raw["gpu"]))),
+        memory=MemoryData(**dict(zip(LAYOUT["memory"][1], raw["memory"]))),
+        storage=[
+            StorageDevice(
+                device=device,
+                usage=fields[0],
+                read_speed=fields[1],
+                write_speed=fields[2],
+                temperature=fields[3],
+            )
+            for device, fields in zip(STORAGE, raw["storage"])
+        ],
+        network=NetworkData(**dict(zip(LAYOUT["network"][1], raw["network"]))),
+        sensors=SensorData(
+            **{
+                group: [
+                    SensorReading(name=name, value=value)
+                    for name, value in zip(names[group], raw[group])
+                ]
+                for group in READING_GROUPS
+            }
+        ),
+    )
+
+
+def build_sample(raw, schema) -> Sample:
+    """What the collectors do now: fill one preallocated array"""
+    sample = Sample(schema, raw["timestamp"])
+    sample.set_fields("cpu", raw["cpu"])
+    sample.set_column("cores", "usage", raw["cores"])
+    sample.set_fields("gpu", raw["gpu"])
+    sample.set_fields("memory", raw["memory"])
+    for i, fields in enumerate(raw["storage"]):
+        sample.set_fields("storage", fields, i)
+    sample.set_fields("network", raw["network"])
+    for group in READING_GROUPS:
+        sample.set_column(group, "value", raw[group])
+    return sample
+
+
+def per_sample_us(function, items) -> float:
+    begin = time.process_time()
+    for item in items:
+        function(item)
+    return (time.process_time() - begin) / len(items) * 1e6
+
+
+def held_kb(build, items) -> float:
+    tracemalloc.start()
+    retained = [build(item) for item in items]
+    size = tracemalloc.get_traced_memory()[0] / len(retained) / 1000
+    tracemalloc.stop()
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cores", type=int, default=128)
+    parser.add_argument("--sensors", type=int, default=64, help="per sensor group")
+    parser.add_argument("--ticks", type=int, default=300)
+    args = parser.parse_args()
+
+    names = {
+        group: tuple(f"{group} #{i + 1}" for i in range(args.sensors))
+        for group in READING_GROUPS
+    }
+    schema = get_schema(cores=args.cores, gpu=True, storage=STORAGE, **names)
+    raw = list(readings(args.ticks, args.cores, args.sensors))
+
+    models = [build_models(r, names) for r in raw]
+    samples = [build_sample(r, schema) for r in raw]
+    assert samples[0].to_document() == models[0].model_dump(mode="json")
+    assert samples[0].sensor_values() == sample_values(models[0])
+
+    print(
+        f"{args.cores} cores, {3 * args.sensors} sensors, {len(STORAGE)} disks: "
+        f"{len(schema.paths)} values per sample"
+    )
+    print(
+        f"{'sample':>8} {'build us':>9} {'values us':>10} {'json us':>8} "
+        f"{'held KB':>8}"
+    )
+    for label, build, items, values, encode in (
+        (
+            "models",
+            lambda r: build_models(r, names),
+            models,
+            sample_values,
+            lambda m: m.model_dump_json(),
+        ),
+        (
+            "array",
+            lambda r: build_sample(r, schema),
+            samples,
+            Sample.sensor_values,
+            lambda s: encode_json(s.to_document()),
+        ),
+    ):
+        print(
+            f"{label:>8} {per_sample_us(build, raw):>9.1f} "
+            f"{per_sample_us(values, items):>10.1f} "
+            f"{per_sample_us(encode, items):>8.1f} {held_kb(build, raw):>8.1f}"
+        )
+    print(
+        f"to_model (API boundary only): {per_sample_us(Sample.to_model, samples):.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
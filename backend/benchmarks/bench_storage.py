@@ -0,0 +1,119 @@
+"""
+History storage: JSON document per sample (before) vs columnar sensor
+blocks (after). Reports database size and the latency of reading one
+metric over the last hour and over the whole range.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_storage [--days 7]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.database import Base
+from database.models import HardwareDataRecord
+from models.hardware import HardwareData
+from services.collectors import create_collector
+from services.column_store import BlockBuilder, read_series, write_blocks
+from services.history_recorder import snapshot_to_row
+from services.snapshot import Snapshot
+
+METRIC = "cpu.temperature"
+BATCH = 3600
+
+
+def generate(days: int, backend: str):
+    """Yield 1 Hz snapshots covering ``days`` up to now"""
+    session = create_collector(backend)
+    templates = [session.collect() for _ in range(600)]
+    session.close()
+    start = datetime.now() - timedelta(days=days)
+    for i in range(days * 86400):
+        data = templates[i % len(templates)].with_timestamp(
+            start + timedelta(seconds=i)
+        )
+        yield Snapshot(i + 1, data, 0.0, 0.0)
+
+
+async def fill(engine, days: int, backend: str, columnar: bool):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    builder = BlockBuilder(600)
+    sensor_ids = {}
+    rows, blocks = [], []
+    for snapshot in generate(days, backend):
+        rows.append(snapshot_to_row(snapshot, raw_json=not columnar))
+        if columnar:
+            blocks.extend(builder.add(snapshot))
+        if len(rows) >= BATCH:
+            await write(engine, rows, blocks, sensor_ids)
+            rows, blocks = [], []
+    blocks.extend(builder.drain())
+    await write(engine, rows, blocks, sensor_ids)
+
+
+async def write(engine, rows, blocks, sensor_ids):
+    async with engine.begin() as conn:
+        if rows:
+            await conn.execute(insert(HardwareDataRecord), rows)
+        if blocks:
+            await write_blocks(conn, blocks, sensor_ids)
+
+
+async def query_json(engine, start: datetime, end: datetime) -> int:
+    stmt = select(HardwareDataRecord.raw_data).where(
+        HardwareDataRecord.timestamp >= start, HardwareDataRecord.timestamp <= end
+    )
+    async with engine.connect() as conn:
+        result = await conn.execute(stmt)
+        values = [HardwareData.model_validate(raw).cpu.temperature for (raw,) in result]
+    return len(values)
+
+
+async def query_columnar(engine, start: datetime, end: datetime) -> int:
+    async with engine.connect() as conn:
+        _, values = await read_series(conn, METRIC, start, end)
+    return len(values)
+
+
+async def timed(query, engine, start, end):
+    begin = time.perf_counter()
+    count = await query(engine, start, end)
+    return (time.perf_counter() - begin) * 1000, count
+
+
+async def run(days: int, backend: str):
+    end = datetime.now()
+    ranges = {"1h": end - timedelta(hours=1), f"{days}d": end - timedelta(days=days)}
+    print(f"{days} day(s) of 1 Hz samples, reading {METRIC}")
+    print(f"{'layout':>10} {'size MB':>9} {'range':>6} {'points':>8} {'query ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for layout, query in (("json", query_json), ("columnar", query_columnar)):
+            path = os.path.join(tmp, f"{layout}.db")
+            engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+            await fill(engine, days, backend, columnar=layout == "columnar")
+            size = os.path.getsize(path) / 1e6
+            for label, start in ranges.items():
+                ms, count = await timed(query, engine, start, end)
+                print(f"{layout:>10} {size:>9.1f} {label:>6} {count:>8} {ms:>10.1f}")
+            await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--backend", default="replay")
+    args = parser.parse_args()
+    asyncio.run(run(args.days, args.backend))
+
+
+if __name__ == "__main__":
+    main()
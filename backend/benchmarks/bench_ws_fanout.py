@@ -0,0 +1,116 @@
+"""
+WebSocket fan-out load test: CPU time per connected client per update as
+the number of clients grows, for the shared broadcaster (WebSocketManager,
+one encoding per tick) and for the original per-connection loop that
+serialized the model for every client.
+
+Clients are in-process stand-ins for sockets, so the figures are the
+server's own work (queueing, writer tasks, encoding) without network I/O.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_ws_fanout [--clients 10 100 1000] [--protocol json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from services.collectors import create_collector
+from services.snapshot import Snapshot
+from services.websocket_manager import PROTOCOLS, WebSocketManager
+
+
+class NullWebSocket:
+    """Accepts every frame and only counts the bytes"""
+
+    def __init__(self):
+        self.sent_bytes = 0
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text: str):
+        self.sent_bytes += len(text)
+
+    async def send_bytes(self, data: bytes):
+        self.sent_bytes += len(data)
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+def make_snapshots(ticks: int, backend: str):
+    session = create_collector(backend)
+    samples = [session.collect() for _ in range(ticks)]
+    session.close()
+    return samples
+
+
+async def run_manager(samples, clients: int, protocol: str) -> float:
+    """CPU seconds for all ticks through one shared broadcaster"""
+    manager = WebSocketManager()
+    connections = [
+        await manager.connect(NullWebSocket(), protocol) for _ in range(clients)
+    ]
+    start = time.process_time()
+    for seq, data in enumerate(samples, start=1):
+        await manager.broadcast_snapshot(Snapshot(seq, data, float(seq), 0.0))
+        # Let every writer task drain its queue
+        while any(c.queue_depth for c in connections):
+            await asyncio.sleep(0)
+    elapsed = time.process_time() - start
+    await manager.close_all()
+    return elapsed
+
+
+async def run_per_connection(samples, clients: int) -> float:
+    """CPU seconds for all ticks with one serializing loop per client"""
+    sockets = [NullWebSocket() for _ in range(clients)]
+    ticks = [asyncio.Event() for _ in samples]
+    models = [sample.to_model() for sample in samples]
+
+    async def client_loop(websocket: NullWebSocket):
+        for i, data in enumerate(models):
+            await ticks[i].wait()
+            await websocket.send_text(json.dumps(data.model_dump(), default=str))
+
+    tasks = [asyncio.create_task(client_loop(ws)) for ws in sockets]
+    start = time.process_time()
+    for tick in ticks:
+        tick.set()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return time.process_time() - start
+
+
+async def run(clients_list, ticks: int, protocol: str, backend: str):
+    samples = make_snapshots(ticks, backend)
+    print(f"{ticks} updates, protocol {protocol}")
+    print(f"{'clients':>8} {'path':>15} {'ms/update':>10} {'us/client':>10}")
+    for clients in clients_list:
+        for label, coro in (
+            ("broadcaster", run_manager(samples, clients, protocol)),
+            ("per-connection", run_per_connection(samples, clients)),
+        ):
+            elapsed = await coro
+            per_update = elapsed / ticks
+            print(
+                f"{clients:>8} {label:>15} {per_update * 1000:>10.2f} "
+                f"{per_update / clients * 1e6:>10.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--protocol", default="json", choices=PROTOCOLS)
+    parser.add_argument("--backend", default="replay")
+    args = parser.parse_args()
+    asyncio.run(run(args.clients, args.ticks, args.protocol, args.backend))
+
+
+if __name__ == "__main__":
+    main()
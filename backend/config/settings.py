@@ -2,7 +2,7 @@
 Application configuration settings
 """
 
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -24,11 +24,46 @@ class Settings(BaseSettings):
 
     # Database configuration
     DATABASE_URL: str = "sqlite+aiosqlite:///./hardware_monitor.db"
+    DATABASE_ECHO: bool = False  # log every SQL statement
+    DATABASE_READ_POOL_SIZE: int = 4  # read-only connections for queries
+    # SQLite performance profile, applied to every connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 16384
+    SQLITE_MMAP_SIZE: int = 268435456  # bytes
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # Rebuild a database created without incremental auto-vacuum at startup
+    # (one-time VACUUM) so retention can shrink the file
+    SQLITE_CONVERT_AUTO_VACUUM: bool = True
 
     # Hardware monitoring configuration
     MONITORING_INTERVAL: float = 1.0  # seconds
-    WEBSOCKET_UPDATE_INTERVAL: float = 1.0  # seconds
+    MONITORING_MISSED_TICK_POLICY: str = "skip"  # skip, catch_up or coalesce
+    MONITORING_SUBSCRIBER_QUEUE_SIZE: int = 300  # snapshots queued per consumer
+    WEBSOCKET_UPDATE_INTERVAL: float = 1.0  # seconds, default per-client rate
+    WEBSOCKET_MIN_INTERVAL: float = 0.1  # fastest rate a client can ask for
+    WEBSOCKET_MAX_INTERVAL: float = 10.0  # slowest rate, also the throttle limit
+    WEBSOCKET_HIDDEN_INTERVAL: float = 10.0  # rate while a client's tab is hidden
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 4  # frames buffered per client
+    WEBSOCKET_SEND_TIMEOUT: float = 5.0  # seconds before a stalled client is dropped
+    WEBSOCKET_KEYFRAME_INTERVAL: int = 30  # delta protocol: updates per keyframe
+    WEBSOCKET_DELTA_EPSILON: float = 0.0  # delta protocol: ignore smaller changes
     HISTORY_RETENTION_DAYS: int = 7
+    HISTORY_RETENTION_INTERVAL: float = 3600.0  # seconds between retention runs
+    HISTORY_RETENTION_CHUNK_SIZE: int = 5000  # rows deleted per transaction
+    HISTORY_ENABLED: bool = True
+    HISTORY_FLUSH_INTERVAL: float = 10.0  # seconds between bulk writes
+    HISTORY_BATCH_SIZE: int = 500  # rows per insert transaction
+    HISTORY_BUFFER_SIZE: int = 10000  # pending rows kept if the DB falls behind
+    HISTORY_ROLLUP_TIERS: List[int] = [10, 60, 900]  # rollup bucket widths (s)
+    HISTORY_BLOCK_SECONDS: int = 600  # columnar history: seconds per stored block
+    HISTORY_RAW_JSON: bool = False  # also keep the full JSON document per sample
+    RECENT_HISTORY_SECONDS: int = 900  # samples kept in memory for short ranges
+    # Collector backend: auto, libre, psutil, sysfs or replay
+    COLLECTOR_BACKEND: str = "auto"
+    REPLAY_FILE: Optional[str] = None  # JSON lines of HardwareData for "replay"
+    # psutil/sysfs have no hotplug events: seconds between device rescans (0: off)
+    COLLECTOR_RESCAN_INTERVAL: float = 60.0
 
     # Alert thresholds
     CPU_TEMP_THRESHOLD: float = 80.0  # Celsius
@@ -37,6 +72,10 @@ class Settings(BaseSettings):
     GPU_USAGE_THRESHOLD: float = 95.0  # Percentage
     MEMORY_USAGE_THRESHOLD: float = 90.0  # Percentage
     DISK_USAGE_THRESHOLD: float = 90.0  # Percentage
+    ALERTS_ENABLED: bool = True
+    ALERT_HYSTERESIS: float = 2.0  # distance back past a threshold to resolve
+    ALERT_MIN_DURATION: float = 5.0  # seconds a breach must last before alerting
+    ALERT_FLUSH_INTERVAL: float = 10.0  # seconds between AlertRecord writes
 
     class Config:
         env_file = ".env"
@@ -1,22 +1,94 @@
 """
 Database configuration and initialization
+
+Two engines share the database file:
+
+- ``engine``: a single read-write connection. SQLite allows one writer at a
+  time, so the history recorder, retention and the write routes queue on
+  this connection instead of contending for the file lock.
+- ``read_engine``: a pool of ``query_only`` connections for history and
+  other read routes. In WAL mode they read concurrently with the writer.
 """
 
 import logging
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from typing import Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import (
+    create_async_engine,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
 from sqlalchemy.orm import DeclarativeBase
 
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
-# Create async engine
-engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG, future=True)
 
-# Create async session factory
+def _sqlite_pragmas(read_only: bool):
+    """Connect hook applying the configured SQLite profile"""
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not read_only:
+            # Lets retention return freed pages to the filesystem; only takes
+            # effect while the database is still empty, so it must come first
+            # (init_db converts older databases with a one-time VACUUM)
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+    return on_connect
+
+
+def create_engines(database_url: str) -> Tuple[AsyncEngine, AsyncEngine]:
+    """Create the (writer, reader) engine pair for ``database_url``"""
+    url = make_url(database_url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    if not is_sqlite or url.database in (None, "", ":memory:"):
+        # An in-memory database only exists on its own connection
+        writer = create_async_engine(
+            database_url, echo=settings.DATABASE_ECHO, future=True
+        )
+        return writer, writer
+
+    engines = []
+    for read_only, pool_size in ((False, 1), (True, settings.DATABASE_READ_POOL_SIZE)):
+        # aiosqlite defaults to NullPool, reconnecting (and re-applying the
+        # pragmas) for every session; keep a fixed set of connections open
+        new_engine = create_async_engine(
+            database_url,
+            echo=settings.DATABASE_ECHO,
+            future=True,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=pool_size,
+            max_overflow=0,
+        )
+        event.listen(new_engine.sync_engine, "connect", _sqlite_pragmas(read_only))
+        engines.append(new_engine)
+    return engines[0], engines[1]
+
+
+# Create async engines
+engine, read_engine = create_engines(settings.DATABASE_URL)
+
+# Create async session factories
 AsyncSessionLocal = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
+ReadSessionLocal = async_sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False
+)
 
 
 class Base(DeclarativeBase):
@@ -30,16 +102,47 @@ async def init_db():
     try:
         async with engine.begin() as conn:
             # Import all models to ensure they are registered
-            # from . import models
+            from . import models  # noqa: F401
+
             # Create all tables
             await conn.run_sync(Base.metadata.create_all)
 
+        if settings.SQLITE_CONVERT_AUTO_VACUUM:
+            await _convert_auto_vacuum()
+
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
         raise
 
 
+async def _convert_auto_vacuum():
+    """Switch an existing SQLite database to incremental auto-vacuum.
+
+    ``auto_vacuum`` only changes on an existing database when it is rebuilt
+    by a full ``VACUUM``, which holds the writer for the whole rewrite; run
+    it once at startup, before the recorder and routes use the database.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql("PRAGMA auto_vacuum")
+        if result.scalar() != 0:  # already FULL or INCREMENTAL
+            return
+        logger.info("Converting the database to incremental auto-vacuum (VACUUM)")
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.executescript(
+            "PRAGMA auto_vacuum = INCREMENTAL; VACUUM"
+        )
+
+
+async def close_db():
+    """Close every pooled connection"""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+
 async def get_db() -> AsyncSession:
     """Get database session"""
     async with AsyncSessionLocal() as session:
@@ -47,3 +150,12 @@ async def get_db() -> AsyncSession:
             yield session
         finally:
             await session.close()
+
+
+async def get_read_db() -> AsyncSession:
+    """Get a read-only database session for queries"""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
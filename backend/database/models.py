@@ -2,7 +2,20 @@
 SQLAlchemy database models
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, JSON
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Float,
+    DateTime,
+    Boolean,
+    Text,
+    JSON,
+    LargeBinary,
+    ForeignKey,
+    Index,
+    UniqueConstraint,
+)
 from sqlalchemy.sql import func
 
 from .database import Base
@@ -28,6 +41,47 @@ class HardwareDataRecord(Base):
     raw_data = Column(JSON)  # Store complete data as JSON
 
 
+class HardwareRollupRecord(Base):
+    """Aggregated metric values for one time bucket of one rollup tier"""
+
+    __tablename__ = "hardware_rollups"
+    __table_args__ = (UniqueConstraint("tier", "metric", "bucket_start"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    tier = Column(Integer, nullable=False)  # Bucket width in seconds
+    metric = Column(String, nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    count = Column(Integer, nullable=False)
+    min = Column(Float)
+    max = Column(Float)
+    avg = Column(Float)
+    last = Column(Float)
+
+
+class HistorySensorRecord(Base):
+    """Dictionary of sensor paths stored in the columnar history"""
+
+    __tablename__ = "history_sensors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    path = Column(String, unique=True, nullable=False)
+
+
+class HistoryBlockRecord(Base):
+    """One sensor's samples for one time block, as packed compressed arrays"""
+
+    __tablename__ = "history_blocks"
+    __table_args__ = (Index("ix_history_blocks_sensor_start", "sensor_id", "start"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    sensor_id = Column(Integer, ForeignKey("history_sensors.id"), nullable=False)
+    start = Column(DateTime, nullable=False)
+    end = Column(DateTime, nullable=False, index=True)
+    count = Column(Integer, nullable=False)
+    timestamps = Column(LargeBinary, nullable=False)  # zlib int32 ms offsets
+    values = Column(LargeBinary, nullable=False)  # zlib float64
+
+
 class AlertRecord(Base):
     """Alert record for storing system alerts"""
 
@@ -7,14 +7,25 @@ FastAPI application with WebSocket support for real-time hardware monitoring
 import asyncio
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, WebSocket
+from typing import Optional
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from config.settings import settings
-from database.database import init_db
+from database.database import close_db, init_db
+from services.alert_engine import AlertEngine
 from services.hardware_monitor import HardwareMonitor
-from services.websocket_manager import WebSocketManager
+from services.history_recorder import HistoryRecorder
+from services.retention import RetentionService
+from services.settings_cache import SettingsCache
+from services.websocket_manager import (
+    PROTOCOL_JSON,
+    PROTOCOLS,
+    SUBPROTOCOLS,
+    WebSocketManager,
+    parse_duration,
+)
 from api.routes import hardware, dashboard, settings as settings_routes
 
 # Configure logging
@@ -25,7 +36,13 @@ logger = logging.getLogger(__name__)
 
 # Global instances
 hardware_monitor = HardwareMonitor()
-websocket_manager = WebSocketManager()
+websocket_manager = WebSocketManager(hardware_monitor.recent)
+history_recorder = HistoryRecorder(hardware_monitor)
+retention_service = RetentionService(active_sensor_paths=history_recorder.sensor_paths)
+settings_cache = SettingsCache()
+alert_engine = AlertEngine(
+    hardware_monitor, settings_cache, websocket_manager.broadcast_alert
+)
 
 
 @asynccontextmanager
@@ -34,7 +51,13 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting PC Hardware Monitoring Dashboard")
     await init_db()
+    await settings_cache.load()
     await hardware_monitor.start()
+    if settings.HISTORY_ENABLED:
+        await history_recorder.start()
+    await retention_service.start()
+    if settings.ALERTS_ENABLED:
+        await alert_engine.start()
 
     # Start background task for WebSocket data broadcasting
     broadcast_task = asyncio.create_task(broadcast_hardware_data())
@@ -44,7 +67,16 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down PC Hardware Monitoring Dashboard")
     broadcast_task.cancel()
+    try:
+        await broadcast_task
+    except asyncio.CancelledError:
+        pass
+    await websocket_manager.close_all()
+    await alert_engine.stop()
+    await retention_service.stop()
+    await history_recorder.stop()
     await hardware_monitor.stop()
+    await close_db()
 
 
 # Create FastAPI application
@@ -87,29 +119,80 @@ async def health_check():
         "status": "healthy",
         "monitoring": hardware_monitor.is_running(),
         "connected_clients": len(websocket_manager.active_connections),
+        "websocket": websocket_manager.get_stats(),
     }
 
 
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time hardware data"""
-    await websocket.accept()
-    while True:
-        data = await hardware_monitor.get_current_data()  # From PyHardwareMonitor
-        await websocket.send_json(data.model_dump())
-        await asyncio.sleep(settings.WEBSOCKET_UPDATE_INTERVAL)  # Poll interval
+async def websocket_endpoint(
+    websocket: WebSocket,
+    protocol: str = PROTOCOL_JSON,
+    backfill: Optional[str] = None,
+):
+    """WebSocket endpoint for real-time hardware data
+
+    ``?protocol=`` selects the stream format: ``json`` (default), ``delta``,
+    ``packed`` or ``msgpack``. Binary formats can also be negotiated through
+    the WebSocket subprotocols ``hwmon.packed.v1`` / ``hwmon.msgpack.v1``.
+
+    ``?backfill=300s`` first sends the recent samples held in memory as one
+    ``backfill`` frame (timestamps plus one value list per sensor path),
+    followed by live updates starting after its last sample.
+
+    Clients can send ``subscribe`` messages to receive only selected sensor
+    paths (see ``services.topics``), ``{"type": "rate", "interval": s,
+    "coalesce": "latest" | "minmax"}`` to choose their own update rate and
+    ``{"type": "visibility", "hidden": true}`` while their tab is hidden.
+    """
+    subprotocol = next(
+        (
+            name
+            for name in websocket.scope.get("subprotocols", [])
+            if SUBPROTOCOLS.get(name) in PROTOCOLS
+        ),
+        None,
+    )
+    if subprotocol:
+        protocol = SUBPROTOCOLS[subprotocol]
+    elif protocol not in PROTOCOLS:
+        await websocket.close(code=1008, reason=f"Unknown protocol '{protocol}'")
+        return
+    try:
+        backfill_seconds = parse_duration(backfill) if backfill else 0.0
+    except ValueError:
+        await websocket.close(code=1008, reason=f"Invalid backfill '{backfill}'")
+        return
+
+    # Frames are fed by broadcast_hardware_data through the client's queue
+    connection = await websocket_manager.connect(websocket, protocol, subprotocol)
+    if backfill_seconds:
+        websocket_manager.send_backfill(
+            connection, hardware_monitor.recent, backfill_seconds
+        )
+    try:
+        while True:
+            message = await connection.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("text"):
+                websocket_manager.handle_message(connection, message["text"])
+    except WebSocketDisconnect:
+        pass
+    finally:
+        websocket_manager.disconnect(websocket)
 
 
 async def broadcast_hardware_data():
     """Background task to broadcast hardware data to WebSocket clients"""
+    seq = 0
     while True:
         try:
+            # Triggered by every new sample; the manager decides which
+            # clients are due an update (decimation, not per-client timers)
+            snapshot = await hardware_monitor.wait_for_snapshot(seq)
+            seq = snapshot.seq
             if websocket_manager.active_connections:
-                hardware_data = await hardware_monitor.get_current_data()
-                if hardware_data:
-                    await websocket_manager.broadcast(hardware_data.model_dump())
-
-            await asyncio.sleep(settings.WEBSOCKET_UPDATE_INTERVAL)
+                await websocket_manager.broadcast_snapshot(snapshot)
         except Exception as e:
             logger.error(f"Error broadcasting hardware data: {e}")
             await asyncio.sleep(1)
@@ -132,3 +132,12 @@ class Alert(BaseModel):
     severity: str = Field(..., description="Alert severity (info, warning, critical)")
     message: str = Field(..., description="Alert message")
     acknowledged: bool = Field(False, description="Whether alert is acknowledged")
+
+
+class MetricSeries(BaseModel):
+    """Time series of a single metric"""
+
+    metric: str = Field(..., description="Metric or sensor path")
+    method: str = Field(..., description="Downsampling method (none, lttb, minmax)")
+    timestamps: List[float] = Field(..., description="Unix timestamps in seconds")
+    values: List[float] = Field(..., description="Values, aligned with timestamps")
@@ -0,0 +1,331 @@
+"""
+Server-side alert evaluation on the live sample stream
+"""
+
+import asyncio
+import logging
+import math
+import time
+import uuid
+from itertools import repeat
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from config.settings import settings
+from database.database import engine
+from database.models import AlertRecord
+from models.hardware import Alert, AlertThreshold
+from services.hardware_monitor import HardwareMonitor, SnapshotSubscription
+from services.settings_cache import THRESHOLD_PREFIX, SettingsCache
+from services.snapshot import Snapshot
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logging.debug("numpy not available - using pure Python alert checks")
+
+logger = logging.getLogger(__name__)
+
+
+def default_thresholds() -> Dict[str, AlertThreshold]:
+    """Thresholds configured through ``Settings``, keyed by metric"""
+    return {
+        metric: AlertThreshold(metric=metric, threshold=value)
+        for metric, value in (
+            ("cpu.temperature", settings.CPU_TEMP_THRESHOLD),
+            ("gpu.temperature", settings.GPU_TEMP_THRESHOLD),
+            ("cpu.usage", settings.CPU_USAGE_THRESHOLD),
+            ("gpu.usage", settings.GPU_USAGE_THRESHOLD),
+            ("memory.usage", settings.MEMORY_USAGE_THRESHOLD),
+            ("storage.max_usage", settings.DISK_USAGE_THRESHOLD),
+        )
+    }
+
+
+class AlertRules:
+    """Enabled thresholds compiled into parallel arrays.
+
+    Each rule is evaluated as ``sign * (value - threshold) > 0`` with
+    ``sign`` = 1 for "greater" and -1 for "less", so every rule is checked
+    by the same few array operations per tick. A rule fires once a breach
+    has lasted ``min_duration`` seconds and resolves when the value moves
+    ``hysteresis`` back past the threshold.
+    """
+
+    def __init__(
+        self,
+        thresholds: List[AlertThreshold],
+        hysteresis: float = settings.ALERT_HYSTERESIS,
+        min_duration: float = settings.ALERT_MIN_DURATION,
+    ):
+        rules = [t for t in thresholds if t.enabled]
+        self.rules = rules
+        self.metrics = [rule.metric for rule in rules]
+        self.thresholds = [float(rule.threshold) for rule in rules]
+        self.signs = [-1.0 if rule.comparison == "less" else 1.0 for rule in rules]
+        self.min_duration = min_duration
+
+        # A rule resolves once sign * (value - clear_at) < 0
+        self.clear_at = [
+            threshold - sign * hysteresis
+            for threshold, sign in zip(self.thresholds, self.signs)
+        ]
+        self.active = [False] * len(rules)
+        self.pending_since = [math.nan] * len(rules)
+
+        if NUMPY_AVAILABLE:
+            self._thresholds = np.array(self.thresholds)
+            self._signs = np.array(self.signs)
+            self._clear_at = np.array(self.clear_at)
+            self._active = np.zeros(len(rules), dtype=bool)
+            self._pending_since = np.full(len(rules), np.nan)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def check(self, values: Dict[str, float], now: float):
+        """Advance every rule by one sample; return (fired, resolved) indices"""
+        sample = map(values.get, self.metrics, repeat(math.nan))
+        if NUMPY_AVAILABLE:
+            return self._check_numpy(np.fromiter(sample, float, len(self)), now)
+        return self._check_python(list(sample), now)
+
+    def _check_numpy(self, sample, now: float):
+        # NaN (sensor missing this tick) compares False: state is kept
+        breach = self._signs * (sample - self._thresholds) > 0
+        clear = self._signs * (sample - self._clear_at) < 0
+        active = self._active
+        pending = self._pending_since
+
+        starting = breach & ~active & np.isnan(pending)
+        pending[starting] = now
+        pending[~breach & ~active & ~np.isnan(sample)] = np.nan
+        fired = ~active & breach & (now - pending >= self.min_duration)
+        resolved = active & clear
+        active[fired] = True
+        active[resolved] = False
+        pending[fired | resolved] = np.nan
+        return np.flatnonzero(fired).tolist(), np.flatnonzero(resolved).tolist()
+
+    def _check_python(self, sample, now: float):
+        fired, resolved = [], []
+        active, pending = self.active, self.pending_since
+        for i, value in enumerate(sample):
+            if value != value:  # NaN
+                continue
+            sign = self.signs[i]
+            if active[i]:
+                if sign * (value - self.clear_at[i]) < 0:
+                    active[i] = False
+                    resolved.append(i)
+            elif sign * (value - self.thresholds[i]) > 0:
+                if pending[i] != pending[i]:
+                    pending[i] = now
+                if now - pending[i] >= self.min_duration:
+                    active[i] = True
+                    pending[i] = math.nan
+                    fired.append(i)
+            else:
+                pending[i] = math.nan
+        return fired, resolved
+
+    def carry_over(self, previous: "AlertRules"):
+        """Keep the state of rules that ``previous`` had unchanged.
+
+        A rule is unchanged when its metric, threshold and comparison are;
+        its raised alert then stays raised instead of firing again.
+        """
+        if NUMPY_AVAILABLE:
+            old_active, old_pending = previous._active, previous._pending_since
+            active, pending = self._active, self._pending_since
+        else:
+            old_active, old_pending = previous.active, previous.pending_since
+            active, pending = self.active, self.pending_since
+        index = {
+            key: i
+            for i, key in enumerate(
+                zip(previous.metrics, previous.thresholds, previous.signs)
+            )
+        }
+        for i, key in enumerate(zip(self.metrics, self.thresholds, self.signs)):
+            j = index.get(key)
+            if j is not None:
+                active[i] = old_active[j]
+                pending[i] = old_pending[j]
+
+    def active_metrics(self) -> List[str]:
+        """Metrics whose alert is currently raised"""
+        active = self._active.tolist() if NUMPY_AVAILABLE else self.active
+        return [metric for metric, on in zip(self.metrics, active) if on]
+
+
+class AlertEngine:
+    """Evaluates compiled alert rules against every monitor snapshot.
+
+    Fired alerts are broadcast immediately and buffered as ``AlertRecord``
+    rows, which are written in one batch every ``flush_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        monitor: HardwareMonitor,
+        settings_cache: SettingsCache,
+        broadcast: Callable[[Dict[str, Any]], Awaitable[None]],
+        flush_interval: float = settings.ALERT_FLUSH_INTERVAL,
+    ):
+        self._monitor = monitor
+        self._settings_cache = settings_cache
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        self._broadcast = broadcast
+        self._flush_interval = flush_interval
+        self._rules = AlertRules([])
+        self._records: List[Dict[str, Any]] = []
+        self._subscription: Optional[SnapshotSubscription] = None
+        self._tasks = []
+
+        self.evaluations = 0
+        self.dropped = 0
+        self.fired = 0
+        self.resolved = 0
+        self.last_check_us: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    async def start(self):
+        """Load thresholds and start evaluating snapshots"""
+        if self._tasks:
+            return
+        logger.info("Starting alert engine")
+        self.reload()
+        self._unsubscribe = self._settings_cache.subscribe(self._on_setting_changed)
+        self._subscription = self._monitor.subscribe()
+        self._tasks = [
+            asyncio.create_task(self._evaluate_loop()),
+            asyncio.create_task(self._flush_loop()),
+        ]
+
+    async def stop(self):
+        """Stop evaluating and write any buffered alert records"""
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._subscription:
+            self._monitor.unsubscribe(self._subscription)
+            self.dropped += self._subscription.dropped
+            self._subscription = None
+        await self.flush()
+
+    def reload(self):
+        """Recompile rules from settings and cached ``alert_threshold_*`` rows"""
+        thresholds = default_thresholds()
+        thresholds.update(self._settings_cache.thresholds())
+        self.set_thresholds(list(thresholds.values()))
+
+    def _on_setting_changed(self, key: str, value: Any):
+        if key.startswith(THRESHOLD_PREFIX):
+            self.reload()
+
+    def set_thresholds(self, thresholds: List[AlertThreshold]):
+        """Replace the rule set; only changed rules start from a fresh state"""
+        rules = AlertRules(thresholds)
+        rules.carry_over(self._rules)
+        self._rules = rules
+        logger.info(f"Alert engine loaded {len(self._rules)} rules")
+
+    async def _evaluate_loop(self):
+        while True:
+            snapshot = await self._subscription.get()
+            try:
+                await self.evaluate(snapshot)
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Error evaluating alerts: {e}")
+
+    async def evaluate(self, snapshot: Snapshot):
+        """Check one snapshot against every rule"""
+        rules = self._rules
+        values = snapshot.sensor_values
+        start = time.perf_counter()
+        fired, resolved = rules.check(values, snapshot.collected_at)
+        self.last_check_us = round((time.perf_counter() - start) * 1e6, 1)
+        self.evaluations += 1
+
+        for i in resolved:
+            self.resolved += 1
+            logger.info(f"Alert resolved: {rules.metrics[i]}")
+        for i in fired:
+            self.fired += 1
+            alert = self._make_alert(
+                rules.rules[i], values[rules.metrics[i]], snapshot.timestamp
+            )
+            self._records.append(
+                {
+                    "alert_id": alert.id,
+                    "timestamp": alert.timestamp,
+                    "metric": alert.metric,
+                    "value": alert.value,
+                    "threshold": alert.threshold,
+                    "severity": alert.severity,
+                    "message": alert.message,
+                }
+            )
+            logger.warning(alert.message)
+            await self._broadcast(alert.model_dump(mode="json"))
+
+    @staticmethod
+    def _make_alert(rule: AlertThreshold, value: float, timestamp: datetime) -> Alert:
+        direction = "below" if rule.comparison == "less" else "above"
+        return Alert(
+            id=uuid.uuid4().hex,
+            timestamp=timestamp,
+            metric=rule.metric,
+            value=value,
+            threshold=rule.threshold,
+            severity="warning",
+            message=f"{rule.metric} is {value:.1f}, {direction} {rule.threshold:g}",
+        )
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        """Write buffered alert records in one transaction"""
+        if not self._records:
+            return
+        records, self._records = self._records, []
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(insert(AlertRecord), records)
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Error writing alert records: {e}")
+            self._records[:0] = records
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Rule and evaluation statistics"""
+        return {
+            "rules": len(self._rules),
+            "active": self._rules.active_metrics(),
+            "evaluations": self.evaluations,
+            "dropped": self.dropped
+            + (self._subscription.dropped if self._subscription else 0),
+            "fired": self.fired,
+            "resolved": self.resolved,
+            "pending_records": len(self._records),
+            "last_check_us": self.last_check_us,
+            "last_error": self.last_error,
+        }
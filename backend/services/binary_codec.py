@@ -0,0 +1,124 @@
+"""
+Packed binary frames for the live stream
+
+A schema (JSON text frame) is sent when a client subscribes and whenever
+the document layout changes::
+
+    {"type": "schema", "id": 3, "f64": [paths], "f32": [paths],
+     "strings": {path: value}}
+
+Every update is then one binary frame::
+
+    <u32 schema id> <u32 seq> <f64 unix timestamp>
+    <f64 x len(f64)> <f32 x len(f32)>
+
+all little-endian. Integer counters (bytes/packets) use float64 so they stay
+exact; every other number is float32, with NaN for missing values. Both
+blocks start at 8-byte aligned offsets so clients can decode them as typed
+array views without copying.
+"""
+
+import struct
+import sys
+from array import array
+from functools import cached_property
+from typing import Any, Dict, List, Tuple
+
+from services.encoding import encode_json
+from services.metrics import flatten
+from services.snapshot import Snapshot
+
+HEADER = struct.Struct("<IId")
+NAN = float("nan")
+
+
+class PackedFrames:
+    """Encoded packed frames for one tick, shared by every packed client"""
+
+    def __init__(
+        self,
+        schema: Dict[str, Any],
+        schema_changed: bool,
+        seq: int,
+        timestamp: float,
+        f64: List[float],
+        f32: List[float],
+    ):
+        self._schema = schema
+        self.schema_changed = schema_changed
+        self._seq = seq
+        self._timestamp = timestamp
+        self._f64 = f64
+        self._f32 = f32
+
+    @cached_property
+    def schema(self) -> str:
+        """The schema describing ``frame``'s layout"""
+        return encode_json(self._schema)
+
+    @cached_property
+    def frame(self) -> bytes:
+        """The binary update frame"""
+        f64 = array("d", self._f64)
+        f32 = array("f", self._f32)
+        if sys.byteorder == "big":
+            f64.byteswap()
+            f32.byteswap()
+        return (
+            HEADER.pack(self._schema["id"], self._seq, self._timestamp)
+            + f64.tobytes()
+            + f32.tobytes()
+        )
+
+
+class PackedEncoder:
+    """Maintains the current packed layout and encodes snapshots against it"""
+
+    def __init__(self):
+        self._signature: Tuple = ()
+        self._schema: Dict[str, Any] = {}
+        self._schema_id = 0
+
+    def encode(self, snapshot: Snapshot) -> PackedFrames:
+        """Encode ``snapshot``, producing a new schema if the layout changed"""
+        document = dict(snapshot.document)
+        del document["timestamp"]
+
+        f64_paths, f64 = [], []
+        f32_paths, f32 = [], []
+        strings = {}
+        for path, value in flatten(document).items():
+            if isinstance(value, bool):
+                f32_paths.append(path)
+                f32.append(float(value))
+            elif isinstance(value, int):
+                f64_paths.append(path)
+                f64.append(float(value))
+            elif isinstance(value, float) or value is None:
+                f32_paths.append(path)
+                f32.append(NAN if value is None else value)
+            else:
+                # Names, empty lists/objects: static, carried by the schema
+                strings[path] = value
+
+        signature = (tuple(f64_paths), tuple(f32_paths), tuple(strings.items()))
+        schema_changed = signature != self._signature
+        if schema_changed:
+            self._signature = signature
+            self._schema_id += 1
+            self._schema = {
+                "type": "schema",
+                "id": self._schema_id,
+                "f64": f64_paths,
+                "f32": f32_paths,
+                "strings": strings,
+            }
+
+        return PackedFrames(
+            schema=self._schema,
+            schema_changed=schema_changed,
+            seq=snapshot.seq,
+            timestamp=snapshot.timestamp.timestamp(),
+            f64=f64,
+            f32=f32,
+        )
@@ -0,0 +1,62 @@
+"""
+Hardware collector backends
+
+Backends are imported lazily so that heavy, platform-specific dependencies
+(pythonnet/LibreHardwareMonitor) are only loaded when that backend is chosen.
+"""
+
+import importlib
+import platform
+
+from config.settings import settings
+from .base import CollectorSession
+
+# backend name -> (module, class)
+COLLECTOR_BACKENDS = {
+    "libre": ("services.collectors.libre_collector", "LibreHardwareSession"),
+    "psutil": ("services.collectors.psutil_collector", "PsutilSession"),
+    "sysfs": ("services.collectors.sysfs_collector", "SysfsSession"),
+    "replay": ("services.collectors.replay_collector", "ReplaySession"),
+}
+
+
+def default_backend() -> str:
+    """Pick the best backend for the current platform"""
+    system = platform.system()
+    if system == "Windows":
+        return "libre"
+    if system == "Linux":
+        return "sysfs"
+    return "psutil"
+
+
+def resolve_backend(name: str = None) -> str:
+    """Resolve the named (or configured) backend, raising ValueError if unknown"""
+    name = name or settings.COLLECTOR_BACKEND
+    if name == "auto":
+        name = default_backend()
+    if name not in COLLECTOR_BACKENDS:
+        raise ValueError(
+            f"Unknown collector backend '{name}'. "
+            f"Available: auto, {', '.join(COLLECTOR_BACKENDS)}"
+        )
+    return name
+
+
+def create_collector(name: str = None) -> CollectorSession:
+    """Create a collector session for the named (or configured) backend"""
+    name = resolve_backend(name)
+    module_name, class_name = COLLECTOR_BACKENDS[name]
+    session_class = getattr(importlib.import_module(module_name), class_name)
+    if name == "replay":
+        return session_class(replay_file=settings.REPLAY_FILE)
+    return session_class()
+
+
+__all__ = [
+    "COLLECTOR_BACKENDS",
+    "CollectorSession",
+    "create_collector",
+    "default_backend",
+    "resolve_backend",
+]
@@ -0,0 +1,111 @@
+"""
+Base class for long-lived hardware collector sessions
+"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any
+
+from services.sample import Sample
+
+logger = logging.getLogger(__name__)
+
+
+class CollectorSession(ABC):
+    """Long-lived handle on a hardware data source.
+
+    A session is opened once, enumerates the available devices lazily and
+    then only refreshes sensor values on every ``collect()`` call. Device
+    enumeration is repeated only after ``invalidate()`` (hotplug), after a
+    failed read, or when a backend without hotplug notifications reports a
+    different ``_device_signature()``, checked every ``rescan_interval``
+    seconds.
+
+    Samples are returned as compact ``Sample`` arrays; a session typically
+    builds its ``SampleSchema`` during enumeration.
+    """
+
+    name = "base"
+    rescan_interval = 0.0  # seconds between device checks; 0 never checks
+
+    def __init__(self):
+        self._opened = False
+        self._stale = True
+        self._signature: Any = None
+        self._checked_at = 0.0
+        self.enumerations = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Check if the session is open"""
+        return self._opened
+
+    def open(self):
+        """Open the underlying data source"""
+        if self._opened:
+            return
+        self._open()
+        self._opened = True
+        self._stale = True
+
+    def close(self):
+        """Close the underlying data source"""
+        if not self._opened:
+            return
+        try:
+            self._close()
+        finally:
+            self._opened = False
+
+    def invalidate(self):
+        """Force device re-enumeration on the next collection"""
+        self._stale = True
+
+    def collect(self) -> Sample:
+        """Refresh sensor values and return a new sample"""
+        if not self._opened:
+            self.open()
+
+        now = time.monotonic()
+        if (
+            not self._stale
+            and self.rescan_interval
+            and now - self._checked_at >= self.rescan_interval
+        ):
+            self._checked_at = now
+            if self._device_signature() != self._signature:
+                logger.info(f"Devices changed, re-enumerating '{self.name}' collector")
+                self._stale = True
+
+        if self._stale:
+            self._enumerate()
+            self._stale = False
+            self._signature = self._device_signature()
+            self._checked_at = now
+            self.enumerations += 1
+
+        try:
+            return self._read()
+        except Exception:
+            # The hardware tree may no longer match reality; rebuild it.
+            self._stale = True
+            raise
+
+    def _open(self):
+        """Acquire the data source (called once per session)"""
+
+    def _close(self):
+        """Release the data source"""
+
+    def _device_signature(self) -> Any:
+        """Cheap summary of the attached devices (None: cannot tell)"""
+        return None
+
+    @abstractmethod
+    def _enumerate(self):
+        """Discover devices and cache everything that does not change per tick"""
+
+    @abstractmethod
+    def _read(self) -> Sample:
+        """Read the current sensor values from the enumerated devices"""
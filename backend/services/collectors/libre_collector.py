@@ -0,0 +1,310 @@
+"""
+LibreHardwareMonitor collector session (Windows, via pythonnet)
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from HardwareMonitor import clr
+
+clr.AddReference("LibreHardwareMonitorLib")
+from LibreHardwareMonitor import Hardware
+
+from services.sample import LAYOUT, Sample, SampleSchema, get_schema
+from .base import CollectorSession
+
+logger = logging.getLogger(__name__)
+
+
+class SensorRule(NamedTuple):
+    """Maps sensors of one type whose name contains a substring to a field"""
+
+    sensor_type: str  # Hardware.SensorType member name
+    name_contains: str
+    field: str
+    many: bool = False  # append every match to a list instead of keeping the last
+
+
+class SensorGroup(NamedTuple):
+    """Declarative mapping from hardware devices to one HardwareData section"""
+
+    section: str
+    hardware_types: Tuple[str, ...]  # Hardware.HardwareType member names
+    rules: Tuple[SensorRule, ...]
+    defaults: Dict[str, Any]
+    first_only: bool = True  # only the first matching device is used
+
+
+SENSOR_GROUPS = (
+    SensorGroup(
+        "cpu",
+        ("Cpu",),
+        (
+            SensorRule("Load", "CPU Total", "usage"),
+            SensorRule("Temperature", "CPU Package", "temperature"),
+            SensorRule("Clock", "CPU Core #1", "frequency"),
+            SensorRule("Load", "Core", "cores", many=True),
+        ),
+        {"usage": 0, "temperature": 0, "frequency": 0},
+    ),
+    SensorGroup(
+        "gpu",
+        ("GpuNvidia", "GpuAmd"),
+        (
+            SensorRule("Load", "GPU Total", "usage"),
+            SensorRule("Temperature", "GPU Core", "temperature"),
+            SensorRule("Load", "GPU Memory", "memory_usage"),
+            SensorRule("Power", "GPU Power", "power_usage"),
+            SensorRule("Fan", "GPU Fan", "fan_speed"),
+        ),
+        {
+            "usage": 0,
+            "temperature": 0,
+            "memory_usage": 0,
+            "power_usage": None,
+            "fan_speed": None,
+        },
+    ),
+    SensorGroup(
+        "memory",
+        ("Memory",),
+        (
+            SensorRule("Load", "Memory", "usage"),
+            SensorRule("Available", "Memory", "available"),
+            SensorRule("Cached", "Memory", "cached"),
+            SensorRule("Load", "Swap", "swap_usage"),
+        ),
+        {"usage": 0, "available": 0, "cached": 0, "swap_usage": 0},
+    ),
+    SensorGroup(
+        "storage",
+        ("Storage",),
+        (
+            SensorRule("Load", "Storage", "usage"),
+            SensorRule("Read", "Storage", "read_speed"),
+            SensorRule("Write", "Storage", "write_speed"),
+            SensorRule("Temperature", "Storage", "temperature"),
+        ),
+        {"usage": 0, "read_speed": 0, "write_speed": 0, "temperature": None},
+        first_only=False,
+    ),
+    SensorGroup(
+        "network",
+        ("Network",),
+        (
+            SensorRule("BytesSent", "Network", "bytes_sent"),
+            SensorRule("BytesRecv", "Network", "bytes_recv"),
+            SensorRule("PacketsSent", "Network", "packets_sent"),
+            SensorRule("PacketsRecv", "Network", "packets_recv"),
+        ),
+        {"bytes_sent": 0, "bytes_recv": 0, "packets_sent": 0, "packets_recv": 0},
+    ),
+)
+
+# Hardware types whose sensors are all reported as generic readings
+READING_GROUPS = {
+    "Temperature": "temperatures",
+    "Fan": "fans",
+    "Voltage": "voltages",
+}
+
+
+class DeviceSlots(NamedTuple):
+    """Value slots of one enumerated device"""
+
+    name: str
+    fields: Dict[str, int]  # field -> slot
+    lists: Dict[str, List[int]]  # list field -> slots, in sensor order
+
+
+class SensorIndex:
+    """Flat (sensor, slot) index compiled once per enumeration.
+
+    Each tick is a single linear pass copying ``sensor.Value`` into a
+    preallocated slot list; the sample sections are then filled from fixed
+    slot positions without any type or name matching.
+    """
+
+    def __init__(self, hardware_list: List[Any]):
+        self.entries: List[Tuple[Any, int]] = []
+        self.values: List[Any] = []
+        self.devices: Dict[str, List[DeviceSlots]] = {
+            group.section: [] for group in SENSOR_GROUPS
+        }
+        self.readings: Dict[str, List[Tuple[str, int]]] = {
+            section: [] for section in READING_GROUPS.values()
+        }
+
+        groups = [
+            (
+                group,
+                [getattr(Hardware.HardwareType, t) for t in group.hardware_types],
+                [
+                    (getattr(Hardware.SensorType, rule.sensor_type), rule)
+                    for rule in group.rules
+                ],
+            )
+            for group in SENSOR_GROUPS
+        ]
+        reading_types = {
+            getattr(Hardware.HardwareType, t): section
+            for t, section in READING_GROUPS.items()
+        }
+
+        for hardware_item in hardware_list:
+            hardware_type = hardware_item.HardwareType
+            for group, hardware_types, rules in groups:
+                if hardware_type not in hardware_types:
+                    continue
+                if group.first_only and self.devices[group.section]:
+                    continue
+                self.devices[group.section].append(
+                    self._compile_device(hardware_item, group, rules)
+                )
+
+            section = reading_types.get(hardware_type)
+            if section:
+                for sensor in hardware_item.Sensors:
+                    name = f"{sensor.Name} {sensor.Label or ''}".strip()
+                    self.readings[section].append((name, self._add(sensor, None)))
+
+    def _add(self, sensor: Any, default: Any) -> int:
+        slot = len(self.values)
+        self.values.append(default)
+        if sensor is not None:
+            self.entries.append((sensor, slot))
+        return slot
+
+    def _compile_device(
+        self,
+        hardware_item: Any,
+        group: SensorGroup,
+        rules: List[Tuple[Any, SensorRule]],
+    ) -> DeviceSlots:
+        matched: Dict[str, Any] = {}
+        lists: Dict[str, List[int]] = {rule.field: [] for _, rule in rules if rule.many}
+        for sensor in hardware_item.Sensors:
+            for sensor_type, rule in rules:
+                if (
+                    sensor.SensorType != sensor_type
+                    or rule.name_contains not in sensor.Name
+                ):
+                    continue
+                if rule.many:
+                    lists[rule.field].append(self._add(sensor, 0))
+                else:
+                    # Later matches win, as they did with per-tick matching
+                    matched[rule.field] = sensor
+
+        fields = {
+            field: self._add(matched.get(field), default)
+            for field, default in group.defaults.items()
+        }
+        return DeviceSlots(name=hardware_item.Name, fields=fields, lists=lists)
+
+    def read(self) -> List[Any]:
+        """Copy every indexed sensor value into its slot"""
+        values = self.values
+        for sensor, slot in self.entries:
+            values[slot] = sensor.Value
+        return values
+
+
+class LibreHardwareSession(CollectorSession):
+    """Collector session backed by a single long-lived ``Hardware.Computer``"""
+
+    name = "libre"
+
+    def __init__(self):
+        super().__init__()
+        self._computer = None
+        self._hardware: List[Any] = []
+        self._index: Optional[SensorIndex] = None
+        self._schema: Optional[SampleSchema] = None
+
+    def _open(self):
+        computer = Hardware.Computer()
+        computer.IsCpuEnabled = True
+        computer.IsGpuEnabled = True
+        computer.IsMemoryEnabled = True
+        computer.IsStorageEnabled = True
+        computer.IsNetworkEnabled = True
+        computer.Open()
+
+        # Hotplug: LibreHardwareMonitor raises these when devices come and go
+        computer.HardwareAdded += self._on_hardware_changed
+        computer.HardwareRemoved += self._on_hardware_changed
+        self._computer = computer
+
+    def _close(self):
+        computer, self._computer = self._computer, None
+        self._hardware = []
+        self._index = None
+        self._schema = None
+        if computer is not None:
+            computer.HardwareAdded -= self._on_hardware_changed
+            computer.HardwareRemoved -= self._on_hardware_changed
+            computer.Close()
+
+    def _on_hardware_changed(self, hardware):
+        logger.info(f"Hardware change detected ({hardware.Name}), re-enumerating")
+        self.invalidate()
+
+    def _enumerate(self):
+        self._hardware = list(self._computer.Hardware)
+        # Populate sensor lists before compiling the index
+        for h in self._hardware:
+            h.Update()
+        self._index = SensorIndex(self._hardware)
+        devices = self._index.devices
+        cpu = devices["cpu"]
+        self._schema = get_schema(
+            cores=len(cpu[0].lists["cores"]) if cpu else 0,
+            gpu=bool(devices["gpu"]),
+            storage=tuple(device.name for device in devices["storage"]),
+            **{
+                section: tuple(name for name, _ in readings)
+                for section, readings in self._index.readings.items()
+            },
+        )
+        logger.debug(
+            f"Enumerated {len(self._hardware)} hardware devices, "
+            f"{len(self._index.entries)} indexed sensors"
+        )
+
+    def _read(self) -> Sample:
+        for h in self._hardware:
+            h.Update()
+
+        index = self._index
+        v = index.read()
+        devices = index.devices
+        sample = Sample(self._schema, datetime.now())
+
+        cpu = devices["cpu"]
+        if cpu:
+            sample.set_fields("cpu", self._fields("cpu", cpu[0], v))
+            sample.set_column(
+                "cores", "usage", [v[slot] for slot in cpu[0].lists["cores"]]
+            )
+        else:
+            sample.set_fields("cpu", (0, 0, 0))
+
+        for section in ("gpu", "memory", "network"):
+            found = devices[section]
+            if found:
+                sample.set_fields(section, self._fields(section, found[0], v))
+            elif section != "gpu":
+                sample.set_fields(section, (0, 0, 0, 0))
+
+        for i, device in enumerate(devices["storage"]):
+            sample.set_fields("storage", self._fields("storage", device, v), i)
+        for section, readings in index.readings.items():
+            sample.set_column(section, "value", [v[slot] for _, slot in readings])
+        return sample
+
+    @staticmethod
+    def _fields(section: str, device: DeviceSlots, values: List[Any]) -> List[Any]:
+        """Values of one device's fields, in sample layout order"""
+        return [values[device.fields[field]] for field in LAYOUT[section][1]]
@@ -0,0 +1,156 @@
+"""
+Cross-platform collector session built on psutil
+"""
+
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import psutil
+
+from config.settings import settings
+from services.sample import Sample, get_schema
+from .base import CollectorSession
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class PsutilSession(CollectorSession):
+    """Collector session for hosts without LibreHardwareMonitor (e.g. Linux)"""
+
+    name = "psutil"
+    rescan_interval = settings.COLLECTOR_RESCAN_INTERVAL
+
+    def __init__(self):
+        super().__init__()
+        # (device, mountpoint, disk io counter name) per partition
+        self._partitions: List[Tuple[str, str, str]] = []
+        self._last_disk_io: Dict[str, Tuple[int, int]] = {}
+        self._last_disk_time = 0.0
+
+    def _open(self):
+        # The first cpu_percent() call only primes psutil's internal counters
+        psutil.cpu_percent(percpu=True)
+
+    def _enumerate(self):
+        partitions = []
+        disk_names = set((psutil.disk_io_counters(perdisk=True) or {}).keys())
+        for partition in psutil.disk_partitions():
+            try:
+                psutil.disk_usage(partition.mountpoint)
+            except (PermissionError, FileNotFoundError):
+                continue
+            disk = os.path.basename(partition.device)
+            partitions.append(
+                (
+                    partition.device,
+                    partition.mountpoint,
+                    disk if disk in disk_names else "",
+                )
+            )
+        self._partitions = partitions
+        self._last_disk_io = self._read_disk_io()
+        self._last_disk_time = time.monotonic()
+        logger.debug(f"Enumerated {len(partitions)} storage partitions")
+
+    def _device_signature(self):
+        return tuple((p.device, p.mountpoint) for p in psutil.disk_partitions())
+
+    def _read_disk_io(self) -> Dict[str, Tuple[int, int]]:
+        counters = psutil.disk_io_counters(perdisk=True) or {}
+        return {
+            disk: (counters[disk].read_bytes, counters[disk].write_bytes)
+            for _, _, disk in self._partitions
+            if disk in counters
+        }
+
+    def _read(self) -> Sample:
+        per_core = psutil.cpu_percent(percpu=True)
+        usage = sum(per_core) / len(per_core) if per_core else 0.0
+        freq = psutil.cpu_freq()
+        # CPUData requires a positive frequency; some VMs do not expose one
+        frequency = freq.current / 1000 if freq and freq.current else 0.001
+
+        memory = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+
+        now = time.monotonic()
+        elapsed = max(now - self._last_disk_time, 1e-6)
+        disk_io = self._read_disk_io()
+        storage = []
+        for device, mountpoint, disk in self._partitions:
+            read_speed = write_speed = 0.0
+            if disk in disk_io and disk in self._last_disk_io:
+                last_read, last_write = self._last_disk_io[disk]
+                read_bytes, write_bytes = disk_io[disk]
+                read_speed = max(read_bytes - last_read, 0) / MB / elapsed
+                write_speed = max(write_bytes - last_write, 0) / MB / elapsed
+            usage_percent = psutil.disk_usage(mountpoint).percent
+            storage.append((device, (usage_percent, read_speed, write_speed, None)))
+        self._last_disk_io = disk_io
+        self._last_disk_time = now
+
+        net = psutil.net_io_counters()
+        # One hwmon scan per tick, shared by the CPU and sensor readings
+        chips = (
+            psutil.sensors_temperatures()
+            if hasattr(psutil, "sensors_temperatures")
+            else {}
+        )
+        temperatures, fans = self._read_sensors(chips)
+
+        schema = get_schema(
+            cores=len(per_core),
+            storage=tuple(device for device, _ in storage),
+            temperatures=tuple(name for name, _ in temperatures),
+            fans=tuple(name for name, _ in fans),
+        )
+        sample = Sample(schema, datetime.now())
+        sample.set_fields("cpu", (usage, self._read_cpu_temperature(chips), frequency))
+        sample.set_column("cores", "usage", per_core)
+        sample.set_fields(
+            "memory",
+            (
+                memory.percent,
+                memory.available / MB,
+                getattr(memory, "cached", 0) / MB,
+                swap.percent,
+            ),
+        )
+        for i, (_, fields) in enumerate(storage):
+            sample.set_fields("storage", fields, i)
+        sample.set_fields(
+            "network",
+            (net.bytes_sent, net.bytes_recv, net.packets_sent, net.packets_recv),
+        )
+        sample.set_column("temperatures", "value", [value for _, value in temperatures])
+        sample.set_column("fans", "value", [value for _, value in fans])
+        return sample
+
+    @staticmethod
+    def _read_cpu_temperature(chips: Dict[str, list]):
+        for chip in ("coretemp", "k10temp", "zenpower", "cpu_thermal"):
+            if chips.get(chip):
+                return chips[chip][0].current
+        return None
+
+    def _read_sensors(
+        self, chips: Dict[str, list]
+    ) -> Tuple[List[Tuple[str, float]], ...]:
+        """(name, value) of every temperature sensor in ``chips`` and every fan"""
+        temperatures = []
+        fans = []
+        for chip, entries in chips.items():
+            for entry in entries:
+                temperatures.append(
+                    (f"{chip} {entry.label or ''}".strip(), entry.current)
+                )
+        if hasattr(psutil, "sensors_fans"):
+            for chip, entries in psutil.sensors_fans().items():
+                for entry in entries:
+                    fans.append((f"{chip} {entry.label or ''}".strip(), entry.current))
+        return temperatures, fans
@@ -0,0 +1,116 @@
+"""
+Replay/synthetic collector session for development, demos and benchmarks
+"""
+
+import json
+import logging
+import math
+from datetime import datetime
+from typing import List, Optional
+
+from models.hardware import HardwareData
+from services.sample import Sample, SampleSchema, get_schema
+from .base import CollectorSession
+
+logger = logging.getLogger(__name__)
+
+
+class ReplaySession(CollectorSession):
+    """Replays recorded samples, or synthesizes deterministic ones.
+
+    With ``replay_file`` set, each line of the file must be a JSON-encoded
+    ``HardwareData`` document (as produced by ``model_dump_json()``); samples
+    are replayed in a loop with fresh timestamps. Without a file, smooth
+    synthetic waveforms are generated for ``cores`` CPU cores and
+    ``sensors`` temperature/fan/voltage readings each.
+    """
+
+    name = "replay"
+
+    def __init__(
+        self, replay_file: Optional[str] = None, cores: int = 8, sensors: int = 4
+    ):
+        super().__init__()
+        self._replay_file = replay_file
+        self._cores = cores
+        self._sensors = sensors
+        self._recorded: List[Sample] = []
+        self._position = 0
+        self._tick = 0
+        self._schema: Optional[SampleSchema] = None
+
+    def _enumerate(self):
+        self._recorded = []
+        self._position = 0
+        self._schema = get_schema(
+            cores=self._cores,
+            gpu=True,
+            storage=("/dev/synthetic0",),
+            temperatures=tuple(f"Temp #{i + 1}" for i in range(self._sensors)),
+            fans=tuple(f"Fan #{i + 1}" for i in range(self._sensors)),
+            voltages=tuple(f"Voltage #{i + 1}" for i in range(self._sensors)),
+        )
+        if not self._replay_file:
+            return
+        with open(self._replay_file) as f:
+            for line in f:
+                if line.strip():
+                    data = HardwareData.model_validate(json.loads(line))
+                    self._recorded.append(Sample.from_model(data))
+        logger.info(f"Loaded {len(self._recorded)} samples from {self._replay_file}")
+
+    def _read(self) -> Sample:
+        if self._recorded:
+            sample = self._recorded[self._position % len(self._recorded)]
+            self._position += 1
+            return sample.with_timestamp(datetime.now())
+        return self._synthesize()
+
+    def _synthesize(self) -> Sample:
+        self._tick += 1
+        t = self._tick
+        usage = 40 + 30 * math.sin(t / 10)
+        bytes_total = t * 125_000
+        sample = Sample(self._schema, datetime.now())
+        sample.set_fields("cpu", (usage, 45 + usage * 0.4, 3.6 + 0.4 * math.sin(t / 7)))
+        sample.set_column(
+            "cores",
+            "usage",
+            [
+                min(max(usage + 20 * math.sin(t / 5 + i), 0), 100)
+                for i in range(self._cores)
+            ],
+        )
+        sample.set_fields(
+            "gpu",
+            (
+                50 + 40 * math.sin(t / 13),
+                55 + 15 * math.sin(t / 13),
+                35 + 5 * math.sin(t / 17),
+                180 + 60 * math.sin(t / 13),
+                45 + 10 * math.sin(t / 13),
+            ),
+        )
+        sample.set_fields(
+            "memory",
+            (55 + 5 * math.sin(t / 30), 7000 - 400 * math.sin(t / 30), 2048, 2),
+        )
+        sample.set_fields(
+            "storage",
+            (61.5, abs(120 * math.sin(t / 3)), abs(80 * math.sin(t / 4)), 38),
+        )
+        sample.set_fields(
+            "network",
+            (bytes_total, bytes_total * 4, bytes_total // 1200, bytes_total // 300),
+        )
+        readings = range(self._sensors)
+        sample.set_column(
+            "temperatures", "value", [40 + 5 * math.sin(t / 9 + i) for i in readings]
+        )
+        sample.set_column(
+            "fans", "value", [1100 + 200 * math.sin(t / 11 + i) for i in readings]
+        )
+        sample.set_column(
+            "voltages", "value", [1.2 + 0.01 * math.sin(t + i) for i in readings]
+        )
+        return sample
@@ -0,0 +1,337 @@
+"""
+Native Linux collector session reading sysfs/hwmon and procfs directly
+
+Every file that is read per tick is opened once during enumeration and then
+re-read with ``os.pread`` at offset 0, so a sample costs a handful of
+syscalls instead of psutil's open/parse/close per call.
+"""
+
+import glob
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import settings
+from services.sample import Sample, get_schema
+from .base import CollectorSession
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+SECTOR_SIZE = 512
+READ_SIZE = 65536
+
+CPU_HWMON_CHIPS = ("coretemp", "k10temp", "zenpower", "cpu_thermal")
+
+
+def _pread(fd: int) -> bytes:
+    """Read a whole (small) procfs/sysfs file from offset 0"""
+    return os.pread(fd, READ_SIZE, 0)
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class SysfsSession(CollectorSession):
+    """Collector session for Linux hosts using pre-opened procfs/sysfs files"""
+
+    name = "sysfs"
+    rescan_interval = settings.COLLECTOR_RESCAN_INTERVAL
+
+    def __init__(self, proc_root: str = "/proc", sys_root: str = "/sys"):
+        super().__init__()
+        self._proc_root = proc_root
+        self._sys_root = sys_root
+        self._fds: List[int] = []
+
+        self._stat_fd = -1
+        self._meminfo_fd = -1
+        self._netdev_fd = -1
+        self._diskstats_fd = -1
+        self._freq_fd = -1
+        self._static_frequency = 0.0
+
+        self._last_cpu_times: List[Tuple[int, int]] = []
+        self._cpu_temp: Optional[Tuple[int, str]] = None
+        # (fd, display name) per hwmon input, grouped by kind
+        self._temperatures: List[Tuple[int, str]] = []
+        self._fans: List[Tuple[int, str]] = []
+        self._voltages: List[Tuple[int, str]] = []
+        # (device, mountpoint, diskstats name) per mounted block device
+        self._partitions: List[Tuple[str, str, str]] = []
+        self._last_disk_io: Dict[str, Tuple[int, int]] = {}
+        self._last_disk_time = 0.0
+
+    def _open_fd(self, path: str) -> int:
+        fd = os.open(path, os.O_RDONLY)
+        self._fds.append(fd)
+        return fd
+
+    def _close(self):
+        self._release_fds()
+
+    def _release_fds(self):
+        for fd in self._fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fds = []
+        self._temperatures = []
+        self._fans = []
+        self._voltages = []
+        self._cpu_temp = None
+        self._freq_fd = -1
+
+    def _enumerate(self):
+        self._release_fds()
+
+        self._stat_fd = self._open_fd(os.path.join(self._proc_root, "stat"))
+        self._meminfo_fd = self._open_fd(os.path.join(self._proc_root, "meminfo"))
+        self._netdev_fd = self._open_fd(os.path.join(self._proc_root, "net/dev"))
+        self._diskstats_fd = self._open_fd(os.path.join(self._proc_root, "diskstats"))
+
+        freq_path = os.path.join(
+            self._sys_root, "devices/system/cpu/cpu0/cpufreq/scaling_cur_freq"
+        )
+        if os.path.exists(freq_path):
+            self._freq_fd = self._open_fd(freq_path)
+        else:
+            self._static_frequency = self._read_cpuinfo_frequency()
+
+        self._enumerate_hwmon()
+        self._enumerate_partitions()
+
+        self._last_cpu_times = self._read_cpu_times()
+        self._last_disk_io = self._read_disk_io()
+        self._last_disk_time = time.monotonic()
+        logger.debug(
+            f"Enumerated {len(self._temperatures)} temperature, {len(self._fans)} fan, "
+            f"{len(self._voltages)} voltage inputs and {len(self._partitions)} partitions"
+        )
+
+    def _read_cpuinfo_frequency(self) -> float:
+        text = _read_text(os.path.join(self._proc_root, "cpuinfo")) or ""
+        for line in text.splitlines():
+            if line.startswith("cpu MHz"):
+                return float(line.split(":", 1)[1]) / 1000
+        return 0.0
+
+    def _device_signature(self):
+        inputs = glob.glob(os.path.join(self._sys_root, "class/hwmon/hwmon*/*_input"))
+        mounts = _read_text(os.path.join(self._proc_root, "mounts")) or ""
+        devices = [
+            tuple(line.split()[:2])
+            for line in mounts.splitlines()
+            if line.startswith("/dev/")
+        ]
+        return tuple(sorted(inputs)), tuple(devices)
+
+    def _enumerate_hwmon(self):
+        pattern = os.path.join(self._sys_root, "class/hwmon/hwmon*")
+        for hwmon in sorted(glob.glob(pattern)):
+            chip = _read_text(os.path.join(hwmon, "name")) or os.path.basename(hwmon)
+            for prefix, target in (
+                ("temp", self._temperatures),
+                ("fan", self._fans),
+                ("in", self._voltages),
+            ):
+                for input_path in sorted(
+                    glob.glob(os.path.join(hwmon, f"{prefix}*_input"))
+                ):
+                    label = _read_text(input_path[: -len("_input")] + "_label")
+                    name = f"{chip} {label or os.path.basename(input_path)[:-6]}"
+                    try:
+                        entry = (self._open_fd(input_path), name)
+                    except OSError:
+                        continue
+                    target.append(entry)
+                    if (
+                        prefix == "temp"
+                        and chip in CPU_HWMON_CHIPS
+                        and not self._cpu_temp
+                    ):
+                        self._cpu_temp = entry
+
+    def _enumerate_partitions(self):
+        disks = {name for name in self._read_disk_io_raw()}
+        partitions = []
+        seen = set()
+        text = _read_text(os.path.join(self._proc_root, "mounts")) or ""
+        for line in text.splitlines():
+            fields = line.split()
+            if len(fields) < 2 or not fields[0].startswith("/dev/"):
+                continue
+            device, mountpoint = fields[0], fields[1]
+            if device in seen:
+                continue
+            seen.add(device)
+            disk = os.path.basename(device)
+            partitions.append((device, mountpoint, disk if disk in disks else ""))
+        self._partitions = partitions
+
+    def _read_cpu_times(self) -> List[Tuple[int, int]]:
+        """Return (idle, total) jiffies for the aggregate and each core"""
+        times = []
+        for line in _pread(self._stat_fd).split(b"\n"):
+            if not line.startswith(b"cpu"):
+                break
+            values = [int(v) for v in line.split()[1:]]
+            idle = values[3] + (values[4] if len(values) > 4 else 0)
+            times.append((idle, sum(values[:8])))
+        return times
+
+    def _read_disk_io_raw(self) -> Dict[str, Tuple[int, int]]:
+        stats = {}
+        for line in _pread(self._diskstats_fd).split(b"\n"):
+            fields = line.split()
+            if len(fields) >= 10:
+                stats[fields[2].decode()] = (
+                    int(fields[5]) * SECTOR_SIZE,
+                    int(fields[9]) * SECTOR_SIZE,
+                )
+        return stats
+
+    def _read_disk_io(self) -> Dict[str, Tuple[int, int]]:
+        stats = self._read_disk_io_raw()
+        return {disk: stats[disk] for _, _, disk in self._partitions if disk in stats}
+
+    def _read_meminfo(self) -> Dict[bytes, int]:
+        meminfo = {}
+        for line in _pread(self._meminfo_fd).split(b"\n"):
+            key, _, rest = line.partition(b":")
+            if rest:
+                meminfo[key] = int(rest.split()[0])  # kB
+        return meminfo
+
+    def _read_network(self) -> Tuple[int, int, int, int]:
+        """(bytes sent, bytes received, packets sent, packets received)"""
+        bytes_recv = packets_recv = bytes_sent = packets_sent = 0
+        for line in _pread(self._netdev_fd).split(b"\n")[2:]:
+            iface, _, rest = line.partition(b":")
+            if not rest or iface.strip() == b"lo":
+                continue
+            fields = rest.split()
+            bytes_recv += int(fields[0])
+            packets_recv += int(fields[1])
+            bytes_sent += int(fields[8])
+            packets_sent += int(fields[9])
+        return bytes_sent, bytes_recv, packets_sent, packets_recv
+
+    @staticmethod
+    def _read_inputs(
+        entries: List[Tuple[int, str]], scale: float
+    ) -> List[Tuple[str, float]]:
+        readings = []
+        for fd, name in entries:
+            try:
+                value = int(_pread(fd)) / scale
+            except (OSError, ValueError):
+                # Some hwmon inputs are unreadable while the device sleeps
+                continue
+            readings.append((name, value))
+        return readings
+
+    def _read(self) -> Sample:
+        # CPU usage from /proc/stat jiffy deltas
+        cpu_times = self._read_cpu_times()
+        usages = []
+        for (idle, total), (last_idle, last_total) in zip(
+            cpu_times, self._last_cpu_times
+        ):
+            delta_total = total - last_total
+            busy = delta_total - (idle - last_idle)
+            usages.append(
+                min(max(100.0 * busy / delta_total, 0.0), 100.0)
+                if delta_total > 0
+                else 0.0
+            )
+        self._last_cpu_times = cpu_times
+        usage = usages[0] if usages else 0.0
+        core_usages = usages[1:]
+
+        if self._freq_fd >= 0:
+            frequency = int(_pread(self._freq_fd)) / 1_000_000  # kHz -> GHz
+        else:
+            frequency = self._static_frequency
+
+        cpu_temperature = None
+        if self._cpu_temp:
+            cpu_temperature = int(_pread(self._cpu_temp[0])) / 1000
+
+        meminfo = self._read_meminfo()
+        mem_total = meminfo.get(b"MemTotal", 0)
+        mem_available = meminfo.get(b"MemAvailable", 0)
+        swap_total = meminfo.get(b"SwapTotal", 0)
+        swap_free = meminfo.get(b"SwapFree", 0)
+
+        now = time.monotonic()
+        elapsed = max(now - self._last_disk_time, 1e-6)
+        disk_io = self._read_disk_io()
+        storage = []
+        for device, mountpoint, disk in self._partitions:
+            read_speed = write_speed = 0.0
+            if disk in disk_io and disk in self._last_disk_io:
+                last_read, last_write = self._last_disk_io[disk]
+                read_bytes, write_bytes = disk_io[disk]
+                read_speed = max(read_bytes - last_read, 0) / MB / elapsed
+                write_speed = max(write_bytes - last_write, 0) / MB / elapsed
+            try:
+                st = os.statvfs(mountpoint)
+            except OSError:
+                continue
+            used = (st.f_blocks - st.f_bfree) * st.f_frsize
+            usable = used + st.f_bavail * st.f_frsize
+            storage.append(
+                (
+                    device,
+                    (
+                        100.0 * used / usable if usable else 0.0,
+                        read_speed,
+                        write_speed,
+                        None,
+                    ),
+                )
+            )
+        self._last_disk_io = disk_io
+        self._last_disk_time = now
+
+        readings = {
+            "temperatures": self._read_inputs(self._temperatures, 1000),
+            "fans": self._read_inputs(self._fans, 1),
+            "voltages": self._read_inputs(self._voltages, 1000),
+        }
+        schema = get_schema(
+            cores=len(core_usages),
+            storage=tuple(device for device, _ in storage),
+            **{
+                group: tuple(name for name, _ in entries)
+                for group, entries in readings.items()
+            },
+        )
+        sample = Sample(schema, datetime.now())
+        # CPUData requires a positive frequency; some VMs do not expose one
+        sample.set_fields("cpu", (usage, cpu_temperature, frequency or 0.001))
+        sample.set_column("cores", "usage", core_usages)
+        sample.set_fields(
+            "memory",
+            (
+                100.0 * (mem_total - mem_available) / mem_total if mem_total else 0.0,
+                mem_available / 1024,
+                meminfo.get(b"Cached", 0) / 1024,
+                100.0 * (swap_total - swap_free) / swap_total if swap_total else 0.0,
+            ),
+        )
+        for i, (_, fields) in enumerate(storage):
+            sample.set_fields("storage", fields, i)
+        sample.set_fields("network", self._read_network())
+        for group, entries in readings.items():
+            sample.set_column(group, "value", [value for _, value in entries])
+        return sample
@@ -0,0 +1,203 @@
+"""
+Columnar history storage: per-sensor packed arrays in compressed time blocks
+
+Every numeric value of a sample (``cpu.usage``, ``cpu.cores.3.usage``,
+``sensors.fans.1.value`` ...) is a sensor, named once in the
+``history_sensors`` dictionary table. Samples are accumulated per sensor
+for ``HISTORY_BLOCK_SECONDS`` and written as one ``history_blocks`` row:
+
+- ``timestamps``: zlib-compressed little-endian int32 millisecond offsets
+  from the block start
+- ``values``: zlib-compressed little-endian float64 values
+
+A range query for one sensor reads only that sensor's blocks.
+"""
+
+import sys
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from database.models import HistoryBlockRecord, HistorySensorRecord
+from services.snapshot import Snapshot
+
+
+def _pack(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return zlib.compress(values.tobytes())
+
+
+def _unpack(typecode: str, blob: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(zlib.decompress(blob))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class _Column:
+    __slots__ = ("offsets", "values")
+
+    def __init__(self):
+        self.offsets = array("i")
+        self.values = array("d")
+
+
+class BlockBuilder:
+    """Accumulates samples per sensor and emits closed blocks as rows.
+
+    Rows carry the sensor ``path``; it is resolved to a ``sensor_id`` with
+    ``resolve_sensor_ids`` when the rows are written.
+    """
+
+    def __init__(self, block_seconds: int):
+        self._block_seconds = max(1, int(block_seconds))
+        self._start: Optional[float] = None
+        self._columns: Dict[str, _Column] = {}
+
+    def add(self, snapshot: Snapshot) -> List[Dict[str, Any]]:
+        """Append one sample; return rows for the block it closed, if any"""
+        now = snapshot.timestamp.timestamp()
+        start = now - now % self._block_seconds
+        rows = []
+        if start != self._start:
+            rows = self.drain()
+            self._start = start
+
+        offset = round((now - start) * 1000)
+        columns = self._columns
+        for path, value in snapshot.sensor_values.items():
+            column = columns.get(path)
+            if column is None:
+                column = columns[path] = _Column()
+            column.offsets.append(offset)
+            column.values.append(value)
+        return rows
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Close the open block, e.g. on shutdown"""
+        if self._start is None or not self._columns:
+            return []
+        start = datetime.fromtimestamp(self._start)
+        rows = [
+            {
+                "path": path,
+                "start": start,
+                "end": start + timedelta(milliseconds=column.offsets[-1]),
+                "count": len(column.values),
+                "timestamps": _pack(column.offsets),
+                "values": _pack(column.values),
+            }
+            for path, column in self._columns.items()
+        ]
+        self._columns = {}
+        self._start = None
+        return rows
+
+    def read_open(
+        self, path: str, start: datetime, end: datetime
+    ) -> Tuple[List[float], List[float]]:
+        """Samples of ``path`` in the still-open block within ``[start, end]``"""
+        column = self._columns.get(path)
+        if self._start is None or column is None:
+            return [], []
+        return _select(self._start, column.offsets, column.values, start, end)
+
+
+def _select(
+    block_start: float,
+    offsets: array,
+    values: array,
+    start: datetime,
+    end: datetime,
+) -> Tuple[List[float], List[float]]:
+    # Offsets are ascending within a block, so the range is one slice
+    lo = bisect_left(offsets, (start.timestamp() - block_start) * 1000)
+    hi = bisect_right(offsets, (end.timestamp() - block_start) * 1000)
+    timestamps = [block_start + offset / 1000 for offset in offsets[lo:hi]]
+    return timestamps, values[lo:hi].tolist()
+
+
+def read_block(
+    block_start: datetime,
+    timestamps: bytes,
+    values: bytes,
+    start: datetime,
+    end: datetime,
+) -> Tuple[List[float], List[float]]:
+    """Decode a stored block's samples within ``[start, end]``"""
+    return _select(
+        block_start.timestamp(),
+        _unpack("i", timestamps),
+        _unpack("d", values),
+        start,
+        end,
+    )
+
+
+async def resolve_sensor_ids(
+    conn, paths: Iterable[str], cache: Dict[str, int]
+) -> Dict[str, int]:
+    """Map sensor paths to ids, adding unknown paths to the dictionary"""
+    missing = [path for path in set(paths) if path not in cache]
+    if missing:
+        await conn.execute(
+            insert(HistorySensorRecord).on_conflict_do_nothing(),
+            [{"path": path} for path in missing],
+        )
+        result = await conn.execute(
+            select(HistorySensorRecord.path, HistorySensorRecord.id).where(
+                HistorySensorRecord.path.in_(missing)
+            )
+        )
+        cache.update(dict(result.all()))
+    return cache
+
+
+async def write_blocks(conn, rows: List[Dict[str, Any]], cache: Dict[str, int]):
+    """Insert builder rows, resolving their sensor paths first"""
+    ids = await resolve_sensor_ids(conn, (row["path"] for row in rows), cache)
+    await conn.execute(
+        insert(HistoryBlockRecord),
+        [
+            {
+                "sensor_id": ids[row["path"]],
+                **{key: value for key, value in row.items() if key != "path"},
+            }
+            for row in rows
+        ],
+    )
+
+
+async def read_series(
+    conn, path: str, start: datetime, end: datetime
+) -> Tuple[List[float], List[float]]:
+    """Unix timestamps and values of one sensor within ``[start, end]``"""
+    stmt = (
+        select(
+            HistoryBlockRecord.start,
+            HistoryBlockRecord.timestamps,
+            HistoryBlockRecord.values,
+        )
+        .join(HistorySensorRecord)
+        .where(
+            HistorySensorRecord.path == path,
+            HistoryBlockRecord.end >= start,
+            HistoryBlockRecord.start <= end,
+        )
+        .order_by(HistoryBlockRecord.start, HistoryBlockRecord.id)
+    )
+    timestamps: List[float] = []
+    values: List[float] = []
+    for row in await conn.execute(stmt):
+        ts, vs = read_block(*row, start, end)
+        timestamps.extend(ts)
+        values.extend(vs)
+    return timestamps, values
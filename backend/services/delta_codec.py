@@ -0,0 +1,142 @@
+"""
+Delta-encoded live stream: keyframes plus changed values addressed by id
+
+Every leaf of a ``HardwareData`` document is addressed by a path such as
+``cpu.usage`` or ``sensors.fans.2.value`` (list items by index). Each path
+is given a small integer id the first time it is seen; clients learn the
+id -> path dictionary once and afterwards only receive changed values.
+
+Messages (JSON text):
+
+- ``{"type": "keyframe", "seq", "timestamp", "values": {id: value},
+  "paths": {id: path}}`` - full state; ``paths`` is the complete dictionary
+  on subscribe/resync and only new entries on periodic keyframes.
+- ``{"type": "delta", "seq", "timestamp", "values": {id: value},
+  "paths": {id: path}, "removed": [id]}`` - changed values only; ``paths``
+  and ``removed`` are present only when the document's shape changed.
+"""
+
+from functools import cached_property
+from typing import Any, Dict, List
+
+from services.encoding import encode_json
+from services.metrics import flatten
+from services.snapshot import Snapshot
+
+
+class DeltaFrames:
+    """Encoded frames for one tick, shared by every delta client"""
+
+    def __init__(
+        self,
+        seq: int,
+        timestamp: str,
+        values: Dict[int, Any],
+        changed: Dict[int, Any],
+        new_paths: Dict[int, str],
+        removed: List[int],
+        all_paths: Dict[int, str],
+        keyframe: bool,
+    ):
+        self._seq = seq
+        self._timestamp = timestamp
+        self._values = values
+        self._changed = changed
+        self._new_paths = new_paths
+        self._removed = removed
+        self._all_paths = all_paths
+        self._keyframe = keyframe
+
+    @cached_property
+    def live(self) -> str:
+        """The frame every up-to-date client receives this tick"""
+        if self._keyframe:
+            return self._encode("keyframe", self._values, self._new_paths)
+        message = self._message("delta", self._changed, self._new_paths)
+        if self._removed:
+            message["removed"] = self._removed
+        return encode_json(message)
+
+    @cached_property
+    def resync(self) -> str:
+        """A keyframe with the complete id dictionary for new/lagging clients"""
+        return self._encode("keyframe", self._values, self._all_paths)
+
+    def _message(self, kind: str, values: Dict[int, Any], paths: Dict[int, str]):
+        message = {
+            "type": kind,
+            "seq": self._seq,
+            "timestamp": self._timestamp,
+            "values": values,
+        }
+        if paths:
+            message["paths"] = paths
+        return message
+
+    def _encode(self, kind: str, values: Dict[int, Any], paths: Dict[int, str]):
+        return encode_json(self._message(kind, values, paths))
+
+
+class DeltaEncoder:
+    """Tracks the last sent state of the shared delta stream"""
+
+    def __init__(self, keyframe_interval: int = 30, epsilon: float = 0.0):
+        self._keyframe_interval = max(1, keyframe_interval)
+        self._epsilon = epsilon
+        self._ids: Dict[str, int] = {}
+        self._paths: Dict[int, str] = {}
+        self._last: Dict[int, Any] = {}
+        self._frames = 0
+
+    def encode(self, snapshot: Snapshot) -> DeltaFrames:
+        """Diff ``snapshot`` against the previous one and build its frames"""
+        document = dict(snapshot.document)
+        timestamp = document.pop("timestamp")
+
+        values: Dict[int, Any] = {}
+        new_paths: Dict[int, str] = {}
+        for path, value in flatten(document).items():
+            path_id = self._ids.get(path)
+            if path_id is None:
+                path_id = self._ids[path] = len(self._ids)
+                self._paths[path_id] = path
+                new_paths[path_id] = path
+            values[path_id] = value
+
+        last = self._last
+        epsilon = self._epsilon
+        changed = {}
+        for path_id, value in values.items():
+            previous = last.get(path_id)
+            if value == previous and path_id in last:
+                continue
+            if (
+                epsilon
+                and isinstance(value, float)
+                and isinstance(previous, (int, float))
+                and abs(value - previous) <= epsilon
+            ):
+                continue
+            changed[path_id] = value
+            last[path_id] = value
+
+        removed = [path_id for path_id in last if path_id not in values]
+        for path_id in removed:
+            del last[path_id]
+
+        keyframe = self._frames % self._keyframe_interval == 0
+        self._frames += 1
+        if keyframe:
+            # Keyframes carry exact current values; reset the epsilon baseline
+            last.update(values)
+
+        return DeltaFrames(
+            seq=snapshot.seq,
+            timestamp=timestamp,
+            values=values,
+            changed=changed,
+            new_paths=new_paths,
+            removed=removed,
+            all_paths={path_id: self._paths[path_id] for path_id in values},
+            keyframe=keyframe,
+        )
@@ -0,0 +1,132 @@
+"""
+Server-side downsampling of metric series for charts
+
+- ``lttb``: Largest-Triangle-Three-Buckets, keeps the visual shape
+- ``minmax``: the minimum and maximum of each bucket, keeps every spike
+
+Both use NumPy when it is installed and fall back to pure Python.
+"""
+
+import logging
+from typing import List, Sequence, Tuple
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logging.debug("numpy not available - using pure Python downsampling")
+
+Series = Tuple[List[float], List[float]]
+
+METHODS = ("lttb", "minmax")
+
+
+def downsample(
+    timestamps: Sequence[float], values: Sequence[float], points: int, method: str
+) -> Series:
+    """Reduce a series to at most ``points`` points"""
+    if len(values) <= points or points < 3:
+        return list(timestamps), list(values)
+    if method == "minmax":
+        func = _minmax_numpy if NUMPY_AVAILABLE else _minmax_python
+    elif method == "lttb":
+        func = _lttb_numpy if NUMPY_AVAILABLE else _lttb_python
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return func(timestamps, values, points)
+
+
+def _lttb_edges(n: int, points: int) -> List[int]:
+    # points - 2 buckets between the (always kept) first and last point
+    buckets = points - 2
+    return [1 + (n - 2) * i // buckets for i in range(buckets + 1)]
+
+
+def _lttb_numpy(timestamps, values, points: int) -> Series:
+    x = np.asarray(timestamps, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    edges = _lttb_edges(n, points)
+    # Average of every bucket, plus the last point as the final "next bucket"
+    sizes = np.diff(edges)
+    avg_x = np.append(
+        np.add.reduceat(x[1:-1], np.subtract(edges[:-1], 1)) / sizes, x[-1]
+    )
+    avg_y = np.append(
+        np.add.reduceat(y[1:-1], np.subtract(edges[:-1], 1)) / sizes, y[-1]
+    )
+
+    selected = np.empty(points, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a])
+        )
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return x[selected].tolist(), y[selected].tolist()
+
+
+def _lttb_python(timestamps, values, points: int) -> Series:
+    x, y = timestamps, values
+    n = len(x)
+    edges = _lttb_edges(n, points)
+    out_x, out_y = [x[0]], [y[0]]
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_lo, next_hi = hi, edges[i + 2]
+        else:
+            next_lo, next_hi = n - 1, n
+        count = next_hi - next_lo
+        avg_x = sum(x[next_lo:next_hi]) / count
+        avg_y = sum(y[next_lo:next_hi]) / count
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        a = best
+        out_x.append(x[a])
+        out_y.append(y[a])
+    out_x.append(x[-1])
+    out_y.append(y[-1])
+    return out_x, out_y
+
+
+def _minmax_numpy(timestamps, values, points: int) -> Series:
+    x = np.asarray(timestamps, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+    n = len(y)
+    buckets = max(1, points // 2)
+    edges = np.linspace(0, n, buckets + 1).astype(np.intp)
+    width = int(np.diff(edges).max())
+    # One padded row per bucket; padding never wins min or max
+    index = edges[:-1, None] + np.arange(width)[None, :]
+    valid = index < edges[1:, None]
+    window = y[np.minimum(index, n - 1)]
+    lows = np.where(valid, window, np.inf).argmin(axis=1) + edges[:-1]
+    highs = np.where(valid, window, -np.inf).argmax(axis=1) + edges[:-1]
+    selected = np.unique(np.concatenate([lows, highs]))
+    return x[selected].tolist(), y[selected].tolist()
+
+
+def _minmax_python(timestamps, values, points: int) -> Series:
+    n = len(values)
+    buckets = max(1, points // 2)
+    selected = set()
+    for b in range(buckets):
+        lo, hi = n * b // buckets, n * (b + 1) // buckets
+        if lo == hi:
+            continue
+        bucket = range(lo, hi)
+        selected.add(min(bucket, key=values.__getitem__))
+        selected.add(max(bucket, key=values.__getitem__))
+    order = sorted(selected)
+    return [timestamps[i] for i in order], [values[i] for i in order]
@@ -0,0 +1,44 @@
+"""
+JSON encoding helpers shared by the live data paths
+"""
+
+import json
+import logging
+from typing import Any
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logging.debug("orjson not available - using the standard json module")
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    logging.debug("msgpack not available - MessagePack stream protocol disabled")
+
+
+def encode_json(payload: Any) -> str:
+    """Encode a pydantic model or plain JSON-compatible value to JSON text"""
+    if isinstance(payload, BaseModel):
+        # pydantic-core serializes models natively, no intermediate dicts
+        return payload.model_dump_json()
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            payload, default=str, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(payload, default=str)
+
+
+def encode_msgpack(payload: Any) -> bytes:
+    """Encode a pydantic model or plain value to MessagePack"""
+    if isinstance(payload, BaseModel):
+        payload = payload.model_dump(mode="json")
+    return msgpack.packb(payload)
@@ -4,10 +4,12 @@ Hardware monitoring service using psutil, GPUtil, and py-cpuinfo
 
 import asyncio
 import logging
+import math
 import psutil
 import platform
-from datetime import datetime
-from typing import Optional, List, Any
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
 
 try:
     import GPUtil
@@ -25,40 +27,69 @@ except ImportError:
     CPUINFO_AVAILABLE = False
     logging.warning("py-cpuinfo not available - detailed CPU info disabled")
 
-from HardwareMonitor import clr
-
-clr.AddReference("LibreHardwareMonitorLib")
-from LibreHardwareMonitor import Hardware
-
-from models.hardware import (
-    HardwareData,
-    CPUData,
-    GPUData,
-    MemoryData,
-    StorageDevice,
-    NetworkData,
-    SensorData,
-    SensorReading,
-    SystemInfo,
-    CPUCore,
-)
+from models.hardware import SystemInfo
 from config.settings import settings
+from services.collectors import CollectorSession, create_collector, resolve_backend
+from services.encoding import encode_json
+from services.loop_monitor import LoopLagMonitor
+from services.ring_buffer import SampleRing
+from services.sampler import SamplerThread
+from services.scheduler import TickScheduler
+from services.snapshot import Snapshot
 
 logger = logging.getLogger(__name__)
 
 
+class SnapshotSubscription:
+    """Every snapshot published after subscribing, in order, for one consumer.
+
+    Unlike ``wait_for_snapshot``, which only returns the newest snapshot,
+    nothing is skipped while the consumer is busy. The queue is bounded: if
+    the consumer falls more than ``size`` snapshots behind, the oldest are
+    discarded and counted in ``dropped``.
+    """
+
+    def __init__(self, size: int):
+        self._queue: Deque[Snapshot] = deque(maxlen=max(1, size))
+        self._ready = asyncio.Event()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def put(self, snapshot: Snapshot):
+        """Queue one snapshot (runs on the event loop)"""
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(snapshot)
+        self._ready.set()
+
+    async def get(self) -> Snapshot:
+        """Wait for and return the oldest queued snapshot"""
+        while not self._queue:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._queue.popleft()
+
+
 class HardwareMonitor:
     """Hardware monitoring service"""
 
     def __init__(self):
         self._running = False
-        self._task: Optional[asyncio.Task] = None
-        self._current_data: Optional[HardwareData] = None
+        self._sampler: Optional[SamplerThread] = None
+        self._snapshot: Optional[Snapshot] = None
+        self._new_snapshot = asyncio.Event()
+        self._subscriptions: List[SnapshotSubscription] = []
         self._system_info: Optional[SystemInfo] = None
-
-        # Initialize network counters
-        self._last_network_io = psutil.net_io_counters()
-        self._last_network_time = datetime.now()
+        self._system_info_json: Optional[bytes] = None
+        self.loop_lag = LoopLagMonitor()
+        # Snapshot sequence numbers restart with every run
+        self.run_id = ""
+        # Last RECENT_HISTORY_SECONDS of samples for short-range history
+        self.recent = SampleRing(
+            math.ceil(settings.RECENT_HISTORY_SECONDS / settings.MONITORING_INTERVAL)
+        )
 
     async def start(self):
         """Start hardware monitoring"""
@@ -66,13 +97,26 @@ class HardwareMonitor:
             return
 
         logger.info("Starting hardware monitoring service")
+        # Fail startup on a misconfigured backend rather than retrying forever
+        resolve_backend(settings.COLLECTOR_BACKEND)
         self._running = True
+        self.run_id = uuid.uuid4().hex[:8]
 
         # Get system information once
         self._system_info = await self._get_system_info()
-
-        # Start monitoring task
-        self._task = asyncio.create_task(self._monitor_loop())
+        self._system_info_json = encode_json(self._system_info).encode()
+
+        # The sampler thread owns the collector session for its whole life
+        self._sampler = SamplerThread(
+            session_factory=self._create_session,
+            scheduler=TickScheduler(
+                settings.MONITORING_INTERVAL, settings.MONITORING_MISSED_TICK_POLICY
+            ),
+            loop=asyncio.get_running_loop(),
+            publish=self._publish,
+        )
+        self._sampler.start()
+        self.loop_lag.start()
 
     async def stop(self):
         """Stop hardware monitoring"""
@@ -82,306 +126,82 @@ class HardwareMonitor:
         logger.info("Stopping hardware monitoring service")
         self._running = False
 
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+        await self.loop_lag.stop()
+        if self._sampler:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._sampler.stop, 5.0)
+            self._sampler = None
 
     def is_running(self) -> bool:
-        """Check if monitoring is running"""
-        return self._running
-
-    async def get_current_data(self) -> Optional[HardwareData]:
-        """Get current hardware data"""
-        return self._current_data
+        """Check if monitoring is running and the sampler thread is alive"""
+        sampler = self._sampler
+        return self._running and sampler is not None and sampler.is_alive()
+
+    def get_snapshot(self) -> Optional[Snapshot]:
+        """Get the latest snapshot published by the sampler"""
+        return self._snapshot
+
+    async def wait_for_snapshot(self, after_seq: int = 0) -> Snapshot:
+        """Wait for the first snapshot with a sequence number above ``after_seq``"""
+        while True:
+            snapshot = self._snapshot
+            if snapshot and snapshot.seq > after_seq:
+                return snapshot
+            await self._new_snapshot.wait()
+
+    def subscribe(
+        self, size: int = settings.MONITORING_SUBSCRIBER_QUEUE_SIZE
+    ) -> SnapshotSubscription:
+        """Queue every snapshot published from now on for one consumer"""
+        subscription = SnapshotSubscription(size)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: SnapshotSubscription):
+        """Stop queueing snapshots for ``subscription``"""
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
 
     async def get_system_info(self) -> Optional[SystemInfo]:
         """Get system information"""
         return self._system_info
 
-    async def _monitor_loop(self):
-        """Main monitoring loop"""
-        while self._running:
-            try:
-                self._current_data = await self._collect_hardware_data()
-                await asyncio.sleep(settings.MONITORING_INTERVAL)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in monitoring loop: {e}")
-                await asyncio.sleep(1)
-
-    async def _collect_hardware_data(self) -> HardwareData:
-        """Collect current hardware data"""
-        # Use PyHardwareMonitor for data collection
-        computer = Hardware.Computer()
-        computer.IsCpuEnabled = True
-        computer.IsGpuEnabled = True
-        computer.IsMemoryEnabled = True
-        computer.IsStorageEnabled = True
-        computer.IsNetworkEnabled = True
-        computer.Open()
-        for h in computer.Hardware:
-            h.Update()
-
-        # Parse data from computer.Hardware
-        cpu_data = self._parse_cpu_data(computer.Hardware)
-        gpu_data = self._parse_gpu_data(computer.Hardware)
-        memory_data = self._parse_memory_data(computer.Hardware)
-        storage_data = self._parse_storage_data(computer.Hardware)
-        network_data = self._parse_network_data(computer.Hardware)
-        sensor_data = self._parse_sensor_data(computer.Hardware)
-
-        computer.Close()
-        return HardwareData(
-            timestamp=datetime.now(),
-            cpu=cpu_data,
-            gpu=gpu_data,
-            memory=memory_data,
-            storage=storage_data,
-            network=network_data,
-            sensors=sensor_data,
-        )
+    def get_system_info_json(self) -> Optional[bytes]:
+        """System information encoded as JSON once at start"""
+        return self._system_info_json
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sampler and event loop statistics"""
+        snapshot = self._snapshot
+        sampler = self._sampler
+        return {
+            "samples": snapshot.seq if snapshot else 0,
+            "sampler_alive": sampler.is_alive() if sampler else False,
+            "collector": sampler.session.name if sampler and sampler.session else None,
+            "errors": sampler.errors if sampler else 0,
+            "last_error": sampler.last_error if sampler else None,
+            "last_collection_ms": (
+                round(snapshot.duration * 1000, 3) if snapshot else None
+            ),
+            "scheduler": sampler.scheduler.get_stats() if sampler else None,
+            "loop_lag": self.loop_lag.get_stats(),
+            "recent": self.recent.get_stats(),
+        }
 
-    def _parse_cpu_data(self, hardware_list: List[Any]) -> CPUData:
-        """Parses CPU data from the LibreHardwareMonitor hardware list."""
-        for hardware_item in hardware_list:
-            if hardware_item.HardwareType == Hardware.HardwareType.Cpu:
-                usage = 0
-                temperature = 0
-                frequency = 0
-                cores = []
-                for sensor in hardware_item.Sensors:
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Load
-                        and "CPU Total" in sensor.Name
-                    ):
-                        usage = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Temperature
-                        and "CPU Package" in sensor.Name
-                    ):
-                        temperature = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Clock
-                        and "CPU Core #1" in sensor.Name
-                    ):
-                        frequency = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Load
-                        and "Core" in sensor.Name
-                    ):
-                        cores.append(
-                            CPUCore(
-                                core=len(cores) + 1,
-                                usage=sensor.Value,
-                                temperature=None,
-                            )
-                        )
-                return CPUData(
-                    usage=usage,
-                    temperature=temperature,
-                    frequency=frequency,
-                    cores=cores,
-                )
-        return CPUData(usage=0, temperature=0, frequency=0, cores=[])
-
-    def _parse_gpu_data(self, hardware_list: List[Any]) -> Optional[GPUData]:
-        """Parses GPU data from the LibreHardwareMonitor hardware list."""
-        for hardware_item in hardware_list:
-            if hardware_item.HardwareType in [
-                Hardware.HardwareType.GpuNvidia,
-                Hardware.HardwareType.GpuAmd,
-            ]:
-                usage = 0
-                temperature = 0
-                memory_usage = 0
-                power_usage = None
-                fan_speed = None
-                for sensor in hardware_item.Sensors:
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Load
-                        and "GPU Total" in sensor.Name
-                    ):
-                        usage = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Temperature
-                        and "GPU Core" in sensor.Name
-                    ):
-                        temperature = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Load
-                        and "GPU Memory" in sensor.Name
-                    ):
-                        memory_usage = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Power
-                        and "GPU Power" in sensor.Name
-                    ):
-                        power_usage = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Fan
-                        and "GPU Fan" in sensor.Name
-                    ):
-                        fan_speed = sensor.Value
-                return GPUData(
-                    usage=usage,
-                    temperature=temperature,
-                    memory_usage=memory_usage,
-                    power_usage=power_usage,
-                    fan_speed=fan_speed,
-                )
-        return None
-
-    def _parse_memory_data(self, hardware_list: List[Any]) -> MemoryData:
-        """Parses memory data from the LibreHardwareMonitor hardware list."""
-        for hardware_item in hardware_list:
-            if hardware_item.HardwareType == Hardware.HardwareType.Memory:
-                usage = 0
-                available = 0
-                cached = 0
-                swap_usage = 0
-                for sensor in hardware_item.Sensors:
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Load
-                        and "Memory" in sensor.Name
-                    ):
-                        usage = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Available
-                        and "Memory" in sensor.Name
-                    ):
-                        available = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Cached
-                        and "Memory" in sensor.Name
-                    ):
-                        cached = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Load
-                        and "Swap" in sensor.Name
-                    ):
-                        swap_usage = sensor.Value
-                return MemoryData(
-                    usage=usage,
-                    available=available,
-                    cached=cached,
-                    swap_usage=swap_usage,
-                )
-        return MemoryData(usage=0, available=0, cached=0, swap_usage=0)
-
-    def _parse_storage_data(self, hardware_list: List[Any]) -> List[StorageDevice]:
-        """Parses storage data from the LibreHardwareMonitor hardware list."""
-        storage_devices = []
-        for hardware_item in hardware_list:
-            if hardware_item.HardwareType == Hardware.HardwareType.Storage:
-                device_name = hardware_item.Name
-                usage = 0
-                read_speed = 0
-                write_speed = 0
-                temperature = None
-                for sensor in hardware_item.Sensors:
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Load
-                        and "Storage" in sensor.Name
-                    ):
-                        usage = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Read
-                        and "Storage" in sensor.Name
-                    ):
-                        read_speed = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Write
-                        and "Storage" in sensor.Name
-                    ):
-                        write_speed = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.Temperature
-                        and "Storage" in sensor.Name
-                    ):
-                        temperature = sensor.Value
-                storage_devices.append(
-                    StorageDevice(
-                        device=device_name,
-                        usage=usage,
-                        read_speed=read_speed,
-                        write_speed=write_speed,
-                        temperature=temperature,
-                    )
-                )
-        return storage_devices
-
-    def _parse_network_data(self, hardware_list: List[Any]) -> NetworkData:
-        """Parses network data from the LibreHardwareMonitor hardware list."""
-        for hardware_item in hardware_list:
-            if hardware_item.HardwareType == Hardware.HardwareType.Network:
-                bytes_sent = 0
-                bytes_recv = 0
-                packets_sent = 0
-                packets_recv = 0
-                for sensor in hardware_item.Sensors:
-                    if (
-                        sensor.SensorType == Hardware.SensorType.BytesSent
-                        and "Network" in sensor.Name
-                    ):
-                        bytes_sent = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.BytesRecv
-                        and "Network" in sensor.Name
-                    ):
-                        bytes_recv = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.PacketsSent
-                        and "Network" in sensor.Name
-                    ):
-                        packets_sent = sensor.Value
-                    if (
-                        sensor.SensorType == Hardware.SensorType.PacketsRecv
-                        and "Network" in sensor.Name
-                    ):
-                        packets_recv = sensor.Value
-                return NetworkData(
-                    bytes_sent=bytes_sent,
-                    bytes_recv=bytes_recv,
-                    packets_sent=packets_sent,
-                    packets_recv=packets_recv,
-                )
-        return NetworkData(bytes_sent=0, bytes_recv=0, packets_sent=0, packets_recv=0)
-
-    def _parse_sensor_data(self, hardware_list: List[Any]) -> SensorData:
-        """Parses sensor data from the LibreHardwareMonitor hardware list."""
-        temperatures = []
-        fans = []
-        voltages = []
-        for hardware_item in hardware_list:
-            if hardware_item.HardwareType == Hardware.HardwareType.Temperature:
-                for sensor in hardware_item.Sensors:
-                    temperatures.append(
-                        SensorReading(
-                            name=f"{sensor.Name} {sensor.Label or ''}".strip(),
-                            value=sensor.Value,
-                        )
-                    )
-            if hardware_item.HardwareType == Hardware.HardwareType.Fan:
-                for sensor in hardware_item.Sensors:
-                    fans.append(
-                        SensorReading(
-                            name=f"{sensor.Name} {sensor.Label or ''}".strip(),
-                            value=sensor.Value,
-                        )
-                    )
-            if hardware_item.HardwareType == Hardware.HardwareType.Voltage:
-                for sensor in hardware_item.Sensors:
-                    voltages.append(
-                        SensorReading(
-                            name=f"{sensor.Name} {sensor.Label or ''}".strip(),
-                            value=sensor.Value,
-                        )
-                    )
-        return SensorData(temperatures=temperatures, fans=fans, voltages=voltages)
+    @staticmethod
+    def _create_session() -> CollectorSession:
+        """Create the collector session selected by settings.COLLECTOR_BACKEND"""
+        return create_collector(settings.COLLECTOR_BACKEND)
+
+    def _publish(self, snapshot: Snapshot):
+        """Receive a snapshot from the sampler thread (runs on the event loop)"""
+        self._snapshot = snapshot
+        self.recent.append(snapshot)
+        for subscription in self._subscriptions:
+            subscription.put(snapshot)
+        # Wake every waiter on the current event, then arm a fresh one
+        event, self._new_snapshot = self._new_snapshot, asyncio.Event()
+        event.set()
 
     async def _get_system_info(self) -> SystemInfo:
         """Get system information"""
@@ -0,0 +1,239 @@
+"""
+Batched history writer for HardwareDataRecord
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from config.settings import settings
+from database.database import engine
+from database.models import HardwareDataRecord
+from services.column_store import BlockBuilder, read_block, write_blocks
+from services.hardware_monitor import HardwareMonitor, SnapshotSubscription
+from services.rollups import RollupAggregator, upsert_rollups
+from services.snapshot import Snapshot
+
+logger = logging.getLogger(__name__)
+
+# Metric name -> HardwareDataRecord summary column
+RECORD_COLUMNS = {
+    "cpu.usage": "cpu_usage",
+    "cpu.temperature": "cpu_temperature",
+    "cpu.frequency": "cpu_frequency",
+    "gpu.usage": "gpu_usage",
+    "gpu.temperature": "gpu_temperature",
+    "gpu.memory_usage": "gpu_memory_usage",
+    "memory.usage": "memory_usage",
+    "memory.available": "memory_available",
+    "network.bytes_sent": "network_bytes_sent",
+    "network.bytes_recv": "network_bytes_recv",
+}
+INTEGER_COLUMNS = {"network_bytes_sent", "network_bytes_recv"}
+
+
+def snapshot_to_row(snapshot: Snapshot, raw_json: bool = False) -> Dict[str, Any]:
+    """Map a snapshot onto HardwareDataRecord columns"""
+    values = snapshot.sensor_values
+    row = {"timestamp": snapshot.timestamp}
+    for metric, column in RECORD_COLUMNS.items():
+        value = values.get(metric)
+        if value is not None and column in INTEGER_COLUMNS:
+            value = int(value)
+        row[column] = value
+    row["raw_data"] = snapshot.document if raw_json else None
+    return row
+
+
+class HistoryRecorder:
+    """Buffers monitor snapshots in memory and writes them in bulk.
+
+    Rows are flushed with a single ``executemany`` insert inside one
+    transaction whenever ``batch_size`` rows are pending or every
+    ``flush_interval`` seconds. Snapshots are received through a monitor
+    subscription, so none are skipped while the loop is busy. The buffer is
+    bounded: if the database falls behind, the oldest pending rows are
+    dropped and counted.
+
+    Each snapshot is also folded into the rollup tiers and the columnar
+    sensor blocks; closed buckets and blocks are written in the same
+    transaction as the raw rows.
+    """
+
+    def __init__(
+        self,
+        monitor: HardwareMonitor,
+        flush_interval: float = settings.HISTORY_FLUSH_INTERVAL,
+        batch_size: int = settings.HISTORY_BATCH_SIZE,
+        buffer_size: int = settings.HISTORY_BUFFER_SIZE,
+        rollup_tiers: List[int] = settings.HISTORY_ROLLUP_TIERS,
+        block_seconds: int = settings.HISTORY_BLOCK_SECONDS,
+        raw_json: bool = settings.HISTORY_RAW_JSON,
+    ):
+        self._monitor = monitor
+        self._flush_interval = flush_interval
+        self._batch_size = max(1, batch_size)
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=max(1, buffer_size))
+        self._rollups = RollupAggregator(rollup_tiers)
+        self._rollup_rows: List[Dict[str, Any]] = []
+        self._blocks = BlockBuilder(block_seconds)
+        self._block_rows: List[Dict[str, Any]] = []
+        self._sensor_ids: Dict[str, int] = {}
+        self._raw_json = raw_json
+        self._batch_ready = asyncio.Event()
+        self._subscription: Optional[SnapshotSubscription] = None
+        self._tasks = []
+
+        self.written = 0
+        self.rollups_written = 0
+        self.blocks_written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.failures = 0
+        self.last_flush_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    async def start(self):
+        """Start recording snapshots"""
+        if self._tasks:
+            return
+        logger.info("Starting history recorder")
+        self._subscription = self._monitor.subscribe()
+        self._tasks = [
+            asyncio.create_task(self._collect_loop()),
+            asyncio.create_task(self._flush_loop()),
+        ]
+
+    async def stop(self):
+        """Stop recording and flush whatever is still buffered"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._subscription:
+            self._monitor.unsubscribe(self._subscription)
+            # Record what was published but not consumed yet
+            while len(self._subscription):
+                self.add(await self._subscription.get())
+            self.dropped += self._subscription.dropped
+            self._subscription = None
+        self._rollup_rows.extend(self._rollups.drain())
+        self._block_rows.extend(self._blocks.drain())
+        while self._pending() and await self.flush():
+            pass
+
+    def add(self, snapshot: Snapshot):
+        """Buffer one snapshot for writing"""
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(snapshot_to_row(snapshot, self._raw_json))
+        self._rollup_rows.extend(self._rollups.add(snapshot))
+        self._block_rows.extend(self._blocks.add(snapshot))
+        if len(self._buffer) >= self._batch_size:
+            self._batch_ready.set()
+
+    async def _collect_loop(self):
+        while True:
+            self.add(await self._subscription.get())
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            while self._buffer:
+                if not await self.flush():
+                    break
+                if len(self._buffer) < self._batch_size:
+                    break
+
+    def sensor_paths(self) -> List[str]:
+        """Sensor paths whose history ids are cached (must not be pruned)"""
+        return list(self._sensor_ids)
+
+    def read_unflushed(
+        self, path: str, start: datetime, end: datetime
+    ) -> Tuple[List[float], List[float]]:
+        """Samples of one sensor not yet written to the columnar history"""
+        timestamps: List[float] = []
+        values: List[float] = []
+        for row in self._block_rows:
+            if row["path"] == path:
+                ts, vs = read_block(
+                    row["start"], row["timestamps"], row["values"], start, end
+                )
+                timestamps.extend(ts)
+                values.extend(vs)
+        ts, vs = self._blocks.read_open(path, start, end)
+        return timestamps + ts, values + vs
+
+    def _pending(self) -> bool:
+        return bool(self._buffer or self._rollup_rows or self._block_rows)
+
+    async def flush(self) -> bool:
+        """Write up to one batch of buffered rows in a single transaction"""
+        if not self._pending():
+            return True
+
+        count = min(len(self._buffer), self._batch_size)
+        rows = [self._buffer.popleft() for _ in range(count)]
+        rollup_rows, self._rollup_rows = self._rollup_rows, []
+        block_rows, self._block_rows = self._block_rows, []
+        start = time.perf_counter()
+        try:
+            async with engine.begin() as conn:
+                if rows:
+                    await conn.execute(insert(HardwareDataRecord), rows)
+                if rollup_rows:
+                    await conn.execute(upsert_rollups(), rollup_rows)
+                if block_rows:
+                    await write_blocks(conn, block_rows, self._sensor_ids)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logger.error(f"Error writing hardware history: {e}")
+            self._rollup_rows[:0] = rollup_rows
+            self._block_rows[:0] = block_rows
+            # Sensor ids resolved in the failed transaction were rolled back
+            self._sensor_ids.clear()
+            # Put the batch back; the bounded buffer drops the oldest if needed
+            space = self._buffer.maxlen - len(self._buffer)
+            self.dropped += max(len(rows) - space, 0)
+            self._buffer.extendleft(reversed(rows[-space:] if space else []))
+            return False
+
+        self.flushes += 1
+        self.written += count
+        self.rollups_written += len(rollup_rows)
+        self.blocks_written += len(block_rows)
+        self.last_flush_ms = round((time.perf_counter() - start) * 1000, 3)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Buffer and write statistics"""
+        return {
+            "buffered": len(self._buffer),
+            "buffer_size": self._buffer.maxlen,
+            "written": self.written,
+            "rollups_pending": len(self._rollup_rows),
+            "rollups_written": self.rollups_written,
+            "blocks_pending": len(self._block_rows),
+            "blocks_written": self.blocks_written,
+            "dropped": self.dropped
+            + (self._subscription.dropped if self._subscription else 0),
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "last_flush_ms": self.last_flush_ms,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,62 @@
+"""
+Event loop lag probe
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a periodic sleeper.
+
+    Any synchronous work on the loop (e.g. sensor collection) shows up
+    directly as lag, which is the delay every WebSocket send and REST
+    request experiences too.
+    """
+
+    def __init__(self, interval: float = 0.1, window: int = 600):
+        self._interval = interval
+        self._lags = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start probing the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._probe())
+
+    async def stop(self):
+        """Stop probing"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def reset(self):
+        """Discard collected measurements"""
+        self._lags.clear()
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self._interval
+            await asyncio.sleep(self._interval)
+            self._lags.append(max(loop.time() - expected, 0.0))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Lag statistics in milliseconds over the recent window"""
+        if not self._lags:
+            return {"samples": 0, "mean_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        lags = sorted(self._lags)
+        return {
+            "samples": len(lags),
+            "mean_ms": round(sum(lags) / len(lags) * 1000, 3),
+            "p99_ms": round(lags[min(int(len(lags) * 0.99), len(lags) - 1)] * 1000, 3),
+            "max_ms": round(lags[-1] * 1000, 3),
+        }
@@ -0,0 +1,93 @@
+"""
+Named scalar metrics and document helpers
+
+Metric names (e.g. ``cpu.temperature``) are shared by history rollups and
+anything else that tracks individual values over time. They are a subset of
+the sensor paths of ``Sample.sensor_values``.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+from services.sample import INT_FIELDS, LAYOUT, READING_GROUPS
+
+# Optional HardwareData fields; a missing required field is filled with 0
+OPTIONAL_FIELDS = frozenset(("temperature", "power_usage", "fan_speed"))
+
+
+def flatten(
+    document: Any, prefix: str = "", out: Dict[str, Any] = None
+) -> Dict[str, Any]:
+    """Flatten a JSON-compatible document into ``{path: leaf value}``
+
+    Empty lists/objects are kept as leaves so clients can rebuild them.
+    """
+    if out is None:
+        out = {}
+    if isinstance(document, (dict, list)) and not document:
+        out[prefix[:-1]] = document
+    elif isinstance(document, dict):
+        for key, value in document.items():
+            flatten(value, f"{prefix}{key}.", out)
+    elif isinstance(document, list):
+        for index, value in enumerate(document):
+            flatten(value, f"{prefix}{index}.", out)
+    else:
+        out[prefix[:-1]] = document
+    return out
+
+
+# Metric names tracked over time (history rollups); each is a sensor path of
+# ``Sample.sensor_values``
+METRICS: Tuple[str, ...] = (
+    "cpu.usage",
+    "cpu.temperature",
+    "cpu.frequency",
+    "gpu.usage",
+    "gpu.temperature",
+    "gpu.memory_usage",
+    "gpu.power_usage",
+    "gpu.fan_speed",
+    "memory.usage",
+    "memory.available",
+    "memory.cached",
+    "memory.swap_usage",
+    "storage.max_usage",
+    "network.bytes_sent",
+    "network.bytes_recv",
+    "network.packets_sent",
+    "network.packets_recv",
+)
+
+
+def metrics_to_document(
+    timestamp: datetime, values: Dict[str, float]
+) -> Dict[str, Any]:
+    """Build a complete, JSON-ready HardwareData document from metric values
+
+    ``<section>.<field>`` values fill the matching fields. Missing fields are
+    None where the model allows it and 0 otherwise; per-core, storage and
+    sensor lists are left empty. The document is not validated.
+    """
+
+    def section(name: str) -> Dict[str, Any]:
+        document = {}
+        for field in LAYOUT[name][1]:
+            value = values.get(f"{name}.{field}")
+            if value is None:
+                value = None if field in OPTIONAL_FIELDS else 0
+            elif field in INT_FIELDS:
+                value = int(value)
+            document[field] = value
+        return document
+
+    has_gpu = any(name.startswith("gpu.") for name in values)
+    return {
+        "timestamp": timestamp.isoformat(),
+        "cpu": {**section("cpu"), "cores": []},
+        "gpu": section("gpu") if has_gpu else None,
+        "memory": section("memory"),
+        "storage": [],
+        "network": section("network"),
+        "sensors": {group: [] for group in READING_GROUPS},
+    }
@@ -0,0 +1,198 @@
+"""
+History retention: deletes expired rows in bounded chunks and reclaims space
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, exists, select
+
+from config.settings import settings
+from database.database import engine
+from database.models import (
+    HardwareDataRecord,
+    HardwareRollupRecord,
+    HistoryBlockRecord,
+    HistorySensorRecord,
+)
+
+logger = logging.getLogger(__name__)
+
+# (model, timestamp column) pairs pruned by the retention job
+RETENTION_TARGETS: List[Tuple[Any, Any]] = [
+    (HardwareDataRecord, HardwareDataRecord.timestamp),
+    (HardwareRollupRecord, HardwareRollupRecord.bucket_start),
+    (HistoryBlockRecord, HistoryBlockRecord.end),
+]
+
+# PRAGMA auto_vacuum values
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+
+class RetentionService:
+    """Periodically enforces ``HISTORY_RETENTION_DAYS``.
+
+    Expired rows are deleted ``chunk_size`` at a time, each chunk in its own
+    short transaction, so the SQLite writer lock is released between chunks
+    and the history recorder is never blocked for long. Sensor paths left
+    without any history block are dropped too, except those in
+    ``active_sensor_paths()`` (ids the recorder still has cached).
+
+    Afterwards the freed pages are returned to the filesystem with
+    ``PRAGMA incremental_vacuum`` and the WAL is checkpointed. Databases
+    without incremental auto-vacuum are converted at startup by
+    ``init_db``; a full ``VACUUM`` never runs here, as it would hold the
+    writer for as long as it takes to rewrite the file.
+    """
+
+    def __init__(
+        self,
+        retention_days: int = settings.HISTORY_RETENTION_DAYS,
+        interval: float = settings.HISTORY_RETENTION_INTERVAL,
+        chunk_size: int = settings.HISTORY_RETENTION_CHUNK_SIZE,
+        active_sensor_paths: Callable[[], Collection[str]] = tuple,
+    ):
+        self._retention = timedelta(days=retention_days)
+        self._interval = interval
+        self._chunk_size = max(1, chunk_size)
+        self._active_sensor_paths = active_sensor_paths
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.deleted_total = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_run_ms: Optional[float] = None
+        self.last_deleted: Dict[str, int] = {}
+        self.last_chunks = 0
+        self.last_pages_freed = 0
+        self.auto_vacuum: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    async def start(self):
+        """Start the periodic retention job"""
+        if self._task:
+            return
+        logger.info("Starting history retention")
+        self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        """Stop the retention job"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Error enforcing history retention: {e}")
+            await asyncio.sleep(self._interval)
+
+    async def run_once(self) -> Dict[str, int]:
+        """Delete every expired row and reclaim the freed space"""
+        start = time.perf_counter()
+        cutoff = datetime.now() - self._retention
+        deleted = {}
+        chunks = 0
+        for model, column in RETENTION_TARGETS:
+            deleted[model.__tablename__] = 0
+            while True:
+                expired = (
+                    select(model.id)
+                    .where(column < cutoff)
+                    .limit(self._chunk_size)
+                    .scalar_subquery()
+                )
+                async with engine.begin() as conn:
+                    result = await conn.execute(
+                        delete(model).where(model.id.in_(expired))
+                    )
+                chunks += 1
+                deleted[model.__tablename__] += result.rowcount
+                if result.rowcount < self._chunk_size:
+                    break
+                # Let the recorder and readers in between chunks
+                await asyncio.sleep(0)
+
+        deleted[HistorySensorRecord.__tablename__] = await self._prune_sensors()
+        pages_freed = await self._reclaim() if any(deleted.values()) else 0
+
+        self.runs += 1
+        self.deleted_total += sum(deleted.values())
+        self.last_run_at = datetime.now()
+        self.last_run_ms = round((time.perf_counter() - start) * 1000, 3)
+        self.last_deleted = deleted
+        self.last_chunks = chunks
+        self.last_pages_freed = pages_freed
+        self.last_error = None
+        if any(deleted.values()):
+            logger.info(
+                f"History retention removed {deleted} in {self.last_run_ms} ms, "
+                f"freed {pages_freed} pages"
+            )
+        return deleted
+
+    async def _prune_sensors(self) -> int:
+        """Delete sensor paths that no longer have any history block"""
+        active = list(self._active_sensor_paths())
+        orphaned = ~exists().where(
+            HistoryBlockRecord.sensor_id == HistorySensorRecord.id
+        )
+        stmt = delete(HistorySensorRecord).where(orphaned)
+        if active:
+            stmt = stmt.where(HistorySensorRecord.path.not_in(active))
+        async with engine.begin() as conn:
+            result = await conn.execute(stmt)
+        return result.rowcount
+
+    async def _reclaim(self) -> int:
+        """Vacuum freed pages and checkpoint the WAL; return pages freed"""
+        if engine.dialect.name != "sqlite":
+            return 0
+        async with engine.connect() as conn:
+            pages_before = await self._pragma(conn, "page_count")
+            auto_vacuum = await self._pragma(conn, "auto_vacuum")
+            if auto_vacuum == 2:  # INCREMENTAL
+                # The pragma frees one page per step; run it as a script so
+                # the driver steps it to completion
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.executescript("PRAGMA incremental_vacuum")
+            elif auto_vacuum == 0 and self.auto_vacuum != "none":  # NONE
+                logger.warning(
+                    "Database has auto_vacuum = NONE: freed pages are reused "
+                    "but the file cannot shrink (see SQLITE_CONVERT_AUTO_VACUUM)"
+                )
+            self.auto_vacuum = AUTO_VACUUM_MODES.get(auto_vacuum)
+            if await self._pragma(conn, "journal_mode") == "wal":
+                await conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            pages_after = await self._pragma(conn, "page_count")
+        return pages_before - pages_after
+
+    @staticmethod
+    async def _pragma(conn, name: str):
+        result = await conn.exec_driver_sql(f"PRAGMA {name}")
+        return result.scalar()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retention run statistics"""
+        return {
+            "retention_days": self._retention.days,
+            "runs": self.runs,
+            "deleted_total": self.deleted_total,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_run_ms": self.last_run_ms,
+            "last_deleted": self.last_deleted,
+            "last_chunks": self.last_chunks,
+            "last_pages_freed": self.last_pages_freed,
+            "auto_vacuum": self.auto_vacuum,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,152 @@
+"""
+Fixed-size in-memory history of recent samples
+
+``SampleRing`` keeps the last ``capacity`` samples as preallocated
+``array('d')`` columns: one for the sample timestamps, one for the sequence
+numbers and one per sensor path (see ``Sample.sensor_values``). Appending a sample
+overwrites one slot of every column; nothing is allocated per sample.
+
+Memory: 8 bytes per sensor per sample, i.e. ``8 * 3600 / MONITORING_INTERVAL``
+bytes per sensor per hour of capacity, 28.8 KB at the default 1 Hz. The
+timestamp and sequence columns add two more such columns. A typical sample
+has about 50 sensor paths, so 15 minutes at 1 Hz take roughly 370 KB.
+
+The ring is written by ``HardwareMonitor._publish`` and read by request
+handlers, all on the event loop thread and without awaiting in between, so
+readers always see a consistent ring without any lock.
+"""
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.snapshot import Snapshot
+
+ITEM_SIZE = array("d").itemsize
+
+
+class SampleRing:
+    """The last ``capacity`` samples of every sensor, one column per sensor.
+
+    A sensor missing from a sample (or first seen after earlier samples) is
+    stored as NaN in that slot and skipped on read.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self._timestamps = self._column()
+        self._seqs = self._column()
+        self._columns: Dict[str, array] = {}
+        self._head = 0  # slot the next sample is written to
+        self._count = 0
+
+    def _column(self) -> array:
+        return array("d", [math.nan]) * self.capacity
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, snapshot: Snapshot):
+        """Store one sample, overwriting the oldest once the ring is full"""
+        slot = self._head
+        self._timestamps[slot] = snapshot.timestamp.timestamp()
+        self._seqs[slot] = snapshot.seq
+
+        values = snapshot.sensor_values
+        columns = self._columns
+        for path, column in columns.items():
+            column[slot] = values.get(path, math.nan)
+        for path in values.keys() - columns.keys():
+            column = columns[path] = self._column()
+            column[slot] = values[path]
+
+        self._head = (slot + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _ordered(self, column: array) -> array:
+        """``column`` oldest-first, limited to the filled slots"""
+        if self._count < self.capacity:
+            return column[: self._count]
+        head = self._head
+        return column[head:] + column[:head]
+
+    def oldest(self) -> Optional[float]:
+        """Timestamp of the oldest sample held, or None if empty"""
+        if not self._count:
+            return None
+        slot = self._head if self._count == self.capacity else 0
+        return self._timestamps[slot]
+
+    def covers(self, start: float) -> bool:
+        """Whether every sample since ``start`` (epoch seconds) is held"""
+        oldest = self.oldest()
+        return oldest is not None and oldest <= start
+
+    def read(
+        self, path: str, start: float, end: float
+    ) -> Tuple[List[float], List[float]]:
+        """Samples of ``path`` within ``[start, end]`` (epoch seconds)"""
+        column = self._columns.get(path)
+        if column is None or not self._count:
+            return [], []
+        timestamps = self._ordered(self._timestamps)
+        lo = bisect_left(timestamps, start)
+        hi = bisect_right(timestamps, end)
+        values = self._ordered(column)[lo:hi]
+        pairs = [(t, v) for t, v in zip(timestamps[lo:hi], values) if v == v]
+        return [t for t, _ in pairs], [v for _, v in pairs]
+
+    def window(
+        self, start: float
+    ) -> Tuple[List[int], List[float], Dict[str, List[Optional[float]]]]:
+        """Every sample since ``start`` as ``(seqs, timestamps, columns)``.
+
+        Columns are keyed by sensor path with None for missing values;
+        sensors without any value in the window are left out.
+        """
+        if not self._count:
+            return [], [], {}
+        timestamps = self._ordered(self._timestamps)
+        lo = bisect_left(timestamps, start)
+        seqs = [int(seq) for seq in self._ordered(self._seqs)[lo:]]
+        columns = {}
+        for path, column in self._columns.items():
+            values = [v if v == v else None for v in self._ordered(column)[lo:]]
+            if any(v is not None for v in values):
+                columns[path] = values
+        return seqs, timestamps[lo:].tolist(), columns
+
+    def _newest(self, column: array, n: int) -> array:
+        """The ``n`` newest entries of ``column``, oldest-first"""
+        head = self._head
+        start = head - n
+        if start >= 0:
+            return column[start:head]
+        return column[start:] + column[:head]
+
+    def extremes(
+        self, paths: Iterable[str], after_seq: int
+    ) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Min and max of each path over the samples newer than ``after_seq``"""
+        seqs = self._ordered(self._seqs)
+        n = len(seqs) - bisect_right(seqs, after_seq)
+        lows, highs = {}, {}
+        for path in paths:
+            column = self._columns.get(path)
+            if column is None or not n:
+                continue
+            values = [v for v in self._newest(column, n) if v == v]
+            if values:
+                lows[path], highs[path] = min(values), max(values)
+        return lows, highs
+
+    def get_stats(self) -> Dict[str, int]:
+        """Capacity, fill level and memory held by the columns"""
+        columns = len(self._columns) + 2
+        return {
+            "capacity": self.capacity,
+            "samples": self._count,
+            "sensors": len(self._columns),
+            "bytes": columns * self.capacity * ITEM_SIZE,
+        }
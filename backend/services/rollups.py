@@ -0,0 +1,145 @@
+"""
+Incremental multi-resolution rollups of history metrics
+
+Every sample is folded into the open bucket of each tier (e.g. 10 s, 1 min,
+15 min). When a sample lands in a later bucket the previous one is closed
+and emitted as ``hardware_rollups`` rows with min/max/avg/last per metric,
+so long history ranges read a few pre-aggregated rows instead of raw
+samples.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+
+from database.models import HardwareRollupRecord
+from services.metrics import METRICS
+from services.snapshot import Snapshot
+
+
+class _Bucket:
+    """Running aggregates for one metric in one bucket"""
+
+    __slots__ = ("count", "min", "max", "total", "last")
+
+    def __init__(self, value: float):
+        self.count = 1
+        self.min = self.max = self.total = self.last = value
+
+    def add(self, value: float):
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.total += value
+        self.last = value
+
+
+class RollupAggregator:
+    """Folds samples into per-tier buckets and returns closed bucket rows"""
+
+    def __init__(self, tiers: Sequence[int]):
+        self.tiers = sorted({int(t) for t in tiers if t > 0})
+        self._starts: Dict[int, Optional[float]] = {tier: None for tier in self.tiers}
+        self._buckets: Dict[int, Dict[str, _Bucket]] = {tier: {} for tier in self.tiers}
+
+    def add(self, snapshot: Snapshot) -> List[Dict[str, Any]]:
+        """Fold one sample in; return rows for any buckets it closed"""
+        sensor_values = snapshot.sensor_values
+        values = {
+            metric: sensor_values[metric]
+            for metric in METRICS
+            if metric in sensor_values
+        }
+        now = snapshot.timestamp.timestamp()
+        rows = []
+        for tier in self.tiers:
+            start = now - now % tier
+            if self._starts[tier] != start:
+                rows.extend(self._close(tier))
+                self._starts[tier] = start
+            buckets = self._buckets[tier]
+            for metric, value in values.items():
+                bucket = buckets.get(metric)
+                if bucket is None:
+                    buckets[metric] = _Bucket(value)
+                else:
+                    bucket.add(value)
+        return rows
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Close every open bucket, e.g. on shutdown"""
+        rows = []
+        for tier in self.tiers:
+            rows.extend(self._close(tier))
+            self._starts[tier] = None
+        return rows
+
+    def _close(self, tier: int) -> List[Dict[str, Any]]:
+        start = self._starts[tier]
+        buckets = self._buckets[tier]
+        if start is None or not buckets:
+            return []
+        bucket_start = datetime.fromtimestamp(start)
+        rows = [
+            {
+                "tier": tier,
+                "metric": metric,
+                "bucket_start": bucket_start,
+                "count": bucket.count,
+                "min": bucket.min,
+                "max": bucket.max,
+                "avg": bucket.total / bucket.count,
+                "last": bucket.last,
+            }
+            for metric, bucket in buckets.items()
+        ]
+        self._buckets[tier] = {}
+        return rows
+
+
+def upsert_rollups():
+    """Insert statement merging rollup rows into existing buckets.
+
+    Execute it with a list of rows from ``RollupAggregator``. A bucket can be
+    written twice when it was drained on shutdown and the monitor restarts
+    inside the same interval; the partial aggregates are combined rather
+    than duplicated.
+    """
+    stmt = insert(HardwareRollupRecord)
+    table = HardwareRollupRecord.__table__.c
+    new = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[table.tier, table.metric, table.bucket_start],
+        set_={
+            "count": table.count + new.count,
+            "min": func.min(table.min, new.min),
+            "max": func.max(table.max, new.max),
+            "avg": (table.avg * table.count + new.avg * new.count)
+            / (table.count + new.count),
+            "last": new.last,
+        },
+    )
+
+
+def choose_tier(
+    span_seconds: float,
+    points: int,
+    tiers: Sequence[int],
+    sample_interval: float = 0.0,
+) -> int:
+    """Pick the coarsest tier that still yields ``points`` buckets.
+
+    Returns 0 (raw samples) when even the finest tier would give fewer,
+    unless the raw samples (one per ``sample_interval``) would exceed
+    ``points``; the finest tier is then the closest fit.
+    """
+    for tier in sorted(tiers, reverse=True):
+        if span_seconds / tier >= points:
+            return tier
+    if tiers and sample_interval and span_seconds / sample_interval > points:
+        return min(tiers)
+    return 0
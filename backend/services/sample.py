@@ -0,0 +1,312 @@
+"""
+Compact internal sample representation
+
+Collectors produce a ``Sample``: one flat ``array('d')`` of sensor values
+laid out by a ``SampleSchema``. The schema holds everything that stays the
+same between device enumerations (core count, device and sensor names, the
+sensor path of every slot), so a tick allocates a single array instead of a
+pydantic model per core, device and sensor. Missing values are stored as
+NaN.
+
+Pydantic models are only built at the API boundary (``Sample.to_model``),
+with ``model_construct``: collector output is trusted and not validated
+again. The stream encoders use ``Sample.to_document``, a JSON-ready dict
+built straight from the array.
+"""
+
+import math
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cached_property, lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from models.hardware import (
+    CPUCore,
+    CPUData,
+    GPUData,
+    HardwareData,
+    MemoryData,
+    NetworkData,
+    SensorData,
+    SensorReading,
+    StorageDevice,
+)
+
+NAN = math.nan
+
+READING_GROUPS = ("temperatures", "fans", "voltages")
+
+# section -> (path of item i, fields per item, in model field order); the
+# slots of a sample follow this order
+LAYOUT: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "cpu": ("cpu", ("usage", "temperature", "frequency")),
+    "memory": ("memory", ("usage", "available", "cached", "swap_usage")),
+    "network": (
+        "network",
+        ("bytes_sent", "bytes_recv", "packets_sent", "packets_recv"),
+    ),
+    "gpu": (
+        "gpu",
+        ("usage", "temperature", "memory_usage", "power_usage", "fan_speed"),
+    ),
+    "cores": ("cpu.cores.{}", ("core", "usage", "temperature")),
+    "storage": ("storage.{}", ("usage", "read_speed", "write_speed", "temperature")),
+    **{group: (f"sensors.{group}.{{}}", ("value",)) for group in READING_GROUPS},
+}
+
+# Integer model fields; every slot is stored as a double
+INT_FIELDS = frozenset(("core",) + LAYOUT["network"][1])
+
+
+@dataclass(frozen=True)
+class SampleSchema:
+    """Static layout of a collector's samples.
+
+    Obtain schemas through ``get_schema`` so equal layouts share one
+    instance and its cached slot tables.
+    """
+
+    cores: int = 0
+    gpu: bool = False
+    storage: Tuple[str, ...] = ()  # device names
+    temperatures: Tuple[str, ...] = ()  # sensor names
+    fans: Tuple[str, ...] = ()
+    voltages: Tuple[str, ...] = ()
+
+    def count(self, section: str) -> int:
+        """Number of items of ``section`` in every sample"""
+        if section in ("cpu", "memory", "network"):
+            return 1
+        if section == "gpu":
+            return int(self.gpu)
+        if section == "cores":
+            return self.cores
+        return len(getattr(self, section))
+
+    @cached_property
+    def offsets(self) -> Dict[str, int]:
+        """First slot of every section"""
+        offsets, slot = {}, 0
+        for section, (_, fields) in LAYOUT.items():
+            offsets[section] = slot
+            slot += len(fields) * self.count(section)
+        return offsets
+
+    @cached_property
+    def paths(self) -> Tuple[str, ...]:
+        """Sensor path of every slot.
+
+        Paths follow the HardwareData document: ``cpu.usage``,
+        ``cpu.cores.<i>.usage``, ``storage.<i>.read_speed``,
+        ``sensors.fans.<i>.value`` and so on, with list indexes starting
+        at 0.
+        """
+        paths = []
+        for section, (item, fields) in LAYOUT.items():
+            for i in range(self.count(section)):
+                prefix = item.format(i)
+                paths.extend(f"{prefix}.{field}" for field in fields)
+        return tuple(paths)
+
+    @cached_property
+    def empty(self) -> array:
+        """Value array of a new sample: NaN except for the core numbers"""
+        values = array("d", [NAN]) * len(self.paths)
+        width = len(LAYOUT["cores"][1])
+        start = self.offsets["cores"]
+        stop = start + width * self.cores
+        values[start:stop:width] = array("d", range(1, self.cores + 1))
+        return values
+
+
+@lru_cache(maxsize=256)
+def get_schema(
+    cores: int = 0,
+    gpu: bool = False,
+    storage: Tuple[str, ...] = (),
+    temperatures: Tuple[str, ...] = (),
+    fans: Tuple[str, ...] = (),
+    voltages: Tuple[str, ...] = (),
+) -> SampleSchema:
+    """The shared schema for one layout"""
+    return SampleSchema(cores, gpu, storage, temperatures, fans, voltages)
+
+
+class Sample:
+    """One collected sample: schema, timestamp and a flat value array.
+
+    A sample must not be modified once the collector has returned it;
+    replayed samples share their value array.
+    """
+
+    __slots__ = ("schema", "timestamp", "values")
+
+    def __init__(
+        self, schema: SampleSchema, timestamp: datetime, values: Optional[array] = None
+    ):
+        self.schema = schema
+        self.timestamp = timestamp
+        self.values = schema.empty[:] if values is None else values
+
+    def set_fields(
+        self, section: str, fields: Sequence[Optional[float]], index: int = 0
+    ):
+        """Write every field of item ``index`` of ``section`` (None -> NaN)"""
+        width = len(LAYOUT[section][1])
+        slot = self.schema.offsets[section] + index * width
+        values = self.values
+        for value in fields:
+            values[slot] = NAN if value is None else value
+            slot += 1
+
+    def set_column(self, section: str, field: str, column: Sequence[Optional[float]]):
+        """Write ``field`` of every item of ``section`` (None -> NaN)"""
+        fields = LAYOUT[section][1]
+        width = len(fields)
+        start = self.schema.offsets[section] + fields.index(field)
+        stop = start + width * len(column)
+        self.values[start:stop:width] = array(
+            "d", [NAN if value is None else value for value in column]
+        )
+
+    def with_timestamp(self, timestamp: datetime) -> "Sample":
+        """The same values at another time, sharing the value array"""
+        return Sample(self.schema, timestamp, self.values)
+
+    def _item(self, section: str, index: int = 0) -> Dict[str, Any]:
+        """Fields of one item as JSON-ready values (NaN -> None)"""
+        fields = LAYOUT[section][1]
+        start = self.schema.offsets[section] + index * len(fields)
+        stop = start + len(fields)
+        return {
+            field: (
+                None if value != value else int(value) if field in INT_FIELDS else value
+            )
+            for field, value in zip(fields, self.values[start:stop])
+        }
+
+    def _column(self, section: str, field: str) -> array:
+        """``field`` of every item of ``section``"""
+        fields = LAYOUT[section][1]
+        width = len(fields)
+        start = self.schema.offsets[section] + fields.index(field)
+        stop = start + width * self.schema.count(section)
+        return self.values[start:stop:width]
+
+    def _cores(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "core": int(core),
+                "usage": usage if usage == usage else None,
+                "temperature": temperature if temperature == temperature else None,
+            }
+            for core, usage, temperature in zip(
+                self._column("cores", "core"),
+                self._column("cores", "usage"),
+                self._column("cores", "temperature"),
+            )
+        ]
+
+    def _readings(self, group: str) -> List[Dict[str, Any]]:
+        return [
+            {"name": name, "value": value if value == value else None}
+            for name, value in zip(
+                getattr(self.schema, group), self._column(group, "value")
+            )
+        ]
+
+    def to_document(self) -> Dict[str, Any]:
+        """The sample as a JSON-ready dict, like ``model_dump(mode="json")``"""
+        schema = self.schema
+        item = self._item
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "cpu": {**item("cpu"), "cores": self._cores()},
+            "gpu": item("gpu") if schema.gpu else None,
+            "memory": item("memory"),
+            "storage": [
+                {"device": name, **item("storage", i)}
+                for i, name in enumerate(schema.storage)
+            ],
+            "network": item("network"),
+            "sensors": {group: self._readings(group) for group in READING_GROUPS},
+        }
+
+    def to_model(self) -> HardwareData:
+        """Materialize the pydantic model without validation"""
+        schema = self.schema
+        item = self._item
+        return HardwareData.model_construct(
+            timestamp=self.timestamp,
+            cpu=CPUData.model_construct(
+                **item("cpu"),
+                cores=[CPUCore.model_construct(**core) for core in self._cores()],
+            ),
+            gpu=GPUData.model_construct(**item("gpu")) if schema.gpu else None,
+            memory=MemoryData.model_construct(**item("memory")),
+            storage=[
+                StorageDevice.model_construct(device=name, **item("storage", i))
+                for i, name in enumerate(schema.storage)
+            ],
+            network=NetworkData.model_construct(**item("network")),
+            sensors=SensorData.model_construct(
+                **{
+                    group: [
+                        SensorReading.model_construct(**reading)
+                        for reading in self._readings(group)
+                    ]
+                    for group in READING_GROUPS
+                }
+            ),
+        )
+
+    def sensor_values(self) -> Dict[str, float]:
+        """Every present sensor value keyed by path.
+
+        These are the slots named by ``SampleSchema.paths``, without missing
+        values, plus the derived ``storage.max_usage`` metric.
+        """
+        values = {
+            path: value
+            for path, value in zip(self.schema.paths, self.values)
+            if value == value
+        }
+        usages = [v for v in self._column("storage", "usage") if v == v]
+        if usages:
+            values["storage.max_usage"] = max(usages)
+        return values
+
+    @classmethod
+    def from_model(cls, data: HardwareData) -> "Sample":
+        """Pack a HardwareData model, e.g. a recorded sample"""
+        sensors = data.sensors
+        schema = get_schema(
+            cores=len(data.cpu.cores),
+            gpu=data.gpu is not None,
+            storage=tuple(device.device for device in data.storage),
+            **{
+                group: tuple(reading.name for reading in getattr(sensors, group))
+                for group in READING_GROUPS
+            },
+        )
+        sample = cls(schema, data.timestamp)
+        for section in ("cpu", "memory", "network", "gpu"):
+            model = getattr(data, section)
+            if model is not None:
+                sample.set_fields(
+                    section, [getattr(model, field) for field in LAYOUT[section][1]]
+                )
+        for i, core in enumerate(data.cpu.cores):
+            sample.set_fields("cores", (core.core, core.usage, core.temperature), i)
+        for i, device in enumerate(data.storage):
+            sample.set_fields(
+                "storage",
+                [getattr(device, field) for field in LAYOUT["storage"][1]],
+                i,
+            )
+        for group in READING_GROUPS:
+            sample.set_column(
+                group, "value", [reading.value for reading in getattr(sensors, group)]
+            )
+        return sample
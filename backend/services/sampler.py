@@ -0,0 +1,111 @@
+"""
+Dedicated sampler thread that owns the collector session
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from services.collectors import CollectorSession
+from services.scheduler import TickScheduler
+from services.snapshot import Snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class SamplerThread(threading.Thread):
+    """Collects samples off the event loop and hands them over as snapshots.
+
+    The thread creates, opens and closes the collector session itself, so
+    blocking .NET/procfs calls never run on the asyncio loop. Each sample is
+    wrapped in an immutable ``Snapshot`` and handed to ``publish``, which is
+    scheduled on the loop with ``call_soon_threadsafe``, so no locks are
+    shared with the loop.
+
+    Failing to create or open the session is not fatal: it counts as an
+    error and is retried on every tick, so a driver that is not ready at
+    boot is picked up once it is.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], CollectorSession],
+        scheduler: TickScheduler,
+        loop: asyncio.AbstractEventLoop,
+        publish: Callable[[Snapshot], None],
+    ):
+        super().__init__(name="hardware-sampler", daemon=True)
+        self._session_factory = session_factory
+        self.scheduler = scheduler
+        self._loop = loop
+        self._publish = publish
+        self._stop_event = threading.Event()
+
+        self.session: Optional[CollectorSession] = None
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    def run(self):
+        seq = 0
+        self.scheduler.reset()
+        try:
+            while True:
+                start = time.perf_counter()
+                if self.session is None:
+                    self.session = self._open_session()
+                if self.session is not None:
+                    try:
+                        sample = self.session.collect()
+                    except Exception as e:
+                        self._record_error(f"Error in sampler thread: {e}")
+                    else:
+                        seq += 1
+                        self.last_error = None
+                        snapshot = Snapshot(
+                            seq=seq,
+                            sample=sample,
+                            collected_at=time.monotonic(),
+                            duration=time.perf_counter() - start,
+                        )
+                        try:
+                            self._loop.call_soon_threadsafe(self._publish, snapshot)
+                        except RuntimeError:
+                            # Event loop closed underneath us during shutdown
+                            break
+
+                if not self.scheduler.wait(self._stop_event):
+                    break
+        finally:
+            session, self.session = self.session, None
+            if session is not None:
+                session.close()
+
+    def _open_session(self) -> Optional[CollectorSession]:
+        """Create and open the collector session; None to retry on the next tick"""
+        session = None
+        try:
+            session = self._session_factory()
+            session.open()
+        except Exception as e:
+            name = session.name if session else "configured"
+            self._record_error(f"Failed to open '{name}' collector: {e}")
+            return None
+        logger.info(f"Using '{session.name}' collector backend")
+        return session
+
+    def _record_error(self, message: str):
+        """Count a failed tick; repeats of the same error are only logged at debug"""
+        self.errors += 1
+        if message != self.last_error:
+            logger.error(message)
+        else:
+            logger.debug(message)
+        self.last_error = message
+
+    def stop(self, timeout: Optional[float] = None):
+        """Signal the thread to stop and wait for it to finish"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
@@ -0,0 +1,112 @@
+"""
+Drift-free fixed-rate tick scheduler
+"""
+
+import math
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Dict
+
+
+class MissedTickPolicy(str, Enum):
+    """What to do when work overruns one or more tick deadlines"""
+
+    SKIP = "skip"  # drop missed ticks, stay aligned to the original grid
+    CATCH_UP = "catch_up"  # run missed ticks back-to-back until on schedule
+    COALESCE = "coalesce"  # run one tick now, then restart the grid from now
+
+
+class TickScheduler:
+    """Deadline-based scheduler on the monotonic clock.
+
+    Deadlines are computed as ``start + n * interval`` rather than by
+    sleeping ``interval`` after the work is done, so the period does not
+    grow by the work's duration and independent loops do not drift apart.
+
+    An overrun is counted once, when it is detected. ``missed_ticks`` are
+    deadlines that passed without a tick of their own (skip, coalesce);
+    ``late_ticks`` are ticks that still ran, only late (catch_up).
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        policy: MissedTickPolicy = MissedTickPolicy.SKIP,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.policy = MissedTickPolicy(policy)
+        self._clock = clock
+        self._deadline = clock()
+
+        self.ticks = 0
+        self.overruns = 0
+        self.missed_ticks = 0
+        self.late_ticks = 0
+        self._catching_up = False
+        self._jitter_total = 0.0
+        self._jitter_max = 0.0
+
+    def reset(self):
+        """Restart the deadline grid from now"""
+        self._deadline = self._clock()
+
+    def next_delay(self) -> float:
+        """Advance to the next deadline and return how long to wait for it"""
+        now = self._clock()
+        self._deadline += self.interval
+        if now <= self._deadline:
+            self._catching_up = False
+            return self._deadline - now
+
+        # Deadlines already passed, including the one we just advanced to
+        passed = int(math.floor((now - self._deadline) / self.interval)) + 1
+        if self.policy is MissedTickPolicy.CATCH_UP:
+            # Back-to-back catch-up ticks belong to the overrun that caused them
+            if not self._catching_up:
+                self.overruns += 1
+                self._catching_up = True
+            self.late_ticks += 1
+            return 0.0
+
+        self.overruns += 1
+        if self.policy is MissedTickPolicy.COALESCE:
+            # One tick now stands in for every passed deadline
+            self.missed_ticks += passed - 1
+            self._deadline = now
+            return 0.0
+        # SKIP: jump to the first grid point in the future
+        self.missed_ticks += passed
+        self._deadline += passed * self.interval
+        return self._deadline - now
+
+    def _record_wakeup(self):
+        jitter = max(self._clock() - self._deadline, 0.0)
+        self.ticks += 1
+        self._jitter_total += jitter
+        self._jitter_max = max(self._jitter_max, jitter)
+
+    def wait(self, stop_event: threading.Event) -> bool:
+        """Block until the next tick; returns False if ``stop_event`` was set"""
+        if stop_event.wait(self.next_delay()):
+            return False
+        self._record_wakeup()
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tick, overrun and jitter statistics"""
+        return {
+            "interval": self.interval,
+            "policy": self.policy.value,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "missed_ticks": self.missed_ticks,
+            "late_ticks": self.late_ticks,
+            "jitter_mean_ms": (
+                round(self._jitter_total / self.ticks * 1000, 3) if self.ticks else 0.0
+            ),
+            "jitter_max_ms": round(self._jitter_max * 1000, 3),
+        }
@@ -0,0 +1,115 @@
+"""
+Process-wide cache of UserSettings rows and alert thresholds
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from database.database import AsyncSessionLocal
+from database.models import UserSettings
+from models.hardware import AlertThreshold
+
+logger = logging.getLogger(__name__)
+
+THRESHOLD_PREFIX = "alert_threshold_"
+
+# Called with (key, value) after a change; value is None when deleted
+SettingsListener = Callable[[str, Optional[Any]], None]
+
+
+def parse_threshold_setting(key: str, value: Any) -> Optional[AlertThreshold]:
+    """Parse an ``alert_threshold_<metric>`` UserSettings row"""
+    if not key.startswith(THRESHOLD_PREFIX) or not isinstance(value, dict):
+        return None
+    return AlertThreshold(
+        metric=key.replace(THRESHOLD_PREFIX, "", 1),
+        threshold=value.get("threshold", 0),
+        enabled=value.get("enabled", True),
+        comparison=value.get("comparison", "greater"),
+    )
+
+
+class SettingsCache:
+    """All UserSettings rows held in memory.
+
+    The table is read once at startup; afterwards the settings routes write
+    through (``set``/``delete`` after each commit), so lookups are plain
+    dictionary reads that are safe on the per-tick hot path. Listeners are
+    notified synchronously on every change.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Any, datetime]] = {}
+        self._thresholds: Dict[str, AlertThreshold] = {}
+        self._listeners: List[SettingsListener] = []
+        self.loaded = False
+
+    async def load(self):
+        """Load every row from the database"""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(UserSettings))
+            rows = result.scalars().all()
+        self._entries = {}
+        self._thresholds = {}
+        for row in rows:
+            self._store(row.key, row.value, row.updated_at)
+        self.loaded = True
+        logger.info(f"Loaded {len(self._entries)} user settings")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value of ``key``, or ``default`` if it is not set"""
+        entry = self._entries.get(key)
+        return entry[0] if entry else default
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, datetime]]:
+        """``(value, updated_at)`` of ``key``, or None if it is not set"""
+        return self._entries.get(key)
+
+    def items(self) -> List[Tuple[str, Any, datetime]]:
+        """Every ``(key, value, updated_at)``"""
+        return [(key, value, at) for key, (value, at) in self._entries.items()]
+
+    def thresholds(self) -> Dict[str, AlertThreshold]:
+        """Alert thresholds from ``alert_threshold_*`` rows, keyed by metric"""
+        return dict(self._thresholds)
+
+    def set(self, key: str, value: Any, updated_at: Optional[datetime] = None):
+        """Record a committed insert/update and notify listeners"""
+        self._store(key, value, updated_at or datetime.now())
+        self._notify(key, value)
+
+    def delete(self, key: str):
+        """Record a committed delete and notify listeners"""
+        self._entries.pop(key, None)
+        if key.startswith(THRESHOLD_PREFIX):
+            self._thresholds.pop(key.replace(THRESHOLD_PREFIX, "", 1), None)
+        self._notify(key, None)
+
+    def subscribe(self, listener: SettingsListener) -> Callable[[], None]:
+        """Call ``listener`` on every change; returns an unsubscribe function"""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _store(self, key: str, value: Any, updated_at: datetime):
+        self._entries[key] = (value, updated_at)
+        if key.startswith(THRESHOLD_PREFIX):
+            self._thresholds.pop(key.replace(THRESHOLD_PREFIX, "", 1), None)
+            try:
+                threshold = parse_threshold_setting(key, value)
+            except ValidationError as e:
+                # Keep the raw entry; a bad row must not stop startup
+                logger.warning(f"Ignoring invalid alert threshold setting {key}: {e}")
+                return
+            if threshold:
+                self._thresholds[threshold.metric] = threshold
+
+    def _notify(self, key: str, value: Optional[Any]):
+        for listener in list(self._listeners):
+            try:
+                listener(key, value)
+            except Exception as e:
+                logger.error(f"Error in settings listener for {key}: {e}")
@@ -0,0 +1,72 @@
+"""
+Immutable hardware snapshots handed from the sampler to the event loop
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cached_property
+from typing import Any, Dict
+
+from models.hardware import HardwareData
+from services.encoding import encode_json, encode_msgpack
+from services.sample import Sample
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One collected sample and its collection metadata.
+
+    The encodings are computed on first use and cached on the snapshot, so
+    each sample is serialized at most once no matter how many clients
+    receive it.
+    """
+
+    seq: int  # monotonically increasing sample number
+    sample: Sample
+    collected_at: float  # time.monotonic() when collection finished
+    duration: float  # seconds spent collecting
+
+    @property
+    def timestamp(self) -> datetime:
+        """When the sample was taken"""
+        return self.sample.timestamp
+
+    @cached_property
+    def data(self) -> HardwareData:
+        """The sample as a HardwareData model, built without validation.
+
+        Nothing in the server reads it: routes and streams use the cached
+        encodings. It stays for code that needs the model itself, such as
+        the benchmarks comparing against per-client model serialization.
+        """
+        return self.sample.to_model()
+
+    @cached_property
+    def document(self) -> Dict[str, Any]:
+        """The sample as a JSON-ready dict; shared, so treat it as read-only"""
+        return self.sample.to_document()
+
+    @cached_property
+    def json_text(self) -> str:
+        """The sample encoded as JSON text"""
+        return encode_json(self.document)
+
+    @cached_property
+    def json_bytes(self) -> bytes:
+        """The sample encoded as UTF-8 JSON"""
+        return self.json_text.encode()
+
+    @cached_property
+    def sse_bytes(self) -> bytes:
+        """The sample as one Server-Sent Events message (id = seq)"""
+        return b"id: %d\nevent: hardware\ndata: %s\n\n" % (self.seq, self.json_bytes)
+
+    @cached_property
+    def msgpack_bytes(self) -> bytes:
+        """The sample encoded as MessagePack (requires msgpack)"""
+        return encode_msgpack(self.document)
+
+    @cached_property
+    def sensor_values(self) -> Dict[str, float]:
+        """Every numeric sensor value keyed by path (see ``Sample.sensor_values``)"""
+        return self.sample.sensor_values()
@@ -0,0 +1,90 @@
+"""
+Topic subscriptions: clients receive only the sensor paths they display
+
+A client opts in by sending a JSON message over ``/ws``::
+
+    {"type": "subscribe", "paths": ["cpu.usage", "sensors.fans"],
+     "interval": 1, "coalesce": "latest"}
+
+Each entry of ``paths`` is a sensor path (see ``Sample.sensor_values``) or a prefix
+of one: ``sensors.fans`` selects every ``sensors.fans.<i>.value``. Instead
+of full documents the client then receives, at its update rate::
+
+    {"type": "topic", "seq", "timestamp", "values": {path: value}}
+
+With ``"coalesce": "minmax"`` the frame also carries ``"min"`` and ``"max"``
+of every path over the samples since the previous frame, so spikes between
+updates are not lost. ``{"type": "unsubscribe"}`` returns to the full
+stream. Clients with the same paths, window and encoding share one encoded
+frame per tick.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from services.encoding import encode_json, encode_msgpack
+from services.ring_buffer import SampleRing
+from services.snapshot import Snapshot
+
+MAX_PATHS = 256
+
+COALESCE_LATEST = "latest"  # the newest value of each path
+COALESCE_MINMAX = "minmax"  # newest value plus min/max over the window
+COALESCE_MODES = (COALESCE_LATEST, COALESCE_MINMAX)
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """Sensor paths a client wants"""
+
+    paths: Tuple[str, ...]
+
+    @classmethod
+    def from_message(cls, message: Dict[str, Any]) -> "Subscription":
+        """Validate a ``subscribe`` message; raises ValueError"""
+        paths = message.get("paths")
+        if (
+            not isinstance(paths, list)
+            or not paths
+            or len(paths) > MAX_PATHS
+            or not all(isinstance(path, str) and path for path in paths)
+        ):
+            raise ValueError(f"'paths' must be a list of 1-{MAX_PATHS} sensor paths")
+        return cls(paths=tuple(sorted(set(paths))))
+
+    def select(self, values: Dict[str, float]) -> Dict[str, float]:
+        """The subscribed subset of a sample's sensor values"""
+        selected = {}
+        for path in self.paths:
+            value = values.get(path)
+            if value is not None:
+                selected[path] = value
+                continue
+            prefix = path + "."
+            selected.update(
+                (key, value) for key, value in values.items() if key.startswith(prefix)
+            )
+        return selected
+
+
+def encode_topic(
+    snapshot: Snapshot,
+    subscription: Subscription,
+    binary: bool = False,
+    ring: Optional[SampleRing] = None,
+    after_seq: int = 0,
+) -> Any:
+    """One ``topic`` frame for ``subscription`` as JSON text or MessagePack.
+
+    With ``ring``, min/max over the samples after ``after_seq`` are added.
+    """
+    values = subscription.select(snapshot.sensor_values)
+    message = {
+        "type": "topic",
+        "seq": snapshot.seq,
+        "timestamp": snapshot.timestamp.isoformat(),
+        "values": values,
+    }
+    if ring is not None:
+        message["min"], message["max"] = ring.extremes(values, after_seq)
+    return encode_msgpack(message) if binary else encode_json(message)
@@ -2,62 +2,477 @@
 WebSocket connection manager for real-time data broadcasting
 """
 
+import asyncio
+import itertools
 import json
 import logging
-from typing import List, Dict, Any
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Any, Optional, Tuple, Union
 from fastapi import WebSocket
 
+from config.settings import settings
+from services.binary_codec import PackedEncoder
+from services.delta_codec import DeltaEncoder
+from services.encoding import MSGPACK_AVAILABLE, encode_json, encode_msgpack
+from services.ring_buffer import SampleRing
+from services.snapshot import Snapshot
+from services.topics import (
+    COALESCE_LATEST,
+    COALESCE_MINMAX,
+    COALESCE_MODES,
+    Subscription,
+    encode_topic,
+)
+
 logger = logging.getLogger(__name__)
 
+Message = Union[str, bytes]
+
+# Stream protocols a client can select with ``/ws?protocol=``
+PROTOCOL_JSON = "json"  # full HardwareData document every update
+PROTOCOL_DELTA = "delta"  # keyframes plus changed values (see delta_codec)
+PROTOCOL_PACKED = "packed"  # schema + packed float frames (see binary_codec)
+PROTOCOL_MSGPACK = "msgpack"  # full document as MessagePack
+PROTOCOLS = (PROTOCOL_JSON, PROTOCOL_DELTA, PROTOCOL_PACKED) + (
+    (PROTOCOL_MSGPACK,) if MSGPACK_AVAILABLE else ()
+)
+
+# Binary protocols can also be negotiated as WebSocket subprotocols
+SUBPROTOCOLS = {
+    "hwmon.packed.v1": PROTOCOL_PACKED,
+    "hwmon.msgpack.v1": PROTOCOL_MSGPACK,
+}
+
+_client_ids = itertools.count(1)
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: str) -> float:
+    """Parse ``300``, ``300s``, ``5m`` or ``1h`` into seconds"""
+    value = value.strip().lower()
+    unit = _DURATION_UNITS.get(value[-1:], None)
+    number = float(value[:-1] if unit else value)
+    if number < 0 or number != number:
+        raise ValueError(f"Invalid duration: {value}")
+    return number * (unit or 1)
+
+
+class ClientConnection:
+    """A connected client with a bounded outbound queue and its own writer task.
+
+    Enqueueing never blocks. A droppable frame (a snapshot) replaces every
+    droppable frame still queued, so a client that falls behind skips
+    straight to the latest value; stateful protocols then resync instead of
+    applying deltas to a base they never received. Non-droppable frames
+    such as alerts are only dropped, oldest first, when the queue is full.
+
+    Each client has its own update rate, checked by ``is_due`` on every
+    sample rather than by a timer. A client whose previous frames are still
+    queued when the next one is due has its interval doubled (up to
+    ``WEBSOCKET_MAX_INTERVAL``), and halved again once it keeps up; a
+    client reporting a hidden tab is slowed to ``WEBSOCKET_HIDDEN_INTERVAL``.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        protocol: str,
+        max_queue: int,
+        send_timeout: float,
+        on_error: Callable[[WebSocket], None],
+    ):
+        self.id = next(_client_ids)
+        self.websocket = websocket
+        self.protocol = protocol
+        # Stateful protocols need a full frame first and after any drop
+        self.needs_resync = True
+        # Sequence number of the newest sample sent (live or backfill)
+        self.last_seq = 0
+        # Set by a "subscribe" message; None streams full documents
+        self.subscription: Optional[Subscription] = None
+        self.interval = settings.WEBSOCKET_UPDATE_INTERVAL  # requested rate
+        self.coalesce = COALESCE_LATEST
+        self.hidden = False
+        self.throttle = 1.0  # backlog multiplier on ``interval``
+        self.stride = 1  # samples per update
+        self._max_queue = max(1, max_queue)
+        self._send_timeout = send_timeout
+        self._on_error = on_error
+        self._queue: Deque[Tuple[Message, bool]] = deque()
+        self._ready = asyncio.Event()
+        self._closed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.sent = 0
+        self.dropped = 0
+
+        self._update_stride()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of frames waiting to be sent"""
+        return len(self._queue)
+
+    @property
+    def effective_interval(self) -> float:
+        """Seconds between updates after throttling"""
+        interval = min(self.interval * self.throttle, settings.WEBSOCKET_MAX_INTERVAL)
+        if self.hidden:
+            interval = max(interval, settings.WEBSOCKET_HIDDEN_INTERVAL)
+        return interval
+
+    def configure(
+        self,
+        interval: Optional[float] = None,
+        coalesce: Optional[str] = None,
+        hidden: Optional[bool] = None,
+    ):
+        """Change the requested rate, coalescing mode or tab visibility"""
+        if interval is not None:
+            self.interval = min(
+                max(interval, settings.WEBSOCKET_MIN_INTERVAL),
+                settings.WEBSOCKET_MAX_INTERVAL,
+            )
+        if coalesce is not None:
+            self.coalesce = coalesce
+        if hidden is not None:
+            self.hidden = hidden
+        self._update_stride()
+
+    def _update_stride(self):
+        # Updates are decimated samples, so the fastest rate is the sample rate
+        self.stride = max(
+            1, round(self.effective_interval / settings.MONITORING_INTERVAL)
+        )
+
+    def is_due(self, seq: int) -> bool:
+        """Whether sample ``seq`` should be sent; adapts to the send backlog"""
+        if seq - self.last_seq < self.stride:
+            return False
+        if self._queue:
+            # The previous update has not gone out yet
+            limit = settings.WEBSOCKET_MAX_INTERVAL / self.interval
+            self.throttle = min(self.throttle * 2, max(1.0, limit))
+        elif self.throttle > 1:
+            self.throttle = max(1.0, self.throttle / 2)
+        else:
+            return True
+        self._update_stride()
+        return seq - self.last_seq >= self.stride
+
+    def start(self):
+        """Start the writer task"""
+        self._task = asyncio.create_task(self._writer())
+
+    def close(self):
+        """Stop the writer task and discard pending frames"""
+        self._closed.set()
+        self._queue.clear()
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    async def wait_closed(self):
+        """Wait for the writer task to finish after ``close``"""
+        if self._task and self._task is not asyncio.current_task():
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def receive(self) -> Dict[str, Any]:
+        """Next ASGI message from the client, or a disconnect once closed.
+
+        Lets the endpoint's receive loop end when the writer gives up on a
+        client that never answers the close handshake.
+        """
+        receive = asyncio.ensure_future(self.websocket.receive())
+        closed = asyncio.ensure_future(self._closed.wait())
+        try:
+            await asyncio.wait((receive, closed), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            closed.cancel()
+            if not receive.done():
+                receive.cancel()
+        if receive.done() and not receive.cancelled():
+            return receive.result()
+        return {"type": "websocket.disconnect", "code": 1011}
+
+    async def _close_socket(self, code: int):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code), self._send_timeout)
+        except Exception as e:
+            logger.debug(f"Error closing WebSocket of client {self.id}: {e!r}")
+
+    def enqueue(self, message: Message, droppable: bool = True):
+        """Queue a frame for sending without waiting"""
+        if droppable:
+            self.discard_stale()
+        if len(self._queue) >= self._max_queue:
+            self._queue.popleft()
+            self.dropped += 1
+            self.needs_resync = True
+        self._queue.append((message, droppable))
+        self._ready.set()
+
+    def discard_stale(self) -> bool:
+        """Drop every queued snapshot frame; returns True if any was dropped"""
+        stale = sum(droppable for _, droppable in self._queue)
+        if not stale:
+            return False
+        self._queue = deque(entry for entry in self._queue if not entry[1])
+        self.dropped += stale
+        # Later deltas would apply to a state the client never received
+        self.needs_resync = True
+        return True
+
+    async def _writer(self):
+        websocket = self.websocket
+        # wait_for can swallow a cancel that arrives as the send completes,
+        # so the writer also stops on the closed flag
+        while not self._closed.is_set():
+            await self._ready.wait()
+            while self._queue:
+                message, _ = self._queue.popleft()
+                try:
+                    if isinstance(message, bytes):
+                        send = websocket.send_bytes(message)
+                    else:
+                        send = websocket.send_text(message)
+                    await asyncio.wait_for(send, self._send_timeout)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error sending to client {self.id}: {e!r}")
+                    self._on_error(websocket)
+                    await self._close_socket(1011)  # internal error
+                    return
+                self.sent += 1
+            self._ready.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Send counters for this client"""
+        return {
+            "id": self.id,
+            "protocol": self.protocol,
+            "topic_paths": (
+                len(self.subscription.paths) if self.subscription else None
+            ),
+            "interval": self.effective_interval,
+            "throttle": self.throttle,
+            "hidden": self.hidden,
+            "queue_depth": self.queue_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+        }
+
 
 class WebSocketManager:
     """Manages WebSocket connections and broadcasting"""
 
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, recent: Optional[SampleRing] = None):
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        # Recent samples, for min/max coalescing of topic frames
+        self._recent = recent
+        self._delta_encoder = DeltaEncoder(
+            keyframe_interval=settings.WEBSOCKET_KEYFRAME_INTERVAL,
+            epsilon=settings.WEBSOCKET_DELTA_EPSILON,
+        )
+        self._packed_encoder = PackedEncoder()
+        # Samples last fed to the stateful encoders
+        self._delta_seq = 0
+        self._packed_seq = 0
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(
+        self,
+        websocket: WebSocket,
+        protocol: str = PROTOCOL_JSON,
+        subprotocol: Optional[str] = None,
+    ) -> ClientConnection:
         """Accept a new WebSocket connection"""
-        await websocket.accept()
-        self.active_connections.append(websocket)
+        await websocket.accept(subprotocol=subprotocol)
+        connection = ClientConnection(
+            websocket,
+            protocol,
+            max_queue=settings.WEBSOCKET_SEND_QUEUE_SIZE,
+            send_timeout=settings.WEBSOCKET_SEND_TIMEOUT,
+            on_error=self.disconnect,
+        )
+        self.active_connections[websocket] = connection
+        connection.start()
         logger.info(
             f"WebSocket client connected. Total connections: {len(self.active_connections)}"
         )
+        return connection
 
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection"""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        connection = self.active_connections.pop(websocket, None)
+        if connection:
+            connection.close()
             logger.info(
                 f"WebSocket client disconnected. Total connections: {len(self.active_connections)}"
             )
 
+    async def close_all(self, code: int = 1001):
+        """Disconnect every client, e.g. on shutdown (1001: going away)"""
+        connections = list(self.active_connections.values())
+        for connection in connections:
+            self.disconnect(connection.websocket)
+            try:
+                await connection.websocket.close(code=code)
+            except Exception as e:
+                logger.debug(f"Error closing WebSocket: {e}")
+        for connection in connections:
+            await connection.wait_closed()
+
     async def send_personal_message(self, message: str, websocket: WebSocket):
         """Send a message to a specific WebSocket connection"""
-        try:
-            await websocket.send_text(message)
-        except Exception as e:
-            logger.error(f"Error sending personal message: {e}")
-            self.disconnect(websocket)
+        connection = self.active_connections.get(websocket)
+        if connection:
+            connection.enqueue(message, droppable=False)
 
     async def broadcast(self, data: Dict[str, Any]):
         """Broadcast data to all connected WebSocket clients"""
         if not self.active_connections:
             return
 
-        message = json.dumps(data, default=str)
-        disconnected = []
+        await self.broadcast_text(encode_json(data), droppable=False)
 
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected.append(connection)
+    async def broadcast_text(self, message: Message, droppable: bool = True):
+        """Queue an already encoded message for every connected client"""
+        for connection in self.active_connections.values():
+            connection.enqueue(message, droppable)
+
+    def handle_message(self, connection: ClientConnection, text: str):
+        """Apply a control message received from a client"""
+        try:
+            message = json.loads(text)
+            kind = message.get("type") if isinstance(message, dict) else None
+            if kind == "subscribe":
+                subscription = Subscription.from_message(message)
+                connection.configure(*self._rate_options(message))
+                connection.subscription = subscription
+            elif kind == "unsubscribe":
+                connection.subscription = None
+                connection.needs_resync = True
+            elif kind == "rate":
+                connection.configure(*self._rate_options(message))
+            elif kind == "visibility":
+                connection.configure(hidden=bool(message.get("hidden")))
+            else:
+                raise ValueError(f"Unknown message type: {kind}")
+        except ValueError as e:
+            error = {"type": "error", "message": str(e)}
+            connection.enqueue(encode_json(error), droppable=False)
 
-        # Remove disconnected clients
-        for connection in disconnected:
-            self.disconnect(connection)
+    @staticmethod
+    def _rate_options(message: Dict[str, Any]) -> Tuple[Optional[float], Optional[str]]:
+        """Validated ``interval`` and ``coalesce`` of a control message"""
+        interval = message.get("interval")
+        if interval is not None and (
+            isinstance(interval, bool)
+            or not isinstance(interval, (int, float))
+            or not interval > 0
+        ):
+            raise ValueError("'interval' must be a positive number of seconds")
+        coalesce = message.get("coalesce")
+        if coalesce is not None and coalesce not in COALESCE_MODES:
+            raise ValueError(f"'coalesce' must be one of {', '.join(COALESCE_MODES)}")
+        return interval, coalesce
+
+    async def broadcast_snapshot(self, snapshot: Snapshot):
+        """Queue a snapshot for every client that is due an update.
+
+        Called for every sample; each client is sent every ``stride``-th
+        sample. Subscribed clients get their topic frame, everyone else the
+        full document in their negotiated protocol.
+        """
+        seq = snapshot.seq
+        delta_frames = None
+        delta_previous = self._delta_seq
+        packed_frames = None
+        packed_previous = self._packed_seq
+        topic_frames: Dict[Tuple[Tuple[str, ...], bool, int], Message] = {}
+        for connection in self.active_connections.values():
+            previous = connection.last_seq
+            # Samples up to last_seq were covered by the client's backfill
+            if seq <= previous or not connection.is_due(seq):
+                continue
+            connection.last_seq = seq
+            # Latest value wins; decides whether a stateful protocol resyncs
+            connection.discard_stale()
+            protocol = connection.protocol
+            subscription = connection.subscription
+            if subscription is not None:
+                binary = protocol == PROTOCOL_MSGPACK
+                minmax = (
+                    connection.coalesce == COALESCE_MINMAX and self._recent is not None
+                )
+                # Shared by every client with the same paths, window and encoding
+                key = (subscription.paths, binary, previous if minmax else -1)
+                frame = topic_frames.get(key)
+                if frame is None:
+                    frame = topic_frames[key] = encode_topic(
+                        snapshot,
+                        subscription,
+                        binary=binary,
+                        ring=self._recent if minmax else None,
+                        after_seq=previous,
+                    )
+                connection.enqueue(frame)
+            elif protocol == PROTOCOL_JSON:
+                connection.enqueue(snapshot.json_text)
+            elif protocol == PROTOCOL_DELTA:
+                if delta_frames is None:
+                    delta_frames = self._delta_encoder.encode(snapshot)
+                    self._delta_seq = seq
+                # Deltas are relative to the previous encoded sample, which
+                # a slower client may not have received
+                if connection.needs_resync or previous != delta_previous:
+                    connection.needs_resync = False
+                    connection.enqueue(delta_frames.resync)
+                else:
+                    connection.enqueue(delta_frames.live)
+            elif protocol == PROTOCOL_PACKED:
+                if packed_frames is None:
+                    packed_frames = self._packed_encoder.encode(snapshot)
+                    self._packed_seq = seq
+                if (
+                    connection.needs_resync
+                    or packed_frames.schema_changed
+                    or previous != packed_previous
+                ):
+                    connection.needs_resync = False
+                    connection.enqueue(packed_frames.schema, droppable=False)
+                connection.enqueue(packed_frames.frame)
+            elif protocol == PROTOCOL_MSGPACK:
+                connection.enqueue(snapshot.msgpack_bytes)
+
+    def send_backfill(
+        self, connection: ClientConnection, ring: SampleRing, seconds: float
+    ):
+        """Queue the last ``seconds`` of samples as one batched frame.
+
+        Must run before the event loop switches tasks after ``connect``, so
+        that no live snapshot is sent first; live snapshots up to the last
+        backfilled sample are then skipped for this client.
+        """
+        seqs, timestamps, columns = ring.window(time.time() - seconds)
+        if not seqs:
+            return
+        message = {
+            "type": "backfill",
+            "seq": seqs[-1],
+            "timestamps": timestamps,
+            "values": columns,
+        }
+        if connection.protocol == PROTOCOL_MSGPACK:
+            connection.enqueue(encode_msgpack(message), droppable=False)
+        else:
+            connection.enqueue(encode_json(message), droppable=False)
+        connection.last_seq = seqs[-1]
 
     async def broadcast_alert(self, alert: Dict[str, Any]):
         """Broadcast an alert to all connected clients"""
@@ -67,3 +482,15 @@ class WebSocketManager:
     def get_connection_count(self) -> int:
         """Get the number of active connections"""
         return len(self.active_connections)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-client queue and drop counters"""
+        connections = self.active_connections.values()
+        clients = [c.get_stats() for c in connections]
+        topics = {c.subscription.paths for c in connections if c.subscription}
+        return {
+            "connected_clients": len(clients),
+            "topics": len(topics),
+            "dropped_frames": sum(c["dropped"] for c in clients),
+            "clients": clients,
+        }
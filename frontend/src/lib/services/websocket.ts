@@ -1,5 +1,7 @@
 import { writable } from "svelte/store";
+import type { DashboardLayout } from "../types/dashboard";
 import type { HardwareData } from "../types/hardware";
+import { currentLayout } from "../stores/dashboard.svelte";
 
 export type ConnectionStatus =
   | "disconnected"
@@ -13,6 +15,165 @@ export const connectionStatus = writable<ConnectionStatus>("disconnected");
 // Hardware data store
 export const hardwareData = writable<HardwareData | null>(null);
 
+// Stream formats offered by the backend `/ws` endpoint
+export type StreamProtocol = "json" | "delta" | "packed";
+
+// Recent samples sent once on connect (`/ws?backfill=300s`)
+export interface BackfillFrame {
+  type: "backfill";
+  seq: number;
+  timestamps: number[]; // seconds since the epoch
+  values: Record<string, (number | null)[]>; // sensor path -> one per timestamp
+}
+
+// Backfill received on the last (re)connect, for seeding charts
+export const recentSamples = writable<BackfillFrame | null>(null);
+
+// Selected sensor values (`{"type": "subscribe"}` on `/ws`)
+interface TopicMessage {
+  type: "topic";
+  seq: number;
+  timestamp: string;
+  values: Record<string, number>;
+}
+
+export interface Subscription {
+  paths: string[]; // sensor paths or prefixes, e.g. "cpu.usage", "sensors.fans"
+  interval: number; // seconds between updates (0.1 - 10)
+  coalesce: "latest" | "minmax"; // minmax adds min/max since the last frame
+}
+
+// Sensor paths displayed by a layout's widgets
+export function layoutPaths(layout: DashboardLayout | null): string[] {
+  const paths = new Set<string>();
+  for (const widget of layout?.widgets ?? []) {
+    if (widget.dataSource) paths.add(widget.dataSource);
+  }
+  return [...paths].sort();
+}
+
+// Delta stream messages (`/ws?protocol=delta`)
+interface StreamMessage {
+  type: "keyframe" | "delta";
+  seq: number;
+  timestamp: string;
+  values: Record<string, unknown>;
+  paths?: Record<string, string>;
+  removed?: number[];
+}
+
+// Packed stream layout (`hwmon.packed.v1` subprotocol)
+interface PackedSchema {
+  type: "schema";
+  id: number;
+  f64: string[];
+  f32: string[];
+  strings: Record<string, unknown>;
+}
+
+const splitPath = (path: string): string[] => path.split(".");
+
+// Rebuilds a nested document from (path segments, value) pairs
+function buildDocument(
+  entries: Iterable<[string[], unknown]>,
+  timestamp: string,
+): HardwareData {
+  const root: Record<string, any> = { timestamp };
+  for (const [segments, value] of entries) {
+    let node = root;
+    for (let i = 0; i < segments.length - 1; i++) {
+      const key = segments[i];
+      if (node[key] === undefined) {
+        node[key] = /^\d+$/.test(segments[i + 1]) ? [] : {};
+      }
+      node = node[key];
+    }
+    node[segments[segments.length - 1]] = value;
+  }
+  return root as unknown as HardwareData;
+}
+
+// Rebuilds full documents from keyframes and deltas addressed by numeric ids
+class DeltaDecoder {
+  private paths = new Map<string, string[]>();
+  private values = new Map<string, unknown>();
+
+  reset(): void {
+    this.paths.clear();
+    this.values.clear();
+  }
+
+  apply(message: StreamMessage): HardwareData {
+    for (const [id, path] of Object.entries(message.paths ?? {})) {
+      this.paths.set(id, splitPath(path));
+    }
+    if (message.type === "keyframe") {
+      this.values.clear();
+    }
+    for (const [id, value] of Object.entries(message.values)) {
+      this.values.set(id, value);
+    }
+    for (const id of message.removed ?? []) {
+      this.values.delete(String(id));
+    }
+    return buildDocument(this.entries(), message.timestamp);
+  }
+
+  private *entries(): Generator<[string[], unknown]> {
+    for (const [id, value] of this.values) {
+      const segments = this.paths.get(id);
+      if (segments) yield [segments, value];
+    }
+  }
+}
+
+// Decodes packed frames as typed-array views over the received buffer
+class PackedDecoder {
+  private schemas = new Map<
+    number,
+    { f64: string[][]; f32: string[][]; strings: [string[], unknown][] }
+  >();
+
+  reset(): void {
+    this.schemas.clear();
+  }
+
+  setSchema(schema: PackedSchema): void {
+    this.schemas.set(schema.id, {
+      f64: schema.f64.map(splitPath),
+      f32: schema.f32.map(splitPath),
+      strings: Object.entries(schema.strings).map(([path, value]) => [
+        splitPath(path),
+        value,
+      ]),
+    });
+  }
+
+  decode(buffer: ArrayBuffer): HardwareData | null {
+    const header = new DataView(buffer, 0, 16);
+    const schema = this.schemas.get(header.getUint32(0, true));
+    if (!schema) return null;
+
+    const timestamp = new Date(header.getFloat64(8, true) * 1000).toISOString();
+    const f64 = new Float64Array(buffer, 16, schema.f64.length);
+    const f32 = new Float32Array(
+      buffer,
+      16 + 8 * schema.f64.length,
+      schema.f32.length,
+    );
+
+    const entries: [string[], unknown][] = [...schema.strings];
+    schema.f64.forEach((path, i) => entries.push([path, f64[i]]));
+    schema.f32.forEach((path, i) =>
+      entries.push([path, Number.isNaN(f32[i]) ? null : f32[i]]),
+    );
+    return buildDocument(entries, timestamp);
+  }
+}
+
+const deltaDecoder = new DeltaDecoder();
+const packedDecoder = new PackedDecoder();
+
 // WebSocket connection
 let ws: WebSocket | null = null;
 let reconnectAttempts = 0;
@@ -21,6 +182,7 @@ const reconnectDelay = 3000;
 
 export class WebSocketService {
   private static instance: WebSocketService;
+  private subscription: Subscription | null = null;
 
   static getInstance(): WebSocketService {
     if (!WebSocketService.instance) {
@@ -29,7 +191,11 @@ export class WebSocketService {
     return WebSocketService.instance;
   }
 
-  connect(url: string = "ws://localhost:8000/ws"): void {
+  connect(
+    url: string = "ws://localhost:8000/ws",
+    protocol: StreamProtocol = "delta",
+    backfill: string = "300s",
+  ): void {
     if (ws?.readyState === WebSocket.OPEN) {
       return; // Already connected
     }
@@ -37,18 +203,56 @@ export class WebSocketService {
     connectionStatus.set("connecting");
 
     try {
-      ws = new WebSocket(url);
+      const params = new URLSearchParams();
+      if (backfill) params.set("backfill", backfill);
+      if (protocol === "packed") {
+        ws = new WebSocket(`${url}?${params}`, ["hwmon.packed.v1"]);
+        ws.binaryType = "arraybuffer";
+      } else {
+        params.set("protocol", protocol);
+        ws = new WebSocket(`${url}?${params}`);
+      }
 
       ws.onopen = () => {
         console.log("WebSocket connected");
+        deltaDecoder.reset();
+        packedDecoder.reset();
         connectionStatus.set("connected");
         reconnectAttempts = 0;
+        this.sendSubscription();
+        this.sendVisibility();
       };
 
       ws.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data) as HardwareData;
-          hardwareData.set(data);
+          if (event.data instanceof ArrayBuffer) {
+            const data = packedDecoder.decode(event.data);
+            if (data) hardwareData.set(data);
+            return;
+          }
+          const message = JSON.parse(event.data);
+          if (message.type === "backfill") {
+            recentSamples.set(message as BackfillFrame);
+          } else if (message.type === "topic") {
+            const topic = message as TopicMessage;
+            hardwareData.set(
+              buildDocument(
+                Object.entries(topic.values).map(([path, value]) => [
+                  splitPath(path),
+                  value,
+                ]),
+                topic.timestamp,
+              ),
+            );
+          } else if (message.type === "error") {
+            console.warn("WebSocket error message:", message.message);
+          } else if (message.type === "schema") {
+            packedDecoder.setSchema(message as PackedSchema);
+          } else if (message.type === "keyframe" || message.type === "delta") {
+            hardwareData.set(deltaDecoder.apply(message as StreamMessage));
+          } else {
+            hardwareData.set(message as HardwareData);
+          }
         } catch (error) {
           console.error("Failed to parse WebSocket message:", error);
         }
@@ -57,7 +261,7 @@ export class WebSocketService {
       ws.onclose = () => {
         console.log("WebSocket disconnected");
         connectionStatus.set("disconnected");
-        this.handleReconnect(url);
+        this.handleReconnect(url, protocol, backfill);
       };
 
       ws.onerror = (error) => {
@@ -70,7 +274,11 @@ export class WebSocketService {
     }
   }
 
-  private handleReconnect(url: string): void {
+  private handleReconnect(
+    url: string,
+    protocol: StreamProtocol,
+    backfill: string,
+  ): void {
     if (reconnectAttempts < maxReconnectAttempts) {
       reconnectAttempts++;
       console.log(
@@ -78,7 +286,7 @@ export class WebSocketService {
       );
 
       setTimeout(() => {
-        this.connect(url);
+        this.connect(url, protocol, backfill);
       }, reconnectDelay);
     } else {
       console.error("Max reconnection attempts reached");
@@ -94,6 +302,31 @@ export class WebSocketService {
     connectionStatus.set("disconnected");
   }
 
+  // Only receive `paths`; an empty list returns to the full stream
+  subscribe(
+    paths: string[],
+    interval: number = 1,
+    coalesce: Subscription["coalesce"] = "latest",
+  ): void {
+    this.subscription = paths.length ? { paths, interval, coalesce } : null;
+    if (ws?.readyState === WebSocket.OPEN) this.sendSubscription();
+  }
+
+  // The server slows hidden tabs down and restores the rate when visible
+  sendVisibility(): void {
+    if (ws?.readyState === WebSocket.OPEN && typeof document !== "undefined") {
+      this.send({ type: "visibility", hidden: document.hidden });
+    }
+  }
+
+  private sendSubscription(): void {
+    if (this.subscription) {
+      this.send({ type: "subscribe", ...this.subscription });
+    } else {
+      this.send({ type: "unsubscribe" });
+    }
+  }
+
   send(data: any): void {
     if (ws?.readyState === WebSocket.OPEN) {
       ws.send(JSON.stringify(data));
@@ -106,5 +339,8 @@ export class WebSocketService {
 // Auto-connect when in browser
 if (typeof window !== "undefined") {
   const wsService = WebSocketService.getInstance();
+  // Follow the widgets of the active layout
+  currentLayout.subscribe((layout) => wsService.subscribe(layoutPaths(layout)));
+  document.addEventListener("visibilitychange", () => wsService.sendVisibility());
   wsService.connect();
 }